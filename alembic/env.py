@@ -9,7 +9,17 @@ from sqlalchemy import pool
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from app.db.base import Base
-from app.models import account, category, category_rule, statement_import, transaction  # noqa: F401
+from app.models import (  # noqa: F401
+    account,
+    category,
+    category_rule,
+    change_journal,
+    data_version,
+    monthly_rollup,
+    statement_import,
+    transaction,
+    transaction_raw,
+)
 
 config = context.config
 
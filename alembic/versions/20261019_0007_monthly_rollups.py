@@ -0,0 +1,165 @@
+"""monthly rollups maintained by statement triggers
+
+Revision ID: 20261019_0007
+Revises: 20260222_0006
+Create Date: 2026-10-19 10:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0007"
+down_revision = "20260222_0006"
+branch_labels = None
+depends_on = None
+
+
+ROLLUP_KEY = "account_id, month, category_id, kind, status, currency"
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_rollups (
+            account_id INTEGER NOT NULL,
+            month DATE NOT NULL,
+            category_id INTEGER NOT NULL,
+            kind transaction_kind NOT NULL,
+            status transaction_status NOT NULL,
+            currency VARCHAR(3) NOT NULL,
+            total_amount NUMERIC(16,2) NOT NULL DEFAULT 0,
+            outflow_amount NUMERIC(16,2) NOT NULL DEFAULT 0,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (account_id, month, category_id, kind, status, currency)
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_rollups_month ON monthly_rollups (month);")
+
+    # Rows of old_rows are retracted, rows of new_rows are added; an UPDATE
+    # nets both sides so untouched keys (e.g. category_locked edits) are skipped.
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION monthly_rollups_apply_delta() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO monthly_rollups AS r (
+                    {ROLLUP_KEY}, total_amount, outflow_amount, tx_count
+                )
+                SELECT account_id, date_trunc('month', tx_date)::date, category_id, kind, status,
+                       currency,
+                       SUM(amount),
+                       COALESCE(SUM(amount) FILTER (WHERE signed_amount < 0), 0),
+                       COUNT(*)
+                FROM new_rows
+                GROUP BY 1, 2, 3, 4, 5, 6
+                ON CONFLICT ({ROLLUP_KEY}) DO UPDATE
+                SET total_amount = r.total_amount + EXCLUDED.total_amount,
+                    outflow_amount = r.outflow_amount + EXCLUDED.outflow_amount,
+                    tx_count = r.tx_count + EXCLUDED.tx_count;
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO monthly_rollups AS r (
+                    {ROLLUP_KEY}, total_amount, outflow_amount, tx_count
+                )
+                SELECT account_id, date_trunc('month', tx_date)::date, category_id, kind, status,
+                       currency,
+                       -SUM(amount),
+                       -COALESCE(SUM(amount) FILTER (WHERE signed_amount < 0), 0),
+                       -COUNT(*)
+                FROM old_rows
+                GROUP BY 1, 2, 3, 4, 5, 6
+                ON CONFLICT ({ROLLUP_KEY}) DO UPDATE
+                SET total_amount = r.total_amount + EXCLUDED.total_amount,
+                    outflow_amount = r.outflow_amount + EXCLUDED.outflow_amount,
+                    tx_count = r.tx_count + EXCLUDED.tx_count;
+            ELSE
+                INSERT INTO monthly_rollups AS r (
+                    {ROLLUP_KEY}, total_amount, outflow_amount, tx_count
+                )
+                SELECT account_id, month, category_id, kind, status, currency,
+                       SUM(d_amount), SUM(d_outflow), SUM(d_count)
+                FROM (
+                    SELECT account_id, date_trunc('month', tx_date)::date AS month, category_id,
+                           kind, status, currency, -amount AS d_amount,
+                           CASE WHEN signed_amount < 0 THEN -amount ELSE 0 END AS d_outflow,
+                           -1 AS d_count
+                    FROM old_rows
+                    UNION ALL
+                    SELECT account_id, date_trunc('month', tx_date)::date, category_id, kind,
+                           status, currency, amount,
+                           CASE WHEN signed_amount < 0 THEN amount ELSE 0 END,
+                           1
+                    FROM new_rows
+                ) AS delta
+                GROUP BY 1, 2, 3, 4, 5, 6
+                HAVING SUM(d_count) <> 0 OR SUM(d_amount) <> 0 OR SUM(d_outflow) <> 0
+                ON CONFLICT ({ROLLUP_KEY}) DO UPDATE
+                SET total_amount = r.total_amount + EXCLUDED.total_amount,
+                    outflow_amount = r.outflow_amount + EXCLUDED.outflow_amount,
+                    tx_count = r.tx_count + EXCLUDED.tx_count;
+            END IF;
+
+            DELETE FROM monthly_rollups r
+            USING (
+                SELECT DISTINCT account_id, date_trunc('month', tx_date)::date AS month
+                FROM old_rows
+            ) AS touched
+            WHERE r.account_id = touched.account_id
+              AND r.month = touched.month
+              AND r.tx_count = 0;
+            RETURN NULL;
+        END$$;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER trg_transactions_rollups_insert
+        AFTER INSERT ON transactions
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION monthly_rollups_apply_delta();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_transactions_rollups_update
+        AFTER UPDATE ON transactions
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION monthly_rollups_apply_delta();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_transactions_rollups_delete
+        AFTER DELETE ON transactions
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION monthly_rollups_apply_delta();
+        """
+    )
+
+    op.execute(
+        f"""
+        INSERT INTO monthly_rollups ({ROLLUP_KEY}, total_amount, outflow_amount, tx_count)
+        SELECT account_id, date_trunc('month', tx_date)::date, category_id, kind, status, currency,
+               SUM(amount),
+               COALESCE(SUM(amount) FILTER (WHERE signed_amount < 0), 0),
+               COUNT(*)
+        FROM transactions
+        GROUP BY 1, 2, 3, 4, 5, 6
+        ON CONFLICT DO NOTHING;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_rollups_delete ON transactions;")
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_rollups_update ON transactions;")
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_rollups_insert ON transactions;")
+    op.execute("DROP FUNCTION IF EXISTS monthly_rollups_apply_delta();")
+    op.execute("DROP TABLE IF EXISTS monthly_rollups;")
@@ -0,0 +1,124 @@
+"""data version counters for response caching
+
+Revision ID: 20261019_0008
+Revises: 20261019_0007
+Create Date: 2026-10-19 11:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0008"
+down_revision = "20261019_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            scope VARCHAR(64) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 1
+        );
+        """
+    )
+
+    # Writes to transactions bump one scope per touched (account, month), e.g.
+    # 'tx:3:2026-02'. Per-scope counters keep writers to different accounts
+    # from contending on a single hot row; scopes are upserted in key order so
+    # concurrent statements lock them in the same order.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION data_versions_bump_transactions() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO data_versions AS v (scope)
+                SELECT DISTINCT 'tx:' || account_id || ':' || to_char(tx_date, 'YYYY-MM') AS scope
+                FROM new_rows
+                ORDER BY scope
+                ON CONFLICT (scope) DO UPDATE SET version = v.version + 1;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO data_versions AS v (scope)
+                SELECT DISTINCT 'tx:' || account_id || ':' || to_char(tx_date, 'YYYY-MM') AS scope
+                FROM old_rows
+                ORDER BY scope
+                ON CONFLICT (scope) DO UPDATE SET version = v.version + 1;
+            ELSE
+                INSERT INTO data_versions AS v (scope)
+                SELECT scope
+                FROM (
+                    SELECT 'tx:' || account_id || ':' || to_char(tx_date, 'YYYY-MM') AS scope FROM old_rows
+                    UNION
+                    SELECT 'tx:' || account_id || ':' || to_char(tx_date, 'YYYY-MM') FROM new_rows
+                ) AS touched
+                ORDER BY scope
+                ON CONFLICT (scope) DO UPDATE SET version = v.version + 1;
+            END IF;
+            RETURN NULL;
+        END$$;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION data_versions_bump_scope() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO data_versions AS v (scope)
+            VALUES (TG_ARGV[0])
+            ON CONFLICT (scope) DO UPDATE SET version = v.version + 1;
+            RETURN NULL;
+        END$$;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER trg_transactions_versions_insert
+        AFTER INSERT ON transactions
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION data_versions_bump_transactions();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_transactions_versions_update
+        AFTER UPDATE ON transactions
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION data_versions_bump_transactions();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_transactions_versions_delete
+        AFTER DELETE ON transactions
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION data_versions_bump_transactions();
+        """
+    )
+    for table_name, scope in (
+        ("accounts", "accounts"),
+        ("categories", "categories"),
+        ("category_rules", "rules"),
+    ):
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table_name}_versions
+            AFTER INSERT OR UPDATE OR DELETE ON {table_name}
+            FOR EACH STATEMENT EXECUTE FUNCTION data_versions_bump_scope('{scope}');
+            """
+        )
+
+
+def downgrade() -> None:
+    for table_name in ("category_rules", "categories", "accounts"):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_versions ON {table_name};")
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_versions_delete ON transactions;")
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_versions_update ON transactions;")
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_versions_insert ON transactions;")
+    op.execute("DROP FUNCTION IF EXISTS data_versions_bump_scope();")
+    op.execute("DROP FUNCTION IF EXISTS data_versions_bump_transactions();")
+    op.execute("DROP TABLE IF EXISTS data_versions;")
@@ -0,0 +1,76 @@
+"""transaction indexes for list, balance and auto-pair queries
+
+Revision ID: 20261019_0009
+Revises: 20261019_0008
+Create Date: 2026-10-19 12:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0009"
+down_revision = "20261019_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Account views: month list ordered by (tx_date, id) and the balance sums,
+    # which can be answered from the index alone thanks to the INCLUDE columns.
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_tx_account_date_id
+        ON transactions (account_id, tx_date, id)
+        INCLUDE (signed_amount, status);
+        """
+    )
+    # All-accounts month list and rule application over a month window.
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tx_date_id ON transactions (tx_date, id);")
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_tx_pending
+        ON transactions (account_id, tx_date)
+        INCLUDE (signed_amount)
+        WHERE status = 'pending';
+        """
+    )
+    # Auto-pair candidates: posted rows that are not transfers and not paired yet.
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_tx_unpaired_posted
+        ON transactions (tx_date, id)
+        WHERE transfer_pair_id IS NULL AND status = 'posted' AND kind <> 'transfer';
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_tx_pair_id
+        ON transactions (transfer_pair_id, id)
+        WHERE transfer_pair_id IS NOT NULL;
+        """
+    )
+
+    # Superseded by the indexes above: idx_tx_lookup by idx_tx_account_date_id,
+    # idx_tx_pair by its partial variant; kind/status alone are too unselective
+    # to be used and only slow down writes.
+    op.execute("DROP INDEX IF EXISTS idx_tx_lookup;")
+    op.execute("DROP INDEX IF EXISTS idx_tx_pair;")
+    op.execute("DROP INDEX IF EXISTS idx_tx_kind;")
+    op.execute("DROP INDEX IF EXISTS idx_tx_status;")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tx_status ON transactions (status);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tx_kind ON transactions (kind);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tx_pair ON transactions (transfer_pair_id);")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tx_lookup "
+        "ON transactions (account_id, tx_date, currency, signed_amount);"
+    )
+    op.execute("DROP INDEX IF EXISTS idx_tx_pair_id;")
+    op.execute("DROP INDEX IF EXISTS idx_tx_unpaired_posted;")
+    op.execute("DROP INDEX IF EXISTS idx_tx_pending;")
+    op.execute("DROP INDEX IF EXISTS idx_tx_date_id;")
+    op.execute("DROP INDEX IF EXISTS idx_tx_account_date_id;")
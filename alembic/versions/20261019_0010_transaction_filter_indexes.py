@@ -0,0 +1,55 @@
+"""indexes for transaction list filters
+
+Revision ID: 20261019_0010
+Revises: 20261019_0009
+Create Date: 2026-10-19 13:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0010"
+down_revision = "20261019_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tx_category_date_id "
+        "ON transactions (category_id, tx_date, id);"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tx_import_date_id "
+        "ON transactions (import_id, tx_date, id) WHERE import_id IS NOT NULL;"
+    )
+    op.execute("DROP INDEX IF EXISTS idx_tx_import_id;")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tx_transfers_date_id "
+        "ON transactions (tx_date, id) WHERE kind = 'transfer';"
+    )
+
+    # Substring search (ILIKE '%q%') needs trigrams; installations without the
+    # extension fall back to filtering the month window.
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                CREATE INDEX IF NOT EXISTS ix_transactions_description_trgm
+                ON transactions USING gin (description gin_trgm_ops);
+            END IF;
+        END$$;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_transactions_description_trgm;")
+    op.execute("DROP INDEX IF EXISTS idx_tx_transfers_date_id;")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tx_import_id ON transactions (import_id);")
+    op.execute("DROP INDEX IF EXISTS idx_tx_import_date_id;")
+    op.execute("DROP INDEX IF EXISTS idx_tx_category_date_id;")
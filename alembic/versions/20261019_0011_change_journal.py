@@ -0,0 +1,104 @@
+"""append-only change journal for delta sync
+
+Revision ID: 20261019_0011
+Revises: 20261019_0010
+Create Date: 2026-10-19 14:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0011"
+down_revision = "20261019_0010"
+branch_labels = None
+depends_on = None
+
+JOURNALED_TABLES = ("transactions", "category_rules", "accounts", "categories")
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_journal (
+            seq BIGSERIAL PRIMARY KEY,
+            table_name VARCHAR(32) NOT NULL,
+            row_id BIGINT NOT NULL,
+            op VARCHAR(6) NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+            changed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            xid XID8 NOT NULL DEFAULT pg_current_xact_id()
+        );
+        """
+    )
+    # Rows are appended in time order, so a BRIN index is enough for compaction.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_change_journal_changed_at "
+        "ON change_journal USING brin (changed_at);"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_change_journal_xid_seq ON change_journal (xid, seq);"
+    )
+
+    # Writers don't serialize on the journal, so neither seq nor xid order is
+    # commit order. Readers go through the journal by (xid, seq) and only up
+    # to the oldest transaction still in progress (app/services/change_journal.py):
+    # every entry below that xid is committed or gone for good, so nothing can
+    # appear behind a reader's cursor later.
+    # Statements that touch no rows return early and write nothing.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION change_journal_record() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                IF NOT EXISTS (SELECT 1 FROM old_rows) THEN
+                    RETURN NULL;
+                END IF;
+                INSERT INTO change_journal (table_name, row_id, op)
+                SELECT TG_TABLE_NAME, id, 'delete' FROM old_rows ORDER BY id;
+            ELSE
+                IF NOT EXISTS (SELECT 1 FROM new_rows) THEN
+                    RETURN NULL;
+                END IF;
+                INSERT INTO change_journal (table_name, row_id, op)
+                SELECT TG_TABLE_NAME, id, lower(TG_OP) FROM new_rows ORDER BY id;
+            END IF;
+            RETURN NULL;
+        END$$;
+        """
+    )
+
+    for table_name in JOURNALED_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table_name}_journal_insert
+            AFTER INSERT ON {table_name}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION change_journal_record();
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table_name}_journal_update
+            AFTER UPDATE ON {table_name}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION change_journal_record();
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table_name}_journal_delete
+            AFTER DELETE ON {table_name}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION change_journal_record();
+            """
+        )
+
+
+def downgrade() -> None:
+    for table_name in reversed(JOURNALED_TABLES):
+        for suffix in ("delete", "update", "insert"):
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_journal_{suffix} ON {table_name};")
+    op.execute("DROP FUNCTION IF EXISTS change_journal_record();")
+    op.execute("DROP TABLE IF EXISTS change_journal;")
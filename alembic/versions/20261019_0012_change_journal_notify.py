@@ -0,0 +1,124 @@
+"""notify listeners about change journal writes
+
+Revision ID: 20261019_0012
+Revises: 20261019_0011
+Create Date: 2026-10-19 15:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0012"
+down_revision = "20261019_0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Same journal writes as 20261019_0011 (no lock, the writer's xid is
+    # filled in by the column default), plus one NOTIFY per statement on
+    # 'budget_events'. NOTIFY is delivered at commit, so listeners never see
+    # rolled back writes. Row ids are only listed for small statements to stay
+    # well under the 8000 byte payload limit; transaction writes also carry the
+    # touched months and accounts for report invalidation.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION change_journal_record() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            last_seq BIGINT;
+            row_count INTEGER;
+            row_ids BIGINT[];
+            months TEXT[];
+            account_ids INTEGER[];
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                IF NOT EXISTS (SELECT 1 FROM old_rows) THEN
+                    RETURN NULL;
+                END IF;
+                WITH added AS (
+                    INSERT INTO change_journal (table_name, row_id, op)
+                    SELECT TG_TABLE_NAME, id, 'delete' FROM old_rows ORDER BY id
+                    RETURNING seq, row_id
+                )
+                SELECT max(seq), count(*), (array_agg(row_id ORDER BY seq))[1:200]
+                INTO last_seq, row_count, row_ids
+                FROM added;
+                IF TG_TABLE_NAME = 'transactions' THEN
+                    SELECT array_agg(DISTINCT to_char(tx_date, 'YYYY-MM')),
+                           array_agg(DISTINCT account_id)
+                    INTO months, account_ids
+                    FROM old_rows;
+                END IF;
+            ELSE
+                IF NOT EXISTS (SELECT 1 FROM new_rows) THEN
+                    RETURN NULL;
+                END IF;
+                WITH added AS (
+                    INSERT INTO change_journal (table_name, row_id, op)
+                    SELECT TG_TABLE_NAME, id, lower(TG_OP) FROM new_rows ORDER BY id
+                    RETURNING seq, row_id
+                )
+                SELECT max(seq), count(*), (array_agg(row_id ORDER BY seq))[1:200]
+                INTO last_seq, row_count, row_ids
+                FROM added;
+                IF TG_TABLE_NAME = 'transactions' AND TG_OP = 'INSERT' THEN
+                    SELECT array_agg(DISTINCT to_char(tx_date, 'YYYY-MM')),
+                           array_agg(DISTINCT account_id)
+                    INTO months, account_ids
+                    FROM new_rows;
+                ELSIF TG_TABLE_NAME = 'transactions' THEN
+                    SELECT array_agg(DISTINCT to_char(tx_date, 'YYYY-MM')),
+                           array_agg(DISTINCT account_id)
+                    INTO months, account_ids
+                    FROM (
+                        SELECT tx_date, account_id FROM old_rows
+                        UNION ALL
+                        SELECT tx_date, account_id FROM new_rows
+                    ) AS touched;
+                END IF;
+            END IF;
+
+            PERFORM pg_notify(
+                'budget_events',
+                json_build_object(
+                    'table', TG_TABLE_NAME,
+                    'op', lower(TG_OP),
+                    'seq', last_seq,
+                    'count', row_count,
+                    'ids', CASE WHEN row_count <= 200 THEN row_ids END,
+                    'months', months,
+                    'account_ids', account_ids
+                )::text
+            );
+            RETURN NULL;
+        END$$;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION change_journal_record() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                IF NOT EXISTS (SELECT 1 FROM old_rows) THEN
+                    RETURN NULL;
+                END IF;
+                INSERT INTO change_journal (table_name, row_id, op)
+                SELECT TG_TABLE_NAME, id, 'delete' FROM old_rows ORDER BY id;
+            ELSE
+                IF NOT EXISTS (SELECT 1 FROM new_rows) THEN
+                    RETURN NULL;
+                END IF;
+                INSERT INTO change_journal (table_name, row_id, op)
+                SELECT TG_TABLE_NAME, id, lower(TG_OP) FROM new_rows ORDER BY id;
+            END IF;
+            RETURN NULL;
+        END$$;
+        """
+    )
@@ -0,0 +1,24 @@
+"""store the sha256 of imported statement files
+
+Revision ID: 20261019_0013
+Revises: 20261019_0012
+Create Date: 2026-10-19 16:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0013"
+down_revision = "20261019_0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE statement_imports ADD COLUMN IF NOT EXISTS file_sha256 VARCHAR(64);")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE statement_imports DROP COLUMN IF EXISTS file_sha256;")
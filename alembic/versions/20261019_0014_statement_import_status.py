@@ -0,0 +1,42 @@
+"""statement import status and failure reason
+
+Revision ID: 20261019_0014
+Revises: 20261019_0013
+Create Date: 2026-10-19 17:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0014"
+down_revision = "20261019_0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE statement_imports
+            ADD COLUMN IF NOT EXISTS status VARCHAR(16) NOT NULL DEFAULT 'completed',
+            ADD COLUMN IF NOT EXISTS error TEXT;
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE statement_imports
+            ADD CONSTRAINT ck_statement_imports_status
+            CHECK (status IN ('completed', 'failed'));
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE statement_imports DROP CONSTRAINT IF EXISTS ck_statement_imports_status;"
+    )
+    op.execute(
+        "ALTER TABLE statement_imports DROP COLUMN IF EXISTS error, DROP COLUMN IF EXISTS status;"
+    )
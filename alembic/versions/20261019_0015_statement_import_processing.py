@@ -0,0 +1,44 @@
+"""allow statement imports to be in progress
+
+Revision ID: 20261019_0015
+Revises: 20261019_0014
+Create Date: 2026-10-19 18:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0015"
+down_revision = "20261019_0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # PDF imports commit chunk by chunk, so an import row is visible while its
+    # transactions are still being written.
+    op.execute(
+        """
+        ALTER TABLE statement_imports
+            DROP CONSTRAINT IF EXISTS ck_statement_imports_status,
+            ADD CONSTRAINT ck_statement_imports_status
+            CHECK (status IN ('processing', 'completed', 'failed'));
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE statement_imports SET status = 'failed', error = 'interrupted' "
+        "WHERE status = 'processing';"
+    )
+    op.execute(
+        """
+        ALTER TABLE statement_imports
+            DROP CONSTRAINT IF EXISTS ck_statement_imports_status,
+            ADD CONSTRAINT ck_statement_imports_status
+            CHECK (status IN ('completed', 'failed'));
+        """
+    )
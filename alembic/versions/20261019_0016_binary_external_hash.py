@@ -0,0 +1,141 @@
+"""store external_hash as a 16-byte blake2b digest
+
+Revision ID: 20261019_0016
+Revises: 20261019_0015
+Create Date: 2026-10-19 20:00:00
+
+"""
+
+import hashlib
+from decimal import Decimal
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0016"
+down_revision = "20261019_0015"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10_000
+
+# Frozen copy of make_external_hash at this revision.
+EXTERNAL_HASH_KEY = b"budget-external-hash"
+
+UPDATE_TRIGGERS = (
+    "trg_transactions_rollups_update",
+    "trg_transactions_versions_update",
+    "trg_transactions_journal_update",
+)
+
+
+def _external_hash(
+    account_id: int,
+    tx_date,
+    signed_amount: Decimal,
+    currency: str,
+    operation: str,
+    details: str,
+) -> bytes:
+    payload = (
+        f"{account_id}|{tx_date.isoformat()}|{signed_amount:.2f}|{currency}|{operation}|{details}"
+    )
+    return hashlib.blake2b(
+        payload.encode("utf-8"), digest_size=16, key=EXTERNAL_HASH_KEY
+    ).digest()
+
+
+def _set_update_triggers(enabled: bool) -> None:
+    # Only the hash changes, which no rollup, cache version or journal
+    # consumer reads; rewriting every imported row must not look like an edit.
+    action = "ENABLE" if enabled else "DISABLE"
+    op.execute(
+        "ALTER TABLE transactions "
+        + ", ".join(f"{action} TRIGGER {name}" for name in UPDATE_TRIGGERS)
+    )
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE transactions ADD COLUMN external_hash_bin BYTEA")
+    _set_update_triggers(False)
+
+    # Hashes are recomputed from the stored row so new imports keep matching
+    # old ones. Rows without the parsed operation in raw, or whose new hash
+    # collides with an earlier row, keep a truncated copy of the old digest:
+    # still unique, it only stops matching future imports.
+    bind = op.get_bind()
+    seen: set[bytes] = set()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                """
+                SELECT id, account_id, tx_date, signed_amount, currency,
+                       raw ->> 'operation', raw ->> 'details', external_hash
+                FROM transactions
+                WHERE external_hash IS NOT NULL AND id > :last_id
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+
+        ids: list[int] = []
+        hashes: list[bytes] = []
+        for row_id, account_id, tx_date, signed_amount, currency, operation, details, old in rows:
+            digest = None
+            if operation is not None:
+                digest = _external_hash(
+                    account_id, tx_date, signed_amount, currency, operation, details or ""
+                )
+            if digest is None or digest in seen:
+                digest = bytes.fromhex(old)[:16]
+            seen.add(digest)
+            ids.append(row_id)
+            hashes.append(digest)
+
+        bind.execute(
+            sa.text(
+                """
+                UPDATE transactions AS t SET external_hash_bin = v.digest
+                FROM unnest(CAST(:ids AS BIGINT[]), CAST(:hashes AS BYTEA[])) AS v(id, digest)
+                WHERE t.id = v.id
+                """
+            ),
+            {"ids": ids, "hashes": hashes},
+        )
+        last_id = ids[-1]
+
+    _set_update_triggers(True)
+    op.execute(
+        """
+        ALTER TABLE transactions
+            DROP CONSTRAINT uq_transactions_external_hash,
+            DROP COLUMN external_hash
+        """
+    )
+    op.execute("ALTER TABLE transactions RENAME COLUMN external_hash_bin TO external_hash")
+    op.execute(
+        """
+        ALTER TABLE transactions
+            ADD CONSTRAINT uq_transactions_external_hash UNIQUE (external_hash)
+        """
+    )
+
+
+def downgrade() -> None:
+    # The SHA-256 inputs are not kept, so the digests go back as hex strings:
+    # existing rows stay unique but won't match rows hashed by the old code.
+    op.execute(
+        """
+        ALTER TABLE transactions
+            DROP CONSTRAINT uq_transactions_external_hash,
+            ALTER COLUMN external_hash TYPE VARCHAR(64) USING encode(external_hash, 'hex'),
+            ADD CONSTRAINT uq_transactions_external_hash UNIQUE (external_hash)
+        """
+    )
@@ -0,0 +1,85 @@
+"""move raw import payloads out of transactions
+
+Revision ID: 20261019_0017
+Revises: 20261019_0016
+Create Date: 2026-10-19 21:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0017"
+down_revision = "20261019_0016"
+branch_labels = None
+depends_on = None
+
+RAW_BATCH_SIZE = 500
+
+UPDATE_TRIGGERS = (
+    "trg_transactions_rollups_update",
+    "trg_transactions_versions_update",
+    "trg_transactions_journal_update",
+)
+
+
+def _set_update_triggers(enabled: bool) -> None:
+    action = "ENABLE" if enabled else "DISABLE"
+    op.execute(
+        "ALTER TABLE transactions "
+        + ", ".join(f"{action} TRIGGER {name}" for name in UPDATE_TRIGGERS)
+    )
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE transaction_raw (
+            id BIGSERIAL PRIMARY KEY,
+            import_id INTEGER REFERENCES statement_imports (id) ON DELETE CASCADE,
+            first_transaction_id BIGINT NOT NULL,
+            last_transaction_id BIGINT NOT NULL,
+            payloads JSONB NOT NULL
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX idx_transaction_raw_import_first "
+        "ON transaction_raw (import_id, first_transaction_id)"
+    )
+    op.execute(
+        f"""
+        INSERT INTO transaction_raw (
+            import_id, first_transaction_id, last_transaction_id, payloads
+        )
+        SELECT import_id, min(id), max(id), jsonb_object_agg(id::text, raw)
+        FROM (
+            SELECT id, import_id, raw,
+                   (row_number() OVER (PARTITION BY import_id ORDER BY id) - 1)
+                       / {RAW_BATCH_SIZE} AS batch_no
+            FROM transactions
+            WHERE raw IS NOT NULL
+        ) AS numbered
+        GROUP BY import_id, batch_no
+        """
+    )
+    # Dropping the column only hides it; the space in existing heap pages is
+    # reclaimed by VACUUM FULL transactions (or pg_repack) after the upgrade.
+    op.execute("ALTER TABLE transactions DROP COLUMN raw")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE transactions ADD COLUMN raw JSONB")
+    _set_update_triggers(False)
+    op.execute(
+        """
+        UPDATE transactions AS t SET raw = r.payloads -> t.id::text
+        FROM transaction_raw AS r
+        WHERE r.import_id IS NOT DISTINCT FROM t.import_id
+          AND t.id BETWEEN r.first_transaction_id AND r.last_transaction_id
+          AND r.payloads ? t.id::text
+        """
+    )
+    _set_update_triggers(True)
+    op.execute("DROP TABLE transaction_raw")
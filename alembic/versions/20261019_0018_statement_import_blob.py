@@ -0,0 +1,36 @@
+"""reference stored statement files and the parser version from imports
+
+Revision ID: 20261019_0018
+Revises: 20261019_0017
+Create Date: 2026-10-19 22:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0018"
+down_revision = "20261019_0017"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE statement_imports
+            ADD COLUMN IF NOT EXISTS blob_key VARCHAR(64),
+            ADD COLUMN IF NOT EXISTS parser_version INTEGER;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE statement_imports
+            DROP COLUMN IF EXISTS parser_version,
+            DROP COLUMN IF EXISTS blob_key;
+        """
+    )
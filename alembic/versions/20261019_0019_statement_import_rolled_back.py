@@ -0,0 +1,44 @@
+"""allow statement imports to be rolled back
+
+Revision ID: 20261019_0019
+Revises: 20261019_0018
+Create Date: 2026-10-19 23:00:00
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0019"
+down_revision = "20261019_0018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A rolled-back import keeps its row (file hash, counters, period) with no
+    # transactions left behind it.
+    op.execute(
+        """
+        ALTER TABLE statement_imports
+            DROP CONSTRAINT IF EXISTS ck_statement_imports_status,
+            ADD CONSTRAINT ck_statement_imports_status
+            CHECK (status IN ('processing', 'completed', 'failed', 'rolled_back'));
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE statement_imports SET status = 'failed', error = 'rolled back' "
+        "WHERE status = 'rolled_back';"
+    )
+    op.execute(
+        """
+        ALTER TABLE statement_imports
+            DROP CONSTRAINT IF EXISTS ck_statement_imports_status,
+            ADD CONSTRAINT ck_statement_imports_status
+            CHECK (status IN ('processing', 'completed', 'failed'));
+        """
+    )
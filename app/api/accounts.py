@@ -1,38 +1,29 @@
 import datetime as dt
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
 from app.models.account import Account
 from app.schemas.account import AccountBalanceRead, AccountRead
-from app.services.balance_service import get_account_balance
+from app.services.accounts import list_account_reads
+from app.services.balance_service import account_balance_read
+from app.services.data_versions import ACCOUNTS_SCOPE
+from app.services.response_cache import cached_json_response
 
 router = APIRouter(prefix="/api", tags=["accounts"])
 
 
 @router.get("/accounts", response_model=list[AccountRead])
 async def list_accounts(
+    request: Request,
     active_only: bool = Query(default=True),
     session: AsyncSession = Depends(get_session),
-) -> list[AccountRead]:
-    query = select(Account).order_by(Account.is_active.desc(), Account.name.asc())
-    if active_only:
-        query = query.where(Account.is_active.is_(True))
+) -> Response:
+    async def build() -> list[AccountRead]:
+        return await list_account_reads(session, active_only=active_only)
 
-    rows = await session.scalars(query)
-    return [
-        AccountRead(
-            id=item.id,
-            name=item.name,
-            bank=item.bank,
-            currency=item.currency,
-            is_active=item.is_active,
-            created_at=item.created_at,
-        )
-        for item in rows.all()
-    ]
+    return await cached_json_response(request, session, [ACCOUNTS_SCOPE], list[AccountRead], build)
 
 
 @router.get("/accounts/{account_id}/balance", response_model=AccountBalanceRead)
@@ -47,23 +38,11 @@ async def get_account_balance_endpoint(
     if account is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Счет не найден")
 
-    result = await get_account_balance(
-        session=session,
+    return await account_balance_read(
+        session,
         account_id=account_id,
+        account_currency=account.currency,
         from_date=from_date,
         to_date=to_date,
         include_pending=include_pending,
     )
-    return AccountBalanceRead(
-        account_id=result.account_id,
-        currency=result.currency or account.currency,
-        from_date=result.from_date,
-        to_date=result.to_date,
-        opening_balance=result.opening_balance,
-        calculated_closing_balance=result.calculated_closing_balance,
-        available_balance=result.available_balance,
-        statement_closing_balance=result.statement_closing_balance,
-        diff=result.diff,
-        pending_total=result.pending_total,
-        warning=result.warning,
-    )
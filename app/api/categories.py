@@ -1,24 +1,25 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
-from app.models.category import Category
 from app.models.enums import TransactionType
 from app.schemas.category import CategoryRead
+from app.services.categories import list_category_reads
+from app.services.data_versions import CATEGORIES_SCOPE
+from app.services.response_cache import cached_json_response
 
 router = APIRouter(prefix="/api", tags=["categories"])
 
 
 @router.get("/categories", response_model=list[CategoryRead])
 async def list_categories(
+    request: Request,
     type: TransactionType | None = Query(default=None),
     session: AsyncSession = Depends(get_session),
-) -> list[CategoryRead]:
-    query = select(Category).order_by(Category.type.asc(), Category.name.asc())
-    if type is not None:
-        query = query.where(Category.type == type)
+) -> Response:
+    async def build() -> list[CategoryRead]:
+        return await list_category_reads(session, type)
 
-    rows = await session.scalars(query)
-    categories = rows.all()
-    return [CategoryRead(id=item.id, name=item.name, type=item.type) for item in categories]
+    return await cached_json_response(
+        request, session, [CATEGORIES_SCOPE], list[CategoryRead], build
+    )
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_session
+from app.models.transaction import Transaction
+from app.schemas.changes import ChangeRead, ChangesResponse
+from app.services.change_journal import (
+    CURSOR_PATTERN,
+    MAX_CHANGES_PAGE,
+    TRANSACTIONS_TABLE,
+    ChangeCursor,
+    changed_row_ids,
+    get_change_cursor,
+    read_changes,
+)
+from app.services.transactions import (
+    TRANSACTION_LIST_COLUMNS,
+    get_references_for,
+    serialize_transaction,
+)
+
+router = APIRouter(prefix="/api", tags=["changes"])
+
+
+@router.get("/changes", response_model=ChangesResponse)
+async def list_changes(
+    since: str | None = Query(
+        default=None, pattern=CURSOR_PATTERN, description="cursor из прошлого ответа"
+    ),
+    limit: int = Query(default=1000, ge=1, le=MAX_CHANGES_PAGE),
+    session: AsyncSession = Depends(get_session),
+) -> ChangesResponse:
+    # Without `since` only the current position is returned; clients take it
+    # before a full load and then ask for what changed after it.
+    if since is None:
+        return ChangesResponse(
+            cursor=(await get_change_cursor(session)).encode(),
+            reset=False,
+            has_more=False,
+            changes=[],
+            transactions=[],
+        )
+
+    batch = await read_changes(session, ChangeCursor.decode(since), limit)
+    transactions = []
+    present_ids, _ = changed_row_ids(batch.entries, TRANSACTIONS_TABLE)
+    if present_ids:
+        rows = (
+            await session.execute(
+                select(*TRANSACTION_LIST_COLUMNS).where(Transaction.id.in_(present_ids))
+            )
+        ).all()
+        refs = await get_references_for(session, rows)
+        transactions = [serialize_transaction(row, refs) for row in rows]
+
+    return ChangesResponse(
+        cursor=batch.cursor.encode(),
+        reset=batch.reset,
+        has_more=batch.has_more,
+        changes=[
+            ChangeRead(seq=entry.seq, table=entry.table_name, id=entry.row_id, op=entry.op)
+            for entry in batch.entries
+        ],
+        transactions=transactions,
+    )
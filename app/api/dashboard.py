@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_session
+from app.schemas.dashboard import DashboardResponse
+from app.services.dashboard import load_dashboard
+from app.services.month import resolve_month_window
+from app.services.reference_cache import get_reference_data
+
+router = APIRouter(prefix="/api", tags=["dashboard"])
+
+
+@router.get("/dashboard", response_model=DashboardResponse)
+async def dashboard(
+    month: str | None = Query(default=None, description="Месяц в формате YYYY-MM"),
+    account_id: int | None = Query(default=None, ge=1),
+    balance_account_id: int | None = Query(default=None, ge=1),
+    include_pending: bool = Query(default=False),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    try:
+        month_start, month_end, _ = resolve_month_window(month)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
+
+    # Same default as the UI: the filtered account, otherwise the first active one.
+    refs = await get_reference_data(
+        session, account_ids=[balance_account_id] if balance_account_id is not None else []
+    )
+    if balance_account_id is not None and balance_account_id not in refs.accounts:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Счет не найден")
+    balance_account = refs.accounts.get(balance_account_id or account_id or 0)
+    if balance_account is None and balance_account_id is None and account_id is None:
+        balance_account = min(
+            (item for item in refs.accounts.values() if item.is_active),
+            key=lambda item: item.name,
+            default=None,
+        )
+
+    body = await load_dashboard(
+        session,
+        month_start,
+        month_end,
+        account_id=account_id,
+        balance_account=balance_account,
+        include_pending=include_pending,
+    )
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,39 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.db.settings import get_settings
+from app.services.events import Event, event_bus, event_listener
+
+router = APIRouter(prefix="/api", tags=["events"])
+
+
+@router.get("/events")
+async def stream_events() -> StreamingResponse:
+    event_listener.start()
+    subscription = event_bus.subscribe()
+    keepalive = get_settings().events_keepalive_seconds
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    yield Event(name="overflow").encode()
+                    return
+                yield event.encode()
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    # Not compressed: CompressionMiddleware (app/main.py) passes event streams through.
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
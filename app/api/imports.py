@@ -1,17 +1,103 @@
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-from sqlalchemy import delete
+import asyncio
+import hashlib
+import shutil
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import BinaryIO, NoReturn
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
+from app.db.settings import get_settings
 from app.models.account import Account
+from app.models.enums import TransactionSource
 from app.models.statement_import import StatementImport
-from app.models.transaction import Transaction
-from app.schemas.imports import PDFImportResponse
-from app.services.pdf_import_service import import_pdf_statement
+from app.schemas.imports import ImportPreviewResponse, ImportPreviewRow, PDFImportResponse
+from app.services.account_locks import lock_accounts
+from app.services.events import notify_event
+from app.services.import_limits import ImportLimitExceeded, import_slots
+from app.services.import_previews import ImportPreview, preview_cache
+from app.services.import_rollback import (
+    ImportRolledBack,
+    ensure_not_rolled_back,
+    has_transactions,
+    rollback_statement_import,
+)
+from app.services.pdf_import_service import (
+    PARSER_VERSION,
+    PDFImportResult,
+    categorize_rows,
+    find_new_rows,
+    import_pdf_statement,
+    parse_pdf_statement,
+    save_statement_rows,
+    summarize_statement,
+)
+from app.services.reference_cache import get_reference_data
+from app.services.statement_store import statement_store
+from app.services.tabular_import_service import TABLE_PARSER_VERSION, import_table_statement
 
 router = APIRouter(prefix="/api/import", tags=["import"])
 rollback_router = APIRouter(prefix="/api/imports", tags=["import"])
 
+TABLE_EXTENSIONS = {
+    TransactionSource.IMPORT_CSV: ".csv",
+    TransactionSource.IMPORT_XLSX: ".xlsx",
+}
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# PDF allows a little junk before the header, so the magic is looked for in
+# the first kilobyte rather than only at offset zero.
+MAGIC_SEARCH_BYTES = 1024
+PDF_MAGIC = b"%PDF"
+XLSX_MAGIC = b"PK\x03\x04"
+
+
+async def _inspect_upload(file: UploadFile, magic: bytes | None, label: str) -> str:
+    # The multipart parser has already spooled the upload to a temp file; it is
+    # hashed and checked in chunks from there and handed to the parser as a
+    # file, so concurrent large uploads don't each hold a copy in memory.
+    max_bytes = get_settings().import_max_upload_bytes
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Файл больше {max_bytes // (1024 * 1024)} МБ",
+    )
+    if file.size is not None and file.size > max_bytes:
+        raise too_large
+
+    digest = hashlib.sha256()
+    size = 0
+    await file.seek(0)
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        if size == 0 and magic is not None and magic not in chunk[:MAGIC_SEARCH_BYTES]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Файл не похож на {label}",
+            )
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest()
+
+
+async def _store_upload(file: BinaryIO, file_sha256: str) -> str:
+    # Kept so the statement can be parsed again after a parser fix.
+    return await asyncio.to_thread(statement_store.put, file, file_sha256)
+
+
+def _copy_upload(file: BinaryIO) -> BinaryIO:
+    # The upload's own temp file is closed with the request; a preview keeps
+    # an unnamed copy that is removed as soon as it is closed.
+    copy = tempfile.TemporaryFile()  # noqa: SIM115
+    file.seek(0)
+    shutil.copyfileobj(file, copy, UPLOAD_CHUNK_SIZE)
+    copy.seek(0)
+    return copy
+
 
 @router.post("/pdf-statement", response_model=PDFImportResponse)
 async def import_pdf_statement_endpoint(
@@ -29,28 +115,266 @@ async def import_pdf_statement_endpoint(
     if account is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Счет не найден")
 
-    file_bytes = await file.read()
+    file_sha256 = await _inspect_upload(file, PDF_MAGIC, "PDF")
     statement_import = StatementImport(
         source="pdf",
         filename=filename or None,
+        file_sha256=file_sha256,
+        blob_key=await _store_upload(file.file, file_sha256),
+        parser_version=PARSER_VERSION,
         account_id=account_id,
+        status="processing",
     )
     session.add(statement_import)
     await session.flush()
 
+    # Limits are hit while parsing, before the first chunk of rows is written
+    # and committed.
+    async with _failed_on_error(session, statement_import):
+        try:
+            async with import_slots:
+                result = await import_pdf_statement(
+                    session=session,
+                    file=file.file,
+                    statement_import=statement_import,
+                )
+        except ImportRolledBack:
+            await _stop_rolled_back(session)
+        except ImportLimitExceeded as exc:
+            return await _fail_import(session, statement_import, str(exc))
+        except ValueError as exc:
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+            ) from exc
+        if result.account_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Не удалось определить счет",
+            )
+
+        return await _finish_import(session, statement_import, result)
+
+
+@router.post("/pdf-statement/preview", response_model=ImportPreviewResponse)
+async def preview_pdf_statement_endpoint(
+    file: UploadFile = File(...),
+    account_id: int = Form(...),
+    session: AsyncSession = Depends(get_session),
+) -> ImportPreviewResponse:
+    filename = file.filename or ""
+    if not filename.lower().endswith(".pdf"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Поддерживаются только PDF-файлы",
+        )
+    account = await session.get(Account, account_id)
+    if account is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Счет не найден")
+
+    file_sha256 = await _inspect_upload(file, PDF_MAGIC, "PDF")
     try:
-        result = await import_pdf_statement(
-            session=session,
-            file_bytes=file_bytes,
-            account_id=account_id,
-            import_id=statement_import.id,
+        async with import_slots:
+            parsed = await parse_pdf_statement(session, file.file, account_id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
+
+    # Nothing is written: the parse result is kept in memory and the confirm
+    # step saves exactly these rows without reading the PDF again.
+    rows, skipped = await find_new_rows(session, parsed.rows)
+    refs = await get_reference_data(session)
+    categorize_rows(refs, rows)
+    summary = summarize_statement(parsed, inserted=0, skipped=skipped, errors=parsed.errors)
+    preview = ImportPreview(
+        parsed=parsed,
+        rows=rows,
+        skipped=skipped,
+        filename=filename or None,
+        file_sha256=file_sha256,
+        upload=await asyncio.to_thread(_copy_upload, file.file),
+    )
+    try:
+        token = preview_cache.put(preview)
+    except ValueError as exc:
+        preview.discard()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
+    # Expired previews are otherwise only dropped on the next preview or
+    # confirm and keep their upload copy open until then; the extra second
+    # covers the loop running timers slightly early.
+    asyncio.get_running_loop().call_later(
+        preview_cache.ttl_seconds + 1, preview_cache.evict_expired
+    )
+
+    return ImportPreviewResponse(
+        token=token,
+        expires_in=int(preview_cache.ttl_seconds),
+        account_id=account_id,
+        bank_type=parsed.metadata.bank_type,
+        period_from=summary.period_from,
+        period_to=summary.period_to,
+        currency=summary.currency,
+        opening_balance=summary.opening_balance,
+        closing_balance=summary.closing_balance,
+        pending_balance=summary.pending_balance,
+        rows_total=summary.rows_total,
+        new=len(rows),
+        skipped=skipped,
+        errors=summary.errors,
+        rows=[
+            ImportPreviewRow(
+                tx_date=row.tx_date,
+                description=row.description,
+                amount=row.amount,
+                signed_amount=row.signed_amount,
+                currency=row.currency,
+                type=row.tx_type,
+                status=row.status,
+                category_id=row.category_id,
+                category_name=(
+                    refs.categories[row.category_id].name
+                    if row.category_id in refs.categories
+                    else None
+                ),
+            )
+            for row in rows
+        ],
+    )
+
+
+@router.post("/pdf-statement/confirm", response_model=PDFImportResponse)
+async def confirm_pdf_statement_endpoint(
+    token: str = Query(..., min_length=1),
+    session: AsyncSession = Depends(get_session),
+) -> PDFImportResponse:
+    preview = preview_cache.pop(token)
+    if preview is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Предпросмотр не найден или устарел",
+        )
+    try:
+        account_id = preview.parsed.account_id
+        account = await session.get(Account, account_id)
+        if account is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Счет не найден")
+        blob_key = await _store_upload(preview.upload, preview.file_sha256)
+    finally:
+        preview.discard()
+
+    statement_import = StatementImport(
+        source="pdf",
+        filename=preview.filename,
+        file_sha256=preview.file_sha256,
+        blob_key=blob_key,
+        parser_version=PARSER_VERSION,
+        account_id=account_id,
+        status="processing",
+    )
+    session.add(statement_import)
+    await session.flush()
+
+    # Rows imported by someone else since the preview are skipped here too.
+    async with _failed_on_error(session, statement_import):
+        try:
+            async with import_slots:
+                rows, skipped = await find_new_rows(session, preview.rows)
+                result = await save_statement_rows(
+                    session,
+                    preview.parsed,
+                    rows,
+                    preview.skipped + skipped,
+                    statement_import,
+                )
+        except ImportRolledBack:
+            await _stop_rolled_back(session)
+        return await _finish_import(session, statement_import, result)
+
+
+async def _import_table(
+    file: UploadFile,
+    account_id: int,
+    source: TransactionSource,
+    session: AsyncSession,
+) -> PDFImportResponse:
+    filename = file.filename or ""
+    extension = TABLE_EXTENSIONS[source]
+    if not filename.lower().endswith(extension):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Поддерживаются только {extension[1:].upper()}-файлы",
         )
+    account = await session.get(Account, account_id)
+    if account is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Счет не найден")
+
+    magic = XLSX_MAGIC if source == TransactionSource.IMPORT_XLSX else None
+    file_sha256 = await _inspect_upload(file, magic, extension[1:].upper())
+    statement_import = StatementImport(
+        source=extension[1:],
+        filename=filename or None,
+        file_sha256=file_sha256,
+        blob_key=await _store_upload(file.file, file_sha256),
+        parser_version=TABLE_PARSER_VERSION,
+        account_id=account_id,
+    )
+    session.add(statement_import)
+    await session.flush()
+
+    try:
+        async with import_slots, session.begin_nested():
+            result = await import_table_statement(
+                session=session,
+                file=file.file,
+                source=source,
+                account_id=account_id,
+                import_id=statement_import.id,
+            )
+    except ImportLimitExceeded as exc:
+        return await _fail_import(session, statement_import, str(exc))
     except ValueError as exc:
         await session.rollback()
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
-    if result.account_id is None:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Не удалось определить счет")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
+
+    return await _finish_import(session, statement_import, result)
+
+
+@router.post("/csv-statement", response_model=PDFImportResponse)
+async def import_csv_statement_endpoint(
+    file: UploadFile = File(...),
+    account_id: int = Form(...),
+    session: AsyncSession = Depends(get_session),
+) -> PDFImportResponse:
+    return await _import_table(file, account_id, TransactionSource.IMPORT_CSV, session)
+
 
+@router.post("/xlsx-statement", response_model=PDFImportResponse)
+async def import_xlsx_statement_endpoint(
+    file: UploadFile = File(...),
+    account_id: int = Form(...),
+    session: AsyncSession = Depends(get_session),
+) -> PDFImportResponse:
+    return await _import_table(file, account_id, TransactionSource.IMPORT_XLSX, session)
+
+
+async def _finish_import(
+    session: AsyncSession,
+    statement_import: StatementImport,
+    result: PDFImportResult,
+) -> PDFImportResponse:
+    if statement_import.status == "processing":
+        # A rollback that ran after the last chunk must not be overwritten.
+        await lock_accounts(session, [statement_import.account_id])
+        try:
+            await ensure_not_rolled_back(session, statement_import)
+        except ImportRolledBack:
+            await _stop_rolled_back(session)
+    statement_import.status = "completed"
     statement_import.currency = result.currency
     statement_import.period_from = result.period_from
     statement_import.period_to = result.period_to
@@ -60,6 +384,17 @@ async def import_pdf_statement_endpoint(
     statement_import.rows_total = result.rows_total
     statement_import.inserted = result.inserted
     statement_import.skipped = result.skipped
+    await notify_event(
+        session,
+        "import",
+        {
+            "import_id": statement_import.id,
+            "account_id": statement_import.account_id,
+            "stage": "finished",
+            "inserted": result.inserted,
+            "skipped": result.skipped,
+        },
+    )
     await session.commit()
 
     return PDFImportResponse(
@@ -71,6 +406,83 @@ async def import_pdf_statement_endpoint(
     )
 
 
+@asynccontextmanager
+async def _failed_on_error(
+    session: AsyncSession, statement_import: StatementImport
+) -> AsyncIterator[None]:
+    # Chunks are committed one by one, so an unexpected error, a dropped
+    # connection or a cancelled request can leave committed rows behind. The
+    # import is then marked failed in a fresh transaction (the request's may be
+    # broken), so the partial rows stay visible and can be rolled back.
+    import_id = statement_import.id
+    account_id = statement_import.account_id
+    try:
+        yield
+    except HTTPException:
+        raise
+    except (Exception, asyncio.CancelledError) as exc:
+        error = f"Импорт прерван: {exc or type(exc).__name__}"
+        # Releases the chunk's row and account locks before the update below.
+        with suppress(Exception):
+            await session.rollback()
+        async with AsyncSession(session.bind) as failure_session:
+            await failure_session.execute(
+                update(StatementImport)
+                .where(StatementImport.id == import_id, StatementImport.status == "processing")
+                .values(status="failed", error=error)
+            )
+            await notify_event(
+                failure_session,
+                "import",
+                {
+                    "import_id": import_id,
+                    "account_id": account_id,
+                    "stage": "failed",
+                    "error": error,
+                },
+            )
+            await failure_session.commit()
+        raise
+
+
+async def _stop_rolled_back(session: AsyncSession) -> NoReturn:
+    # The rows saved so far are already gone with the rollback.
+    await session.rollback()
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT, detail="Импорт отменен во время загрузки"
+    )
+
+
+async def _fail_import(
+    session: AsyncSession,
+    statement_import: StatementImport,
+    error: str,
+) -> PDFImportResponse:
+    # No rows were written for a rejected statement; the import itself is
+    # kept as failed so the rejected upload stays visible.
+    statement_import.status = "failed"
+    statement_import.error = error
+    await notify_event(
+        session,
+        "import",
+        {
+            "import_id": statement_import.id,
+            "account_id": statement_import.account_id,
+            "stage": "failed",
+            "error": error,
+        },
+    )
+    await session.commit()
+
+    return PDFImportResponse(
+        import_id=statement_import.id,
+        rows_total=0,
+        inserted=0,
+        skipped=0,
+        errors=[error],
+    )
+
+
 @rollback_router.post("/{import_id}/rollback")
 async def rollback_import(
     import_id: int,
@@ -80,7 +492,26 @@ async def rollback_import(
     if statement_import is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Импорт не найден")
 
-    result = await session.execute(delete(Transaction).where(Transaction.import_id == import_id))
-    deleted = result.rowcount or 0
+    # A rolled back import with rows left is an interrupted rollback and is
+    # finished here.
+    if statement_import.status == "rolled_back" and not await has_transactions(
+        session, import_id
+    ):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Импорт уже отменен")
+
+    result = await rollback_statement_import(
+        session, statement_import, get_settings().import_rollback_chunk_size
+    )
+    await notify_event(
+        session,
+        "import",
+        {
+            "import_id": import_id,
+            "account_id": statement_import.account_id,
+            "stage": "rolled_back",
+            "deleted": result.deleted,
+            "unpaired": result.unpaired,
+        },
+    )
     await session.commit()
-    return {"import_id": import_id, "deleted": deleted}
+    return {"import_id": import_id, "deleted": result.deleted, "unpaired": result.unpaired}
@@ -1,70 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
-from app.models.category import Category
-from app.models.enums import TransactionKind, TransactionStatus
-from app.models.transaction import Transaction
-from app.schemas.report import CategoryBreakdownItem, MonthlyReportResponse
-from app.services.month import resolve_month_window
-from app.services.reporting import KindAmount, summarize_kind_amounts
+from app.schemas.report import (
+    CategoryTrendPoint,
+    CategoryTrendSeries,
+    MonthlyReportResponse,
+    TrendMonthItem,
+    TrendReportResponse,
+)
+from app.services.data_versions import CATEGORIES_SCOPE, transactions_scope
+from app.services.month import resolve_month_range, resolve_month_window
+from app.services.reporting import get_trend_report, monthly_report_read
+from app.services.response_cache import cached_json_response
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
 
 @router.get("/monthly", response_model=MonthlyReportResponse)
 async def monthly_report(
+    request: Request,
     month: str | None = Query(default=None, description="Месяц в формате YYYY-MM"),
     account_id: int | None = Query(default=None, ge=1),
     session: AsyncSession = Depends(get_session),
-) -> MonthlyReportResponse:
+) -> Response:
     try:
-        month_start, month_end, _ = resolve_month_window(month)
+        month_start, _, _ = resolve_month_window(month)
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
 
-    base_filters = [Transaction.tx_date >= month_start, Transaction.tx_date < month_end]
-    if account_id is not None:
-        base_filters.append(Transaction.account_id == account_id)
+    async def build() -> MonthlyReportResponse:
+        return await monthly_report_read(session, month_start, account_id=account_id)
 
-    posted_filters = [*base_filters, Transaction.status == TransactionStatus.POSTED]
+    scopes = [transactions_scope(account_id, month_start.strftime("%Y-%m")), CATEGORIES_SCOPE]
+    return await cached_json_response(request, session, scopes, MonthlyReportResponse, build)
 
-    amount_rows = await session.execute(
-        select(Transaction.kind, Transaction.signed_amount).where(*posted_filters)
-    )
-    total_income, total_expense, total_transfers = summarize_kind_amounts(
-        [KindAmount(kind=kind, signed_amount=signed_amount) for kind, signed_amount in amount_rows.all()]
-    )
 
-    category_rows = await session.execute(
-        select(Category.name, func.coalesce(func.sum(Transaction.amount), 0))
-        .join(Transaction, Transaction.category_id == Category.id)
-        .where(
-            *posted_filters,
-            Transaction.kind == TransactionKind.EXPENSE,
-        )
-        .group_by(Category.name)
-        .order_by(func.sum(Transaction.amount).desc())
-    )
-
-    breakdown = [
-        CategoryBreakdownItem(category=name, total=total)
-        for name, total in category_rows.all()
-    ]
+@router.get("/trend", response_model=TrendReportResponse)
+async def trend_report(
+    from_month: str = Query(alias="from", description="Первый месяц в формате YYYY-MM"),
+    to_month: str = Query(alias="to", description="Последний месяц в формате YYYY-MM"),
+    account_id: int | None = Query(default=None, ge=1),
+    session: AsyncSession = Depends(get_session),
+) -> TrendReportResponse:
+    try:
+        range_start, range_end = resolve_month_range(from_month, to_month)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
 
-    total_pending = await session.scalar(
-        select(func.coalesce(func.sum(func.abs(Transaction.signed_amount)), 0)).where(
-            *base_filters,
-            Transaction.status == TransactionStatus.PENDING,
-        )
-    )
+    report = await get_trend_report(session, range_start, range_end, account_id=account_id)
 
-    return MonthlyReportResponse(
-        total_income=total_income,
-        total_expense=total_expense,
-        total_transfers=total_transfers,
-        total_pending=total_pending or 0,
-        balance=total_income - total_expense,
-        breakdown_by_category=breakdown,
+    return TrendReportResponse(
+        from_month=range_start.strftime("%Y-%m"),
+        to_month=range_end.strftime("%Y-%m"),
+        months=[
+            TrendMonthItem(
+                month=item.month.strftime("%Y-%m"),
+                total_income=item.total_income,
+                total_expense=item.total_expense,
+                total_transfers=item.total_transfers,
+                balance=item.total_income - item.total_expense,
+                income_delta=item.income_delta,
+                expense_delta=item.expense_delta,
+                transfers_delta=item.transfers_delta,
+            )
+            for item in report.months
+        ],
+        categories=[
+            CategoryTrendSeries(
+                category=category,
+                points=[
+                    CategoryTrendPoint(
+                        month=point.month.strftime("%Y-%m"),
+                        total=point.total,
+                        delta=point.delta,
+                    )
+                    for point in points
+                ],
+            )
+            for category, points in report.categories.items()
+        ],
     )
@@ -1,9 +1,8 @@
 import datetime as dt
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.db.session import get_session
 from app.models.category import Category
@@ -12,16 +11,20 @@ from app.models.enums import TransactionKind, TransactionStatus, TransactionType
 from app.models.transaction import Transaction
 from app.schemas.rule import RuleApplyResponse, RuleCreate, RuleRead, RuleUpdate
 from app.services.categorization_service import find_category_for
+from app.services.data_versions import CATEGORIES_SCOPE, RULES_SCOPE
 from app.services.month import resolve_month_window
+from app.services.reference_cache import invalidate_reference_data
+from app.services.response_cache import cached_json_response
 
 router = APIRouter(prefix="/api", tags=["rules"])
 
 
 @router.get("/rules", response_model=list[RuleRead])
 async def list_rules(
+    request: Request,
     type: TransactionType | None = Query(default=None),
     session: AsyncSession = Depends(get_session),
-) -> list[RuleRead]:
+) -> Response:
     query = (
         select(CategoryRule, Category)
         .join(Category, CategoryRule.category_id == Category.id)
@@ -31,23 +34,27 @@ async def list_rules(
     if type is not None:
         query = query.where(Category.type == type)
 
-    rows = await session.execute(query)
-    response: list[RuleRead] = []
-    for rule, category in rows.all():
-        response.append(
-            RuleRead(
-                id=rule.id,
-                pattern=rule.pattern,
-                match_type=rule.match_type,
-                category_id=rule.category_id,
-                category_name=category.name,
-                category_type=category.type.value,
-                priority=rule.priority,
-                is_active=rule.is_active,
-                created_at=rule.created_at,
+    async def build() -> list[RuleRead]:
+        rows = await session.execute(query)
+        response: list[RuleRead] = []
+        for rule, category in rows.all():
+            response.append(
+                RuleRead(
+                    id=rule.id,
+                    pattern=rule.pattern,
+                    match_type=rule.match_type,
+                    category_id=rule.category_id,
+                    category_name=category.name,
+                    category_type=category.type.value,
+                    priority=rule.priority,
+                    is_active=rule.is_active,
+                    created_at=rule.created_at,
+                )
             )
-        )
-    return response
+        return response
+
+    scopes = [RULES_SCOPE, CATEGORIES_SCOPE]
+    return await cached_json_response(request, session, scopes, list[RuleRead], build)
 
 
 @router.post("/rules", response_model=RuleRead, status_code=status.HTTP_201_CREATED)
@@ -65,6 +72,7 @@ async def create_rule(payload: RuleCreate, session: AsyncSession = Depends(get_s
     )
     session.add(rule)
     await session.commit()
+    invalidate_reference_data()
     await session.refresh(rule)
 
     return RuleRead(
@@ -106,6 +114,7 @@ async def update_rule(
         rule.category_id = payload.category_id
 
     await session.commit()
+    invalidate_reference_data()
 
     row = await session.execute(
         select(CategoryRule, Category)
@@ -138,6 +147,7 @@ async def delete_rule(rule_id: int, session: AsyncSession = Depends(get_session)
 
     await session.delete(rule)
     await session.commit()
+    invalidate_reference_data()
     return {"status": "ok"}
 
 
@@ -168,7 +178,6 @@ async def apply_rules_to_transactions(
 
     rows = await session.scalars(
         select(Transaction)
-        .options(selectinload(Transaction.category))
         .where(*filters)
         .order_by(Transaction.id.asc())
     )
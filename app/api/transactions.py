@@ -1,35 +1,79 @@
 import datetime as dt
+from decimal import Decimal
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import case, delete, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.db.session import get_session
-from app.models.category import Category
 from app.models.enums import TransactionKind, TransactionSource, TransactionStatus, TransactionType
 from app.models.transaction import Transaction
 from app.schemas.transaction import (
+    BatchCreateResponse,
+    BatchItemResult,
+    BulkDeleteResponse,
+    QuickAddBatchRequest,
     QuickAddRequest,
+    TransactionBulkDelete,
+    TransactionBulkUpdate,
     TransactionCreate,
     TransactionDebugRead,
     TransactionRead,
     TransactionUpdate,
 )
 from app.services.accounts import resolve_account_id
-from app.services.categorization_service import apply_category
+from app.services.categorization_service import find_category_for
+from app.services.data_versions import ACCOUNTS_SCOPE, CATEGORIES_SCOPE, transactions_scope
 from app.services.month import resolve_month_window
-from app.services.quick_add import parse_quick_add_text
-from app.services.transactions import serialize_transaction
+from app.services.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.services.quick_add import parse_quick_add_text, split_quick_add_lines
+from app.services.reference_cache import get_reference_data
+from app.services.response_cache import CachedPayload, cached_json_response
+from app.services.transaction_batches import (
+    MAX_BATCH_SIZE,
+    BatchEntry,
+    BatchResult,
+    create_transactions_batch,
+)
+from app.services.transaction_export import ExportFormat, stream_transactions_export
+from app.services.transaction_raw import load_raw_payload
+from app.services.transactions import (
+    TRANSACTION_LIST_COLUMNS,
+    encode_transaction_row,
+    encode_transaction_rows,
+    get_references_for,
+    insert_transaction,
+    serialize_transaction,
+    transaction_filters,
+)
 
 router = APIRouter(prefix="/api", tags=["transactions"])
 
 
+def _batch_response(result: BatchResult, indexes: list[int]) -> BatchCreateResponse:
+    results = []
+    for index in indexes:
+        row = result.rows.get(index)
+        results.append(
+            BatchItemResult(
+                index=index,
+                transaction=serialize_transaction(row, result.refs) if row is not None else None,
+                error=result.errors.get(index),
+            )
+        )
+    return BatchCreateResponse(
+        created=len(result.rows), failed=len(result.errors), results=results
+    )
+
+
 @router.post("/quick-add", response_model=TransactionRead, status_code=status.HTTP_201_CREATED)
 async def quick_add_transaction(
     payload: QuickAddRequest,
     session: AsyncSession = Depends(get_session),
-) -> TransactionRead:
+) -> Response:
     try:
         parsed = parse_quick_add_text(payload.text)
     except ValueError as exc:
@@ -40,98 +84,209 @@ async def quick_add_transaction(
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Счет не найден") from exc
 
-    transaction = Transaction(
-        description=parsed.description,
-        amount=parsed.amount,
-        signed_amount=parsed.amount if parsed.tx_type == TransactionType.INCOME else -parsed.amount,
-        currency=parsed.currency,
-        type=parsed.tx_type,
-        kind=TransactionKind(parsed.tx_type.value),
-        status=TransactionStatus.POSTED,
-        account_id=account_id,
-        category_id=0,
-        category_locked=False,
-        source=TransactionSource.MANUAL,
-        tx_date=dt.date.today(),
-    )
     try:
-        await apply_category(session, transaction)
+        category_id = await find_category_for(session, parsed.description, parsed.tx_type)
     except RuntimeError as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Ошибка автокатегоризации") from exc
 
-    session.add(transaction)
-    await session.commit()
+    row = await insert_transaction(
+        session,
+        {
+            "description": parsed.description,
+            "amount": parsed.amount,
+            "signed_amount": (
+                parsed.amount if parsed.tx_type == TransactionType.INCOME else -parsed.amount
+            ),
+            "currency": parsed.currency,
+            "type": parsed.tx_type,
+            "kind": TransactionKind(parsed.tx_type.value),
+            "status": TransactionStatus.POSTED,
+            "account_id": account_id,
+            "category_id": category_id,
+            "category_locked": False,
+            "source": TransactionSource.MANUAL,
+            "tx_date": dt.date.today(),
+        },
+    )
+    refs = await get_references_for(session, [row])
+    return Response(
+        content=encode_transaction_row(row, refs),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json",
+    )
+
 
-    saved_transaction = await session.scalar(
-        select(Transaction)
-        .options(
-            selectinload(Transaction.category),
-            selectinload(Transaction.account),
-            selectinload(Transaction.matched_account),
+@router.post("/quick-add/batch", response_model=BatchCreateResponse)
+async def quick_add_batch(
+    payload: QuickAddBatchRequest,
+    session: AsyncSession = Depends(get_session),
+) -> BatchCreateResponse:
+    lines = split_quick_add_lines(payload.text)
+    if not lines:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Текст не может быть пустым",
+        )
+    if len(lines) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Не больше {MAX_BATCH_SIZE} строк за запрос",
         )
-        .where(Transaction.id == transaction.id)
-    )
-    if saved_transaction is None:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Операция не найдена")
 
-    return serialize_transaction(saved_transaction)
+    entries = []
+    parse_errors = {}
+    for index, line in lines:
+        try:
+            parsed = parse_quick_add_text(line)
+        except ValueError as exc:
+            parse_errors[index] = str(exc)
+            continue
+        entries.append(
+            BatchEntry(
+                index=index,
+                description=parsed.description,
+                amount=parsed.amount,
+                tx_type=parsed.tx_type,
+                currency=parsed.currency,
+                account_id=payload.account_id,
+            )
+        )
+
+    result = await create_transactions_batch(session, entries)
+    result.errors.update(parse_errors)
+    return _batch_response(result, [index for index, _ in lines])
 
 
 @router.get("/transactions", response_model=list[TransactionRead])
 async def list_transactions(
+    request: Request,
     month: str | None = Query(default=None, description="Месяц в формате YYYY-MM"),
     account_id: int | None = Query(default=None, ge=1),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, description="Значение заголовка X-Next-Cursor"),
+    category_id: int | None = Query(default=None, ge=1),
+    kind: TransactionKind | None = Query(default=None),
+    tx_status: TransactionStatus | None = Query(default=None, alias="status"),
+    source: TransactionSource | None = Query(default=None),
+    import_id: int | None = Query(default=None, ge=1),
+    min_amount: Decimal | None = Query(default=None, ge=0),
+    max_amount: Decimal | None = Query(default=None, ge=0),
+    q: str | None = Query(default=None, min_length=1, max_length=100),
     session: AsyncSession = Depends(get_session),
-) -> list[TransactionRead]:
+) -> Response:
     try:
         month_start, month_end, _ = resolve_month_window(month)
+        after = decode_cursor(cursor) if cursor is not None else None
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    if min_amount is not None and max_amount is not None and min_amount > max_amount:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="min_amount не может быть больше max_amount",
+        )
 
-    filters = [Transaction.tx_date >= month_start, Transaction.tx_date < month_end]
-    if account_id is not None:
-        filters.append(Transaction.account_id == account_id)
-
-    result = await session.scalars(
-        select(Transaction)
-        .options(
-            selectinload(Transaction.category),
-            selectinload(Transaction.account),
-            selectinload(Transaction.matched_account),
+    filters = [
+        Transaction.tx_date >= month_start,
+        Transaction.tx_date < month_end,
+        *transaction_filters(
+            account_id=account_id,
+            category_id=category_id,
+            kind=kind,
+            status=tx_status,
+            source=source,
+            import_id=import_id,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            q=q,
+        ),
+    ]
+    if after is not None:
+        filters.append(tuple_(Transaction.tx_date, Transaction.id) < tuple_(*after))
+
+    async def build() -> CachedPayload:
+        # Account and category names come from the reference cache, so only the
+        # transaction columns are read and encoded straight to JSON.
+        query = (
+            select(*TRANSACTION_LIST_COLUMNS)
+            .where(*filters)
+            .order_by(Transaction.tx_date.desc(), Transaction.id.desc())
         )
-        .where(*filters)
-        .order_by(Transaction.tx_date.desc(), Transaction.id.desc())
+        if limit is not None:
+            query = query.limit(limit + 1)
+
+        rows = (await session.execute(query)).all()
+        headers = {}
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1].tx_date, rows[-1].id)
+        refs = await get_references_for(session, rows, revalidate=True)
+        return CachedPayload(content=encode_transaction_rows(rows, refs), headers=headers)
+
+    # Transfers render the matched account name, so the accounts scope is included.
+    scopes = [
+        transactions_scope(account_id, month_start.strftime("%Y-%m")),
+        ACCOUNTS_SCOPE,
+        CATEGORIES_SCOPE,
+    ]
+    return await cached_json_response(request, session, scopes, list[TransactionRead], build)
+
+
+@router.get("/transactions/export")
+async def export_transactions(
+    from_date: dt.date | None = Query(default=None, alias="from"),
+    to_date: dt.date | None = Query(default=None, alias="to"),
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    account_id: int | None = Query(default=None, ge=1),
+    category_id: int | None = Query(default=None, ge=1),
+    kind: TransactionKind | None = Query(default=None),
+    tx_status: TransactionStatus | None = Query(default=None, alias="status"),
+    source: TransactionSource | None = Query(default=None),
+    import_id: int | None = Query(default=None, ge=1),
+) -> StreamingResponse:
+    if from_date is not None and to_date is not None and from_date > to_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Начало периода должно быть не позже конца",
+        )
+
+    filters = transaction_filters(
+        account_id=account_id,
+        category_id=category_id,
+        kind=kind,
+        status=tx_status,
+        source=source,
+        import_id=import_id,
+    )
+    if from_date is not None:
+        filters.append(Transaction.tx_date >= from_date)
+    if to_date is not None:
+        filters.append(Transaction.tx_date <= to_date)
+
+    name_parts = ["transactions"]
+    name_parts += [item.isoformat() for item in (from_date, to_date) if item is not None]
+    filename = f"{'_'.join(name_parts)}.{export_format.value}"
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        stream_transactions_export(filters, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
-    transactions = result.all()
-    return [serialize_transaction(item) for item in transactions]
 
 
 @router.post("/transactions", response_model=TransactionRead, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
     payload: TransactionCreate,
     session: AsyncSession = Depends(get_session),
-) -> TransactionRead:
-    transaction = Transaction(
-        description=payload.description.strip(),
-        amount=payload.amount,
-        signed_amount=payload.amount if payload.type == TransactionType.INCOME else -payload.amount,
-        currency=payload.currency,
-        type=payload.type,
-        kind=TransactionKind(payload.type.value),
-        status=TransactionStatus.POSTED,
-        category_id=0,
-        account_id=0,
-        tx_date=payload.tx_date or dt.date.today(),
-        source=TransactionSource.MANUAL,
-        category_locked=False,
-    )
+) -> Response:
+    description = payload.description.strip()
     try:
-        transaction.account_id = await resolve_account_id(session, payload.account_id)
+        account_id = await resolve_account_id(session, payload.account_id)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Счет не найден") from exc
 
     if payload.category_id is not None:
-        category = await session.get(Category, payload.category_id)
+        refs = await get_reference_data(session, category_ids=[payload.category_id])
+        category = refs.categories.get(payload.category_id)
         if category is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Категория не найдена")
 
@@ -140,33 +295,191 @@ async def create_transaction(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Тип категории не совпадает с типом операции",
             )
-        transaction.category_id = payload.category_id
-        transaction.category_locked = True
+        category_id = payload.category_id
+        category_locked = True
     else:
         try:
-            await apply_category(session, transaction)
+            category_id = await find_category_for(session, description, payload.type)
         except RuntimeError as exc:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Ошибка автокатегоризации",
             ) from exc
+        category_locked = False
+
+    row = await insert_transaction(
+        session,
+        {
+            "description": description,
+            "amount": payload.amount,
+            "signed_amount": (
+                payload.amount if payload.type == TransactionType.INCOME else -payload.amount
+            ),
+            "currency": payload.currency,
+            "type": payload.type,
+            "kind": TransactionKind(payload.type.value),
+            "status": TransactionStatus.POSTED,
+            "account_id": account_id,
+            "category_id": category_id,
+            "category_locked": category_locked,
+            "source": TransactionSource.MANUAL,
+            "tx_date": payload.tx_date or dt.date.today(),
+        },
+    )
+    refs = await get_references_for(session, [row])
+    return Response(
+        content=encode_transaction_row(row, refs),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json",
+    )
+
 
-    session.add(transaction)
+@router.post("/transactions/bulk", response_model=BatchCreateResponse)
+async def create_transactions_bulk(
+    payload: list[dict[str, Any]] = Body(min_length=1, max_length=MAX_BATCH_SIZE),
+    session: AsyncSession = Depends(get_session),
+) -> BatchCreateResponse:
+    # Items are validated one by one so a bad item is reported without
+    # rejecting the rest of the batch.
+    entries = []
+    validation_errors = {}
+    for index, item in enumerate(payload):
+        try:
+            data = TransactionCreate.model_validate(item)
+        except ValidationError as exc:
+            first = exc.errors()[0]
+            field_name = ".".join(str(part) for part in first["loc"])
+            message = first["msg"]
+            validation_errors[index] = f"{field_name}: {message}" if field_name else message
+            continue
+        entries.append(
+            BatchEntry(
+                index=index,
+                description=data.description,
+                amount=data.amount,
+                tx_type=data.type,
+                currency=data.currency,
+                account_id=data.account_id,
+                category_id=data.category_id,
+                tx_date=data.tx_date,
+            )
+        )
+
+    result = await create_transactions_batch(session, entries)
+    result.errors.update(validation_errors)
+    return _batch_response(result, list(range(len(payload))))
+
+
+@router.patch("/transactions", response_model=list[TransactionRead])
+async def update_transactions_bulk(
+    payload: TransactionBulkUpdate,
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    if payload.category_id is None and payload.category_locked is None and payload.kind is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Нужно передать хотя бы одно поле: category_id, category_locked или kind",
+        )
+
+    ids = list(dict.fromkeys(payload.ids))
+    filters = [Transaction.id.in_(ids)]
+    values: dict[str, Any] = {}
+    # Same rules as the single PATCH, written as one UPDATE so the rollup and
+    # data_versions triggers run once for the whole selection.
+    if payload.category_id is not None:
+        refs = await get_reference_data(session, category_ids=[payload.category_id])
+        category = refs.categories.get(payload.category_id)
+        if category is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Категория не найдена"
+            )
+        filters.append(Transaction.type == category.type)
+        values["category_id"] = payload.category_id
+        if payload.category_locked is None:
+            values["category_locked"] = case(
+                (Transaction.category_id != payload.category_id, True),
+                else_=Transaction.category_locked,
+            )
+    if payload.category_locked is not None:
+        values["category_locked"] = payload.category_locked
+
+    if payload.kind is not None:
+        values.update(
+            kind=payload.kind,
+            transfer_pair_id=None,
+            matched_account_id=None,
+            match_confidence=100,
+        )
+        if payload.kind != TransactionKind.TRANSFER:
+            values["type"] = TransactionType(payload.kind.value)
+            income = payload.kind == TransactionKind.INCOME
+            values["signed_amount"] = Transaction.amount if income else -Transaction.amount
+
+    rows = (
+        await session.execute(
+            update(Transaction)
+            .where(*filters)
+            .values(**values)
+            .returning(*TRANSACTION_LIST_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+    if len(rows) < len(ids):
+        await session.rollback()
+        found = set(await session.scalars(select(Transaction.id).where(Transaction.id.in_(ids))))
+        missing = [item for item in ids if item not in found]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Операции не найдены: {', '.join(map(str, missing))}",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Тип категории не совпадает с типом операции",
+        )
     await session.commit()
 
-    saved_transaction = await session.scalar(
-        select(Transaction)
-        .options(
-            selectinload(Transaction.category),
-            selectinload(Transaction.account),
-            selectinload(Transaction.matched_account),
+    by_id = {row.id: row for row in rows}
+    rows = [by_id[item] for item in ids]
+    refs = await get_references_for(session, rows)
+    return Response(content=encode_transaction_rows(rows, refs), media_type="application/json")
+
+
+@router.delete("/transactions", response_model=BulkDeleteResponse)
+async def delete_transactions_bulk(
+    payload: TransactionBulkDelete,
+    session: AsyncSession = Depends(get_session),
+) -> BulkDeleteResponse:
+    if payload.ids is not None:
+        filters = [Transaction.id.in_(payload.ids)]
+    else:
+        filters = transaction_filters(
+            account_id=payload.account_id,
+            category_id=payload.category_id,
+            kind=payload.kind,
+            status=payload.status,
+            source=payload.source,
+            import_id=payload.import_id,
+        )
+        if payload.month is not None:
+            try:
+                month_start, month_end, _ = resolve_month_window(payload.month)
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+                ) from exc
+            filters += [Transaction.tx_date >= month_start, Transaction.tx_date < month_end]
+
+    deleted = list(
+        await session.scalars(
+            delete(Transaction)
+            .where(*filters)
+            .returning(Transaction.id)
+            .execution_options(synchronize_session=False)
         )
-        .where(Transaction.id == transaction.id)
     )
-    if saved_transaction is None:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Операция не найдена")
-
-    return serialize_transaction(saved_transaction)
+    await session.commit()
+    return BulkDeleteResponse(deleted=len(deleted), ids=sorted(deleted))
 
 
 @router.delete("/transactions/{transaction_id}")
@@ -197,8 +510,8 @@ async def transaction_debug(
         source=transaction.source,
         import_id=transaction.import_id,
         account_id=transaction.account_id,
-        raw=transaction.raw,
-        external_hash=transaction.external_hash,
+        raw=await load_raw_payload(session, transaction),
+        external_hash=transaction.external_hash.hex() if transaction.external_hash else None,
         created_at=transaction.created_at,
     )
 
@@ -209,15 +522,7 @@ async def update_transaction(
     payload: TransactionUpdate,
     session: AsyncSession = Depends(get_session),
 ) -> TransactionRead:
-    transaction = await session.scalar(
-        select(Transaction)
-        .options(
-            selectinload(Transaction.category),
-            selectinload(Transaction.account),
-            selectinload(Transaction.matched_account),
-        )
-        .where(Transaction.id == transaction_id)
-    )
+    transaction = await session.get(Transaction, transaction_id)
     if transaction is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Операция не найдена")
 
@@ -228,9 +533,9 @@ async def update_transaction(
         )
 
     category_changed = False
-    selected_category = transaction.category
     if payload.category_id is not None:
-        category = await session.get(Category, payload.category_id)
+        refs = await get_reference_data(session, category_ids=[payload.category_id])
+        category = refs.categories.get(payload.category_id)
         if category is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Категория не найдена")
         if category.type != transaction.type:
@@ -241,8 +546,6 @@ async def update_transaction(
 
         category_changed = payload.category_id != transaction.category_id
         transaction.category_id = payload.category_id
-        transaction.category = category
-        selected_category = category
 
     if payload.category_locked is not None:
         transaction.category_locked = payload.category_locked
@@ -254,14 +557,12 @@ async def update_transaction(
             transaction.kind = TransactionKind.TRANSFER
             transaction.transfer_pair_id = None
             transaction.matched_account_id = None
-            transaction.matched_account = None
             transaction.match_confidence = 100
         else:
             transaction.kind = payload.kind
             transaction.type = TransactionType(payload.kind.value)
             transaction.transfer_pair_id = None
             transaction.matched_account_id = None
-            transaction.matched_account = None
             transaction.match_confidence = 100
             transaction.signed_amount = (
                 transaction.amount
@@ -271,8 +572,5 @@ async def update_transaction(
 
     await session.commit()
 
-    if selected_category is None:
-        selected_category = await session.get(Category, transaction.category_id)
-    transaction.category = selected_category
-
-    return serialize_transaction(transaction)
+    refs = await get_references_for(session, [transaction])
+    return serialize_transaction(transaction, refs)
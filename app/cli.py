@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+
+from app.db.session import AsyncSessionLocal
+from app.db.settings import get_settings
+from app.services.change_journal import compact_change_journal
+from app.services.reparse import reparse_statements
+from app.services.rollups import rebuild_monthly_rollups
+
+
+async def _rebuild_rollups() -> None:
+    async with AsyncSessionLocal() as session:
+        rows = await rebuild_monthly_rollups(session)
+    print(f"monthly_rollups rebuilt: {rows} rows")
+
+
+async def _compact_changes(keep_days: int) -> None:
+    async with AsyncSessionLocal() as session:
+        rows = await compact_change_journal(session, keep_days)
+    print(f"change_journal compacted: {rows} entries removed")
+
+
+async def _reparse(apply: bool, workers: int | None, force: bool) -> None:
+    totals = {"imports": 0, "inserted": 0, "updated": 0, "deleted": 0, "failed": 0}
+    async with AsyncSessionLocal() as session:
+        async for report in reparse_statements(
+            session, apply=apply, workers=workers, force=force
+        ):
+            job = report.job
+            totals["imports"] += 1
+            if report.error is not None:
+                totals["failed"] += 1
+                print(f"import {job.import_id} ({job.source}): error: {report.error}")
+                continue
+            diff = report.diff
+            totals["inserted"] += len(diff.inserts)
+            totals["updated"] += len(diff.updates)
+            totals["deleted"] += len(diff.deletes)
+            line = (
+                f"import {job.import_id} ({job.source}): {report.rows} rows, "
+                f"+{len(diff.inserts)} ~{len(diff.updates)} -{len(diff.deletes)}"
+            )
+            if diff.kept:
+                line += f", {len(diff.kept)} paired kept"
+            print(line)
+    mode = "applied" if apply else "dry run, use --apply to write"
+    print(
+        f"reparse {mode}: {totals['imports']} imports, +{totals['inserted']} "
+        f"~{totals['updated']} -{totals['deleted']}, {totals['failed']} failed"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "rebuild-rollups", help="Пересчитать monthly_rollups по таблице transactions"
+    )
+    compact = commands.add_parser("compact-changes", help="Удалить старые записи change_journal")
+    compact.add_argument(
+        "--keep-days",
+        type=int,
+        default=get_settings().change_journal_retention_days,
+        help="Сколько дней истории оставить",
+    )
+
+    reparse = commands.add_parser(
+        "reparse", help="Разобрать сохраненные выписки заново текущим парсером"
+    )
+    reparse.add_argument("--apply", action="store_true", help="Записать исправления в БД")
+    reparse.add_argument(
+        "--workers", type=int, default=None, help="Число процессов разбора (по умолчанию по ядрам)"
+    )
+    reparse.add_argument(
+        "--all",
+        dest="force",
+        action="store_true",
+        help="Включить выписки, уже разобранные текущей версией парсера",
+    )
+
+    args = parser.parse_args()
+    if args.command == "rebuild-rollups":
+        asyncio.run(_rebuild_rollups())
+    elif args.command == "compact-changes":
+        asyncio.run(_compact_changes(args.keep_days))
+    elif args.command == "reparse":
+        asyncio.run(_reparse(args.apply, args.workers, args.force))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,24 @@ class Settings(BaseSettings):
     app_port: int = 8000
     database_url: str = "postgresql+asyncpg://postgres:postgres@db:5432/budget"
     seed_demo: bool = False
+    response_cache_max_entries: int = 256
+    reference_cache_ttl_seconds: float = 5.0
+    compression_min_size: int = 1024
+    change_journal_retention_days: int = 30
+    events_queue_size: int = 100
+    events_keepalive_seconds: float = 15.0
+    import_max_upload_bytes: int = 50 * 1024 * 1024
+    import_max_pages: int = 200
+    import_max_decompressed_bytes: int = 200 * 1024 * 1024
+    import_wall_seconds: float = 60.0
+    import_cpu_seconds: int = 30
+    import_chunk_size: int = 500
+    import_max_concurrent: int = 4
+    import_rollback_chunk_size: int = 1000
+    import_preview_ttl_seconds: float = 900.0
+    import_preview_max_bytes: int = 64 * 1024 * 1024
+    import_preview_max_upload_bytes: int = 256 * 1024 * 1024
+    statement_store_dir: str = "data/statements"
 
 
 @lru_cache
@@ -1,16 +1,24 @@
 from app.models.account import Account
 from app.models.category import Category
 from app.models.category_rule import CategoryRule
+from app.models.change_journal import ChangeJournalEntry
+from app.models.data_version import DataVersion
 from app.models.enums import RuleMatchType, TransactionKind, TransactionSource, TransactionStatus, TransactionType
+from app.models.monthly_rollup import MonthlyRollup
 from app.models.statement_import import StatementImport
 from app.models.transaction import Transaction
+from app.models.transaction_raw import TransactionRaw
 
 __all__ = [
     "Account",
     "Category",
     "CategoryRule",
+    "ChangeJournalEntry",
+    "DataVersion",
+    "MonthlyRollup",
     "StatementImport",
     "Transaction",
+    "TransactionRaw",
     "TransactionType",
     "TransactionKind",
     "TransactionSource",
@@ -0,0 +1,32 @@
+import datetime as dt
+
+from sqlalchemy import BigInteger, DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import UserDefinedType
+
+from app.db.base import Base
+
+
+class XID8(UserDefinedType):
+    cache_ok = True
+
+    def get_col_spec(self, **kw: object) -> str:
+        return "XID8"
+
+
+# Appended by statement-level triggers on every write (migration 20261019_0011).
+class ChangeJournalEntry(Base):
+    __tablename__ = "change_journal"
+
+    seq: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    table_name: Mapped[str] = mapped_column(String(32), nullable=False)
+    row_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    op: Mapped[str] = mapped_column(String(6), nullable=False)
+    changed_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    # Id of the writing transaction; readers go through the journal by
+    # (xid, seq) and stop at the oldest transaction still in progress.
+    xid: Mapped[str] = mapped_column(
+        XID8, nullable=False, server_default=func.pg_current_xact_id()
+    )
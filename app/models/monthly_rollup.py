@@ -0,0 +1,32 @@
+import datetime as dt
+from decimal import Decimal
+
+from sqlalchemy import Date, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.enums import (
+    TransactionKind,
+    TransactionStatus,
+    transaction_kind_enum,
+    transaction_status_enum,
+)
+
+
+# Maintained by statement-level triggers on `transactions` (migration 20261019_0007).
+class MonthlyRollup(Base):
+    __tablename__ = "monthly_rollups"
+
+    account_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[dt.date] = mapped_column(Date, primary_key=True)
+    category_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[TransactionKind] = mapped_column(transaction_kind_enum, primary_key=True)
+    status: Mapped[TransactionStatus] = mapped_column(transaction_status_enum, primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    total_amount: Mapped[Decimal] = mapped_column(
+        Numeric(16, 2), nullable=False, default=0, server_default="0"
+    )
+    outflow_amount: Mapped[Decimal] = mapped_column(
+        Numeric(16, 2), nullable=False, default=0, server_default="0"
+    )
+    tx_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
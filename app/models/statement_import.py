@@ -1,7 +1,7 @@
 import datetime as dt
 from decimal import Decimal
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, String, func
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -13,6 +13,11 @@ class StatementImport(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     source: Mapped[str] = mapped_column(String(32), nullable=False, default="pdf", server_default="pdf")
     filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    file_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Key of the original upload in the statement store and the parser version
+    # that produced the transactions; both are empty for older imports.
+    blob_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    parser_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
     account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id", ondelete="RESTRICT"), nullable=False)
     currency: Mapped[str | None] = mapped_column(String(3), nullable=True)
     period_from: Mapped[dt.date | None] = mapped_column(Date, nullable=True)
@@ -23,6 +28,10 @@ class StatementImport(Base):
     rows_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     inserted: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     skipped: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    status: Mapped[str] = mapped_column(
+        String(16), nullable=False, default="completed", server_default="completed"
+    )
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[dt.datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
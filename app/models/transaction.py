@@ -1,10 +1,9 @@
 import datetime as dt
 from decimal import Decimal
-from typing import Any
 from uuid import UUID
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Numeric, String, func
-from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+from sqlalchemy import Boolean, Date, DateTime, ForeignKey, LargeBinary, Numeric, String, func
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -47,8 +46,7 @@ class Transaction(Base):
         default=TransactionSource.MANUAL,
         server_default=TransactionSource.MANUAL.value,
     )
-    external_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, unique=True)
-    raw: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    external_hash: Mapped[bytes | None] = mapped_column(LargeBinary(16), nullable=True, unique=True)
     transfer_pair_id: Mapped[UUID | None] = mapped_column(PG_UUID(as_uuid=True), nullable=True)
     match_confidence: Mapped[int | None] = mapped_column(nullable=True)
     category_locked: Mapped[bool] = mapped_column(
@@ -0,0 +1,26 @@
+from typing import Any
+
+from sqlalchemy import BigInteger, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# Raw parser output for imported transactions, kept out of the hot
+# transactions table. One row holds a batch of consecutive transactions of
+# one import as {"<transaction id>": raw}; Postgres compresses the value in
+# TOAST, and it is only read by the debug endpoint.
+class TransactionRaw(Base):
+    __tablename__ = "transaction_raw"
+    __table_args__ = (
+        Index("idx_transaction_raw_import_first", "import_id", "first_transaction_id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    import_id: Mapped[int | None] = mapped_column(
+        ForeignKey("statement_imports.id", ondelete="CASCADE"), nullable=True
+    )
+    first_transaction_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_transaction_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    payloads: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
@@ -1,11 +1,26 @@
 from app.schemas.account import AccountBalanceRead, AccountRead
 from app.schemas.category import CategoryRead
-from app.schemas.imports import PDFImportResponse
-from app.schemas.report import CategoryBreakdownItem, MonthlyReportResponse
+from app.schemas.changes import ChangeRead, ChangesResponse
+from app.schemas.dashboard import DashboardResponse
+from app.schemas.imports import ImportPreviewResponse, ImportPreviewRow, PDFImportResponse
+from app.schemas.report import (
+    CategoryBreakdownItem,
+    CategoryTrendPoint,
+    CategoryTrendSeries,
+    MonthlyReportResponse,
+    TrendMonthItem,
+    TrendReportResponse,
+)
 from app.schemas.rule import RuleApplyResponse, RuleCreate, RuleRead, RuleUpdate
 from app.schemas.transfer import AutoPairRequest, AutoPairResponse, TransferPairRead, TransferPairTransaction
 from app.schemas.transaction import (
+    BatchCreateResponse,
+    BatchItemResult,
+    BulkDeleteResponse,
+    QuickAddBatchRequest,
     QuickAddRequest,
+    TransactionBulkDelete,
+    TransactionBulkUpdate,
     TransactionCreate,
     TransactionDebugRead,
     TransactionRead,
@@ -16,18 +31,33 @@ __all__ = [
     "AccountRead",
     "AccountBalanceRead",
     "QuickAddRequest",
+    "QuickAddBatchRequest",
+    "BatchItemResult",
+    "BatchCreateResponse",
     "TransactionCreate",
     "TransactionDebugRead",
     "TransactionRead",
     "TransactionUpdate",
+    "TransactionBulkUpdate",
+    "TransactionBulkDelete",
+    "BulkDeleteResponse",
     "PDFImportResponse",
+    "ImportPreviewRow",
+    "ImportPreviewResponse",
     "RuleCreate",
     "RuleRead",
     "RuleUpdate",
     "RuleApplyResponse",
     "CategoryBreakdownItem",
     "MonthlyReportResponse",
+    "TrendMonthItem",
+    "CategoryTrendPoint",
+    "CategoryTrendSeries",
+    "TrendReportResponse",
     "CategoryRead",
+    "ChangeRead",
+    "ChangesResponse",
+    "DashboardResponse",
     "AutoPairRequest",
     "AutoPairResponse",
     "TransferPairRead",
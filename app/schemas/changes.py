@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+from app.schemas.transaction import TransactionRead
+
+
+class ChangeRead(BaseModel):
+    seq: int
+    table: str
+    id: int
+    op: str
+
+
+class ChangesResponse(BaseModel):
+    cursor: str
+    reset: bool
+    has_more: bool
+    changes: list[ChangeRead]
+    transactions: list[TransactionRead]
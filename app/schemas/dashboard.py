@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+from app.schemas.account import AccountBalanceRead, AccountRead
+from app.schemas.category import CategoryRead
+from app.schemas.report import MonthlyReportResponse
+from app.schemas.transaction import TransactionRead
+
+
+class DashboardResponse(BaseModel):
+    month: str
+    change_cursor: str
+    transactions: list[TransactionRead]
+    report: MonthlyReportResponse
+    accounts: list[AccountRead]
+    categories: list[CategoryRead]
+    balance: AccountBalanceRead | None
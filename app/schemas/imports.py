@@ -1,5 +1,10 @@
+import datetime as dt
+from decimal import Decimal
+
 from pydantic import BaseModel
 
+from app.models.enums import TransactionStatus, TransactionType
+
 
 class PDFImportResponse(BaseModel):
     import_id: int
@@ -7,3 +12,33 @@ class PDFImportResponse(BaseModel):
     inserted: int
     skipped: int
     errors: list[str]
+
+
+class ImportPreviewRow(BaseModel):
+    tx_date: dt.date
+    description: str
+    amount: Decimal
+    signed_amount: Decimal
+    currency: str
+    type: TransactionType
+    status: TransactionStatus
+    category_id: int
+    category_name: str | None
+
+
+class ImportPreviewResponse(BaseModel):
+    token: str
+    expires_in: int
+    account_id: int
+    bank_type: str
+    period_from: dt.date | None
+    period_to: dt.date | None
+    currency: str | None
+    opening_balance: Decimal | None
+    closing_balance: Decimal | None
+    pending_balance: Decimal | None
+    rows_total: int
+    new: int
+    skipped: int
+    errors: list[str]
+    rows: list[ImportPreviewRow]
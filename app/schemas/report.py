@@ -15,3 +15,32 @@ class MonthlyReportResponse(BaseModel):
     total_pending: Decimal
     balance: Decimal
     breakdown_by_category: list[CategoryBreakdownItem]
+
+
+class TrendMonthItem(BaseModel):
+    month: str
+    total_income: Decimal
+    total_expense: Decimal
+    total_transfers: Decimal
+    balance: Decimal
+    income_delta: Decimal | None
+    expense_delta: Decimal | None
+    transfers_delta: Decimal | None
+
+
+class CategoryTrendPoint(BaseModel):
+    month: str
+    total: Decimal
+    delta: Decimal | None
+
+
+class CategoryTrendSeries(BaseModel):
+    category: str
+    points: list[CategoryTrendPoint]
+
+
+class TrendReportResponse(BaseModel):
+    from_month: str
+    to_month: str
+    months: list[TrendMonthItem]
+    categories: list[CategoryTrendSeries]
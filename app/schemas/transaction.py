@@ -3,7 +3,7 @@ from decimal import Decimal
 from typing import Any
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 from app.models.enums import TransactionKind, TransactionSource, TransactionStatus, TransactionType
 
@@ -21,6 +21,11 @@ class QuickAddRequest(BaseModel):
         return stripped
 
 
+class QuickAddBatchRequest(BaseModel):
+    text: str = Field(min_length=1, max_length=100_000)
+    account_id: int | None = Field(default=None, ge=1)
+
+
 class TransactionCreate(BaseModel):
     description: str = Field(min_length=1, max_length=255)
     amount: Decimal = Field(gt=0)
@@ -72,12 +77,67 @@ class TransactionRead(BaseModel):
     created_at: dt.datetime
 
 
+class BatchItemResult(BaseModel):
+    index: int
+    transaction: TransactionRead | None = None
+    error: str | None = None
+
+
+class BatchCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BatchItemResult]
+
+
 class TransactionUpdate(BaseModel):
     category_id: int | None = None
     category_locked: bool | None = None
     kind: TransactionKind | None = None
 
 
+MAX_BULK_IDS = 1000
+
+
+class TransactionBulkUpdate(TransactionUpdate):
+    ids: list[int] = Field(min_length=1, max_length=MAX_BULK_IDS)
+
+
+class TransactionBulkDelete(BaseModel):
+    ids: list[int] | None = Field(default=None, min_length=1, max_length=MAX_BULK_IDS)
+    month: str | None = None
+    account_id: int | None = Field(default=None, ge=1)
+    category_id: int | None = Field(default=None, ge=1)
+    kind: TransactionKind | None = None
+    status: TransactionStatus | None = None
+    source: TransactionSource | None = None
+    import_id: int | None = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def check_scope(self) -> "TransactionBulkDelete":
+        has_filter = any(
+            value is not None
+            for value in (
+                self.month,
+                self.account_id,
+                self.category_id,
+                self.kind,
+                self.status,
+                self.source,
+                self.import_id,
+            )
+        )
+        if self.ids is not None and has_filter:
+            raise ValueError("Нужно передать либо ids, либо фильтр")
+        if self.ids is None and self.month is None and self.import_id is None:
+            raise ValueError("Для удаления по фильтру нужен month или import_id")
+        return self
+
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+    ids: list[int]
+
+
 class TransactionDebugRead(BaseModel):
     id: int
     source: TransactionSource
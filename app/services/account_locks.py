@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# First key of the two-key advisory lock. Account ids are small integers that
+# would easily collide with single-key locks taken by anything else on the
+# database, so account locks get a namespace of their own.
+ACCOUNT_LOCK_NAMESPACE = 1
+
+
+async def lock_accounts(session: AsyncSession, account_ids: Iterable[int]) -> None:
+    # Serializes writers of the same account until the current transaction
+    # ends; writers of other accounts are not blocked. Locks are taken in id
+    # order so two multi-account writers can't deadlock on each other.
+    for account_id in sorted(set(account_ids)):
+        await session.execute(
+            select(func.pg_advisory_xact_lock(ACCOUNT_LOCK_NAMESPACE, account_id))
+        )
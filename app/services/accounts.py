@@ -2,9 +2,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.account import Account
-
-DEFAULT_ACCOUNT_NAME = "Основной счет"
-LEGACY_DEFAULT_ACCOUNT_NAME = "Main Account"
+from app.schemas.account import AccountRead
+from app.services.reference_cache import (
+    DEFAULT_ACCOUNT_NAME,
+    LEGACY_DEFAULT_ACCOUNT_NAME,
+    get_reference_data,
+    invalidate_reference_data,
+)
 
 
 async def get_default_account(session: AsyncSession) -> Account:
@@ -27,14 +31,36 @@ async def get_default_account(session: AsyncSession) -> Account:
     created = Account(name=DEFAULT_ACCOUNT_NAME, bank="Не указан", currency="KZT", is_active=True)
     session.add(created)
     await session.flush()
+    invalidate_reference_data()
     return created
 
 
 async def resolve_account_id(session: AsyncSession, account_id: int | None) -> int:
     if account_id is None:
+        refs = await get_reference_data(session)
+        if refs.default_account_id is not None:
+            return refs.default_account_id
         return (await get_default_account(session)).id
 
-    account = await session.get(Account, account_id)
-    if account is None:
+    refs = await get_reference_data(session, account_ids=[account_id])
+    if account_id not in refs.accounts:
         raise ValueError("Счет не найден")
-    return account.id
+    return account_id
+
+
+async def list_account_reads(session: AsyncSession, active_only: bool = True) -> list[AccountRead]:
+    query = select(Account).order_by(Account.is_active.desc(), Account.name.asc())
+    if active_only:
+        query = query.where(Account.is_active.is_(True))
+    rows = await session.scalars(query)
+    return [
+        AccountRead(
+            id=item.id,
+            name=item.name,
+            bank=item.bank,
+            currency=item.currency,
+            is_active=item.is_active,
+            created_at=item.created_at,
+        )
+        for item in rows.all()
+    ]
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.statement_import import StatementImport
 from app.models.transaction import Transaction
 from app.models.enums import TransactionStatus
+from app.schemas.account import AccountBalanceRead
 
 
 @dataclass(slots=True)
@@ -137,3 +138,33 @@ async def get_account_balance(
         pending_total=pending_sum,
         warning=warning,
     )
+
+
+async def account_balance_read(
+    session: AsyncSession,
+    account_id: int,
+    account_currency: str,
+    from_date: dt.date,
+    to_date: dt.date,
+    include_pending: bool = False,
+) -> AccountBalanceRead:
+    result = await get_account_balance(
+        session=session,
+        account_id=account_id,
+        from_date=from_date,
+        to_date=to_date,
+        include_pending=include_pending,
+    )
+    return AccountBalanceRead(
+        account_id=result.account_id,
+        currency=result.currency or account_currency,
+        from_date=result.from_date,
+        to_date=result.to_date,
+        opening_balance=result.opening_balance,
+        calculated_closing_balance=result.calculated_closing_balance,
+        available_balance=result.available_balance,
+        statement_closing_balance=result.statement_closing_balance,
+        diff=result.diff,
+        pending_total=result.pending_total,
+        warning=result.warning,
+    )
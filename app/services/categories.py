@@ -0,0 +1,16 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.category import Category
+from app.models.enums import TransactionType
+from app.schemas.category import CategoryRead
+
+
+async def list_category_reads(
+    session: AsyncSession, type: TransactionType | None = None
+) -> list[CategoryRead]:
+    query = select(Category).order_by(Category.type.asc(), Category.name.asc())
+    if type is not None:
+        query = query.where(Category.type == type)
+    rows = await session.scalars(query)
+    return [CategoryRead(id=item.id, name=item.name, type=item.type) for item in rows.all()]
@@ -1,26 +1,13 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from datetime import datetime
+from functools import lru_cache
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.category import Category
-from app.models.category_rule import CategoryRule
 from app.models.enums import RuleMatchType, TransactionType
 from app.models.transaction import Transaction
-
-
-@dataclass(slots=True)
-class RuleCandidate:
-    pattern: str
-    match_type: RuleMatchType
-    category_id: int
-    priority: int
-    created_at: datetime
-    is_active: bool
+from app.services.reference_cache import ReferenceData, RuleCandidate, get_reference_data
 
 
 def normalize_text(text: str) -> str:
@@ -30,12 +17,19 @@ def normalize_text(text: str) -> str:
     return normalized.strip()
 
 
+@lru_cache(maxsize=1024)
+def _normalized_pattern(pattern: str) -> str:
+    # Rules are matched against every imported row; normalizing each pattern
+    # once instead of per row keeps bulk imports from being dominated by it.
+    return normalize_text(pattern)
+
+
 def rule_matches(rule: RuleCandidate, normalized_description: str) -> bool:
     if not rule.is_active:
         return False
 
     if rule.match_type == RuleMatchType.CONTAINS:
-        return normalize_text(rule.pattern) in normalized_description
+        return _normalized_pattern(rule.pattern) in normalized_description
 
     if rule.match_type == RuleMatchType.REGEX:
         try:
@@ -55,41 +49,25 @@ def choose_best_category(normalized_description: str, rules: list[RuleCandidate]
     return matched[0].category_id
 
 
-async def find_category_for(session: AsyncSession, description: str, tx_type: TransactionType) -> int:
-    normalized_description = normalize_text(description)
-
-    rows = await session.scalars(
-        select(CategoryRule)
-        .join(Category, CategoryRule.category_id == Category.id)
-        .where(Category.type == tx_type, CategoryRule.is_active.is_(True))
-        .order_by(CategoryRule.priority.desc(), CategoryRule.created_at.desc())
+def pick_category(refs: ReferenceData, description: str, tx_type: TransactionType) -> int:
+    chosen_category = choose_best_category(
+        normalize_text(description), refs.rules_by_type.get(tx_type, [])
     )
-
-    rules = [
-        RuleCandidate(
-            pattern=rule.pattern,
-            match_type=rule.match_type,
-            category_id=rule.category_id,
-            priority=rule.priority,
-            created_at=rule.created_at,
-            is_active=rule.is_active,
-        )
-        for rule in rows
-    ]
-
-    chosen_category = choose_best_category(normalized_description, rules)
     if chosen_category is not None:
         return chosen_category
 
-    other_category = await session.scalar(
-        select(Category.id).where(Category.name == "Other", Category.type == tx_type)
-    )
+    other_category = refs.default_category_ids.get(tx_type)
     if other_category is None:
         raise RuntimeError("Категория по умолчанию 'Other' не найдена")
 
     return other_category
 
 
+async def find_category_for(session: AsyncSession, description: str, tx_type: TransactionType) -> int:
+    refs = await get_reference_data(session)
+    return pick_category(refs, description, tx_type)
+
+
 async def apply_category(session: AsyncSession, transaction: Transaction) -> int:
     if transaction.category_locked:
         return transaction.category_id
@@ -0,0 +1,164 @@
+import datetime as dt
+from dataclasses import dataclass, field
+
+from sqlalchemy import ColumnElement, Row, Text, cast, delete, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.change_journal import XID8, ChangeJournalEntry
+
+MAX_CHANGES_PAGE = 5000
+
+TRANSACTIONS_TABLE = "transactions"
+
+CURSOR_PATTERN = r"^\d+:\d+$"
+
+
+@dataclass(frozen=True, slots=True, order=True)
+class ChangeCursor:
+    # Position in the journal's (xid, seq) order: everything up to and
+    # including this key has been delivered.
+    xid: int
+    seq: int
+
+    def encode(self) -> str:
+        return f"{self.xid}:{self.seq}"
+
+    @classmethod
+    def decode(cls, value: str) -> "ChangeCursor":
+        xid, seq = value.split(":")
+        return cls(int(xid), int(seq))
+
+
+@dataclass(slots=True)
+class ChangeBatch:
+    cursor: ChangeCursor
+    entries: list[Row] = field(default_factory=list)
+    has_more: bool = False
+    # Entries after the cursor were compacted away; the client has to reload.
+    reset: bool = False
+
+
+def _key() -> ColumnElement:
+    return tuple_(ChangeJournalEntry.xid, ChangeJournalEntry.seq)
+
+
+def _xid(value: int) -> ColumnElement:
+    # asyncpg has no codec for xid8 parameters; they go over as text.
+    return cast(cast(str(value), Text), XID8)
+
+
+def _key_of(cursor: ChangeCursor) -> ColumnElement:
+    return tuple_(_xid(cursor.xid), cursor.seq)
+
+
+async def _horizon(session: AsyncSession) -> int:
+    # The oldest transaction still in progress. Neither seq nor xid order is
+    # commit order: an import that took its xid early may commit after a later
+    # one, and a quick edit may commit seq N+1 while the chunk that drew N is
+    # still open. Every entry with an xid below the horizon, though, is
+    # committed or rolled back for good, so nothing new can appear behind a
+    # cursor that only moves through them.
+    return int(
+        await session.scalar(select(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text)))
+    )
+
+
+async def get_change_cursor(session: AsyncSession) -> ChangeCursor:
+    # Not the newest entry but the horizon: entries of writers still in
+    # progress come after it.
+    return ChangeCursor(await _horizon(session), 0)
+
+
+async def read_changes(session: AsyncSession, since: ChangeCursor, limit: int) -> ChangeBatch:
+    # Compaction deletes a prefix of the (xid, seq) order. Seq gaps also come
+    # from rolled back writes, so a cursor in front of the oldest entry may be
+    # a false alarm; a reload is the safe answer either way.
+    oldest = (
+        await session.execute(
+            select(
+                cast(ChangeJournalEntry.xid, Text).label("xid"),
+                ChangeJournalEntry.seq,
+                select(func.min(ChangeJournalEntry.seq)).scalar_subquery().label("min_seq"),
+            )
+            .order_by(ChangeJournalEntry.xid, ChangeJournalEntry.seq)
+            .limit(1)
+        )
+    ).first()
+    if (
+        oldest is not None
+        and oldest.min_seq > 1
+        and since < ChangeCursor(int(oldest.xid), oldest.seq)
+    ):
+        return ChangeBatch(cursor=await get_change_cursor(session), reset=True)
+
+    # The horizon is read first: every entry below it is already visible to
+    # the next statement, so the batch can safely end there.
+    horizon = await _horizon(session)
+    rows = (
+        await session.execute(
+            select(
+                ChangeJournalEntry.seq,
+                cast(ChangeJournalEntry.xid, Text).label("xid"),
+                ChangeJournalEntry.table_name,
+                ChangeJournalEntry.row_id,
+                ChangeJournalEntry.op,
+            )
+            .where(
+                _key() > _key_of(since),
+                ChangeJournalEntry.xid < _xid(horizon),
+            )
+            .order_by(ChangeJournalEntry.xid, ChangeJournalEntry.seq)
+            .limit(limit + 1)
+        )
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more:
+        cursor = ChangeCursor(int(rows[-1].xid), rows[-1].seq)
+    else:
+        cursor = max(since, ChangeCursor(horizon, 0))
+    return ChangeBatch(cursor=cursor, entries=rows, has_more=has_more)
+
+
+def changed_row_ids(entries: list[Row], table_name: str) -> tuple[list[int], list[int]]:
+    # Collapses the entries of one table to the last op per row: rows that still
+    # exist (to re-read) and rows whose last op was a delete.
+    last_op: dict[int, str] = {}
+    for entry in entries:
+        if entry.table_name == table_name:
+            last_op.pop(entry.row_id, None)
+            last_op[entry.row_id] = entry.op
+    present = [row_id for row_id, op in last_op.items() if op != "delete"]
+    deleted = [row_id for row_id, op in last_op.items() if op == "delete"]
+    return present, deleted
+
+
+async def compact_change_journal(session: AsyncSession, keep_days: int) -> int:
+    # Deletes the entries in front of the first one to keep, so what is left is
+    # a suffix of the (xid, seq) order and a cursor in front of it means the
+    # reader missed something. The newest entry is always kept, which leaves
+    # up-to-date cursors behind the oldest retained entry.
+    cutoff = dt.datetime.now(tz=dt.timezone.utc) - dt.timedelta(days=keep_days)
+    first_kept = (
+        await session.execute(
+            select(cast(ChangeJournalEntry.xid, Text).label("xid"), ChangeJournalEntry.seq)
+            .where(
+                or_(
+                    ChangeJournalEntry.changed_at >= cutoff,
+                    ChangeJournalEntry.seq
+                    == select(func.max(ChangeJournalEntry.seq)).scalar_subquery(),
+                )
+            )
+            .order_by(ChangeJournalEntry.xid, ChangeJournalEntry.seq)
+            .limit(1)
+        )
+    ).first()
+    if first_kept is None:
+        return 0
+    result = await session.execute(
+        delete(ChangeJournalEntry).where(
+            _key() < _key_of(ChangeCursor(int(first_kept.xid), first_kept.seq))
+        )
+    )
+    await session.commit()
+    return result.rowcount
@@ -0,0 +1,107 @@
+import asyncio
+import datetime as dt
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.transaction import Transaction
+from app.schemas.account import AccountBalanceRead
+from app.services.accounts import list_account_reads
+from app.services.balance_service import account_balance_read
+from app.services.categories import list_category_reads
+from app.services.change_journal import get_change_cursor
+from app.services.reference_cache import AccountRef
+from app.services.reporting import monthly_report_read
+from app.services.transactions import (
+    TRANSACTION_LIST_COLUMNS,
+    encode_transaction_rows,
+    get_references_for,
+    transaction_filters,
+)
+
+T = TypeVar("T")
+
+# Extra connections that all dashboard loads of this process hold together;
+# the rest of the pool stays free for other endpoints while dashboards queue.
+DASHBOARD_CONNECTIONS = max(1, engine.pool.size() // 2)
+dashboard_connections = asyncio.Semaphore(DASHBOARD_CONNECTIONS)
+
+
+async def _in_own_session(load: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    async with dashboard_connections, AsyncSessionLocal() as session:
+        return await load(session)
+
+
+def _dump(model: BaseModel | None) -> object:
+    return None if model is None else model.model_dump(mode="json")
+
+
+async def load_dashboard(
+    session: AsyncSession,
+    month_start: dt.date,
+    month_end: dt.date,
+    account_id: int | None,
+    balance_account: AccountRef | None,
+    include_pending: bool,
+) -> bytes:
+    async def transactions(session: AsyncSession) -> tuple[str, bytes]:
+        # The journal position is read before the list, so the client's delta
+        # sync replays anything committed in between instead of missing it.
+        change_cursor = (await get_change_cursor(session)).encode()
+        rows = (
+            await session.execute(
+                select(*TRANSACTION_LIST_COLUMNS)
+                .where(
+                    Transaction.tx_date >= month_start,
+                    Transaction.tx_date < month_end,
+                    *transaction_filters(account_id=account_id),
+                )
+                .order_by(Transaction.tx_date.desc(), Transaction.id.desc())
+            )
+        ).all()
+        refs = await get_references_for(session, rows)
+        return change_cursor, encode_transaction_rows(rows, refs)
+
+    async def balance(session: AsyncSession) -> AccountBalanceRead | None:
+        if balance_account is None:
+            return None
+        return await account_balance_read(
+            session,
+            account_id=balance_account.id,
+            account_currency=balance_account.currency,
+            from_date=month_start,
+            to_date=month_end - dt.timedelta(days=1),
+            include_pending=include_pending,
+        )
+
+    # The parts don't depend on each other. The transaction list runs on the
+    # request's session and the rest on pooled connections, at most
+    # DASHBOARD_CONNECTIONS of them across all requests, so the response waits
+    # for the slowest part rather than the sum without draining the pool.
+    (change_cursor, transactions_json), report, accounts, categories, balance_read = (
+        await asyncio.gather(
+            transactions(session),
+            _in_own_session(lambda session: monthly_report_read(session, month_start, account_id)),
+            _in_own_session(list_account_reads),
+            _in_own_session(list_category_reads),
+            _in_own_session(balance),
+        )
+    )
+
+    rest = orjson.dumps(
+        {
+            "month": month_start.strftime("%Y-%m"),
+            "change_cursor": change_cursor,
+            "report": _dump(report),
+            "accounts": [_dump(item) for item in accounts],
+            "categories": [_dump(item) for item in categories],
+            "balance": _dump(balance_read),
+        }
+    )
+    # The transaction list is already encoded; splice it in rather than decode it.
+    return b'{"transactions":' + transactions_json + b"," + rest[1:]
@@ -0,0 +1,27 @@
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.data_version import DataVersion
+
+ACCOUNTS_SCOPE = "accounts"
+CATEGORIES_SCOPE = "categories"
+RULES_SCOPE = "rules"
+
+VersionVector = tuple[tuple[str, int], ...]
+
+
+def transactions_scope(account_id: int | None = None, month_label: str | None = None) -> str:
+    # Trigger-maintained scopes look like 'tx:<account_id>:<YYYY-MM>'; a missing
+    # part becomes a LIKE wildcard that matches every account or month.
+    account_part = str(account_id) if account_id is not None else "%"
+    month_part = month_label if month_label is not None else "%"
+    return f"tx:{account_part}:{month_part}"
+
+
+async def get_version_vector(session: AsyncSession, scopes: list[str]) -> VersionVector:
+    rows = await session.execute(
+        select(DataVersion.scope, DataVersion.version)
+        .where(or_(*(DataVersion.scope.like(scope) for scope in scopes)))
+        .order_by(DataVersion.scope.asc())
+    )
+    return tuple((scope, version) for scope, version in rows.all())
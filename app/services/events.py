@@ -0,0 +1,173 @@
+import asyncio
+import contextlib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Shared with the change_journal trigger (migration 20261019_0012).
+EVENTS_CHANNEL = "budget_events"
+
+
+@dataclass(slots=True)
+class Event:
+    name: str
+    data: dict[str, Any] = field(default_factory=dict)
+    id: int | None = None
+
+    def encode(self) -> str:
+        lines = []
+        if self.id is not None:
+            lines.append(f"id: {self.id}")
+        lines.append(f"event: {self.name}")
+        lines.append(f"data: {json.dumps(self.data, ensure_ascii=False, separators=(',', ':'))}")
+        return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    def __init__(self, max_queue: int) -> None:
+        self._queue: asyncio.Queue[Event | None] = asyncio.Queue(maxsize=max_queue)
+        self.dropped = False
+
+    def push(self, event: Event) -> bool:
+        if self.dropped:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A consumer this far behind is cut off instead of buffering without
+            # bound; the queued events are discarded and None tells the stream
+            # to close, after which the client resyncs from /api/changes.
+            self.dropped = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+            return False
+        return True
+
+    async def get(self) -> Event | None:
+        return await self._queue.get()
+
+
+class EventBus:
+    def __init__(self) -> None:
+        self._subscribers: set[Subscription] = set()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(get_settings().events_queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: Event) -> None:
+        for subscription in list(self._subscribers):
+            if not subscription.push(event):
+                self._subscribers.discard(subscription)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+event_bus = EventBus()
+
+
+def events_from_notification(payload: str) -> list[Event]:
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        logger.warning("Ignoring malformed notification: %.200s", payload)
+        return []
+
+    if "event" in message:
+        return [Event(name=message["event"], data=message.get("data") or {})]
+
+    table_name = message.get("table")
+    data = {
+        "op": message.get("op"),
+        "seq": message.get("seq"),
+        "count": message.get("count"),
+        "ids": message.get("ids"),
+    }
+    if table_name == "transactions":
+        return [
+            Event(name="transactions", data=data, id=message.get("seq")),
+            Event(
+                name="report",
+                data={
+                    "months": message.get("months") or [],
+                    "account_ids": message.get("account_ids") or [],
+                },
+            ),
+        ]
+    if table_name == "category_rules":
+        return [Event(name="rules", data=data, id=message.get("seq"))]
+    return [Event(name=table_name, data=data, id=message.get("seq"))]
+
+
+async def notify_event(session: AsyncSession, name: str, data: dict[str, Any]) -> None:
+    # NOTIFY is transactional: the event is delivered to every worker when the
+    # caller commits and dropped if it rolls back.
+    payload = json.dumps({"event": name, "data": data}, ensure_ascii=False, default=str)
+    await session.execute(select(func.pg_notify(EVENTS_CHANNEL, payload)))
+
+
+class EventListener:
+    # One LISTEN connection per worker feeds the in-process bus; reconnects
+    # with backoff so a database restart only pauses the stream.
+    def __init__(self, bus: EventBus) -> None:
+        self._bus = bus
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def _on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        for event in events_from_notification(payload):
+            self._bus.publish(event)
+
+    async def _run(self) -> None:
+        dsn = make_url(get_settings().database_url).set(drivername="postgresql")
+        delay = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn.render_as_string(hide_password=False))
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _, lost=lost: lost.set())
+                await connection.add_listener(EVENTS_CHANNEL, self._on_notification)
+                delay = 1.0
+                # Notifications sent while disconnected are gone; clients catch
+                # up from the change journal when they get this.
+                self._bus.publish(Event(name="resync"))
+                await lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                logger.warning("Event listener connection failed", exc_info=True)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+event_listener = EventListener(event_bus)
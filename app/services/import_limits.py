@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+from app.db.settings import get_settings
+
+
+class ImportLimitExceeded(ValueError):
+    # A statement that is too big or too expensive to parse. Unlike other
+    # parse errors the import is recorded as failed instead of rolled back.
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ImportLimits:
+    max_pages: int
+    max_decompressed_bytes: int
+    wall_seconds: float
+    cpu_seconds: int
+
+    @classmethod
+    def from_settings(cls) -> ImportLimits:
+        settings = get_settings()
+        return cls(
+            max_pages=settings.import_max_pages,
+            max_decompressed_bytes=settings.import_max_decompressed_bytes,
+            wall_seconds=settings.import_wall_seconds,
+            cpu_seconds=settings.import_cpu_seconds,
+        )
+
+
+# Parsing is CPU and memory heavy, so each worker runs at most this many
+# imports at once; the rest wait for a slot. Writes into the same account are
+# additionally serialized by account_locks.
+import_slots = asyncio.Semaphore(get_settings().import_max_concurrent)
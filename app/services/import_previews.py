@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from app.db.settings import get_settings
+from app.services.pdf_import_service import ParsedStatement, ParsedStatementRow
+
+# Rough per-row footprint of a ParsedStatementRow (object, Decimals, date,
+# enum refs) on top of its strings; only used to keep the cache bounded.
+ROW_OVERHEAD_BYTES = 600
+
+
+@dataclass(slots=True)
+class ImportPreview:
+    parsed: ParsedStatement
+    rows: list[ParsedStatementRow]
+    skipped: int
+    filename: str | None
+    file_sha256: str
+    # The uploaded file in a temp file; it goes to the statement store only on
+    # confirm, so previews that are never confirmed leave nothing behind.
+    upload: BinaryIO
+    expires_at: float = 0.0
+    size: int = 0
+    upload_size: int = 0
+
+    def discard(self) -> None:
+        self.upload.close()
+
+
+def upload_size(upload: BinaryIO) -> int:
+    position = upload.tell()
+    size = upload.seek(0, os.SEEK_END)
+    upload.seek(position)
+    return size
+
+
+def estimate_preview_size(preview: ImportPreview) -> int:
+    size = 0
+    for row in preview.parsed.rows:
+        size += ROW_OVERHEAD_BYTES + 2 * (
+            len(row.description) + len(row.details) + len(row.operation) + len(row.row_text)
+        )
+    return size + sum(2 * len(error) for error in preview.parsed.errors)
+
+
+class PreviewCache:
+    # Parsed statements waiting for confirmation, kept per worker process.
+    # Entries expire after the TTL and the oldest are dropped once the
+    # estimated memory size or the size of the upload copies on disk goes over
+    # its cap; dropped entries close their upload. A popped preview is the
+    # caller's to discard.
+    def __init__(self, ttl_seconds: float, max_bytes: int, max_upload_bytes: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_upload_bytes = max_upload_bytes
+        self._entries: OrderedDict[str, ImportPreview] = OrderedDict()
+        self._bytes = 0
+        self._upload_bytes = 0
+
+    def put(self, preview: ImportPreview) -> str:
+        preview.size = estimate_preview_size(preview)
+        preview.upload_size = upload_size(preview.upload)
+        if preview.size > self.max_bytes or preview.upload_size > self.max_upload_bytes:
+            raise ValueError("Выписка слишком большая для предпросмотра, импортируйте ее напрямую")
+
+        now = time.monotonic()
+        self.evict_expired(now)
+        while self._entries and (
+            self._bytes + preview.size > self.max_bytes
+            or self._upload_bytes + preview.upload_size > self.max_upload_bytes
+        ):
+            self._drop(next(iter(self._entries))).discard()
+
+        token = secrets.token_urlsafe(24)
+        preview.expires_at = now + self.ttl_seconds
+        self._entries[token] = preview
+        self._bytes += preview.size
+        self._upload_bytes += preview.upload_size
+        return token
+
+    def pop(self, token: str) -> ImportPreview | None:
+        self.evict_expired(time.monotonic())
+        if token not in self._entries:
+            return None
+        return self._drop(token)
+
+    def evict_expired(self, now: float | None = None) -> None:
+        # Entries are in insertion order and share one TTL, so the expired ones
+        # are always at the front.
+        now = time.monotonic() if now is None else now
+        while self._entries:
+            token, preview = next(iter(self._entries.items()))
+            if preview.expires_at > now:
+                break
+            self._drop(token).discard()
+
+    def _drop(self, token: str) -> ImportPreview:
+        preview = self._entries.pop(token)
+        self._bytes -= preview.size
+        self._upload_bytes -= preview.upload_size
+        return preview
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def upload_bytes(self) -> int:
+        return self._upload_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+preview_cache = PreviewCache(
+    get_settings().import_preview_ttl_seconds,
+    get_settings().import_preview_max_bytes,
+    get_settings().import_preview_max_upload_bytes,
+)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy import delete, exists, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.statement_import import StatementImport
+from app.models.transaction import Transaction
+from app.models.transaction_raw import TransactionRaw
+from app.services.account_locks import lock_accounts
+
+# One chunk of the import's transactions is deleted per statement, and the
+# transfer counterparts of the deleted rows (kept by other imports or entered
+# by hand) are unpaired in the same statement. The statement-level rollup,
+# version and journal triggers therefore run once per chunk, not per row.
+ROLLBACK_CHUNK_SQL = text(
+    """
+    WITH chunk AS (
+        SELECT id FROM transactions
+        WHERE import_id = :import_id
+        LIMIT :chunk_size
+    ),
+    deleted AS (
+        DELETE FROM transactions AS t
+        USING chunk
+        WHERE t.id = chunk.id
+        RETURNING t.transfer_pair_id
+    ),
+    unpaired AS (
+        UPDATE transactions AS t
+        SET kind = CAST(CAST(t.type AS TEXT) AS transaction_kind),
+            transfer_pair_id = NULL,
+            matched_account_id = NULL,
+            match_confidence = NULL
+        FROM (SELECT DISTINCT transfer_pair_id FROM deleted) AS pairs
+        WHERE t.transfer_pair_id = pairs.transfer_pair_id
+          AND t.import_id IS DISTINCT FROM :import_id
+        RETURNING t.id
+    )
+    SELECT (SELECT count(*) FROM deleted), (SELECT count(*) FROM unpaired)
+    """
+)
+
+
+class ImportRolledBack(Exception):
+    # The import was rolled back while its chunks were still being saved.
+    pass
+
+
+@dataclass(slots=True)
+class RollbackResult:
+    deleted: int = 0
+    unpaired: int = 0
+
+
+async def ensure_not_rolled_back(session: AsyncSession, statement_import: StatementImport) -> None:
+    # Called under the import's account lock before a chunk is saved and
+    # before the import is finished. The rollback marks the import under the
+    # same lock before deleting anything, so after this check nothing is
+    # written behind it.
+    current = await session.scalar(
+        select(StatementImport.status).where(StatementImport.id == statement_import.id)
+    )
+    if current == "rolled_back":
+        raise ImportRolledBack
+
+
+async def has_transactions(session: AsyncSession, import_id: int) -> bool:
+    return await session.scalar(select(exists().where(Transaction.import_id == import_id)))
+
+
+async def rollback_statement_import(
+    session: AsyncSession, statement_import: StatementImport, chunk_size: int
+) -> RollbackResult:
+    # Each chunk commits on its own, so row locks and the account lock are
+    # held for one chunk only and a large import never blocks other writers
+    # for long. An interrupted rollback is finished by running it again.
+    result = RollbackResult()
+    import_id = statement_import.id
+    account_id = statement_import.account_id
+    # Marked first, so an import still saving chunks stops at its next one
+    # instead of adding rows after the rollback has passed them.
+    await lock_accounts(session, [account_id])
+    statement_import.status = "rolled_back"
+    await session.commit()
+    while True:
+        counterpart_accounts = await session.scalars(
+            select(Transaction.matched_account_id)
+            .where(
+                Transaction.import_id == import_id,
+                Transaction.transfer_pair_id.is_not(None),
+                Transaction.matched_account_id.is_not(None),
+            )
+            .distinct()
+        )
+        await lock_accounts(session, [account_id, *counterpart_accounts])
+        deleted, unpaired = (
+            await session.execute(
+                ROLLBACK_CHUNK_SQL, {"import_id": import_id, "chunk_size": chunk_size}
+            )
+        ).one()
+        await session.commit()
+        result.deleted += deleted
+        result.unpaired += unpaired
+        if deleted < chunk_size:
+            break
+
+    await session.execute(delete(TransactionRaw).where(TransactionRaw.import_id == import_id))
+    return result
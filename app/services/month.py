@@ -22,3 +22,18 @@ def resolve_month_window(month: str | None) -> tuple[dt.date, dt.date, str]:
 
     month_label = f"{year:04d}-{month_value:02d}"
     return start, end, month_label
+
+
+MAX_TREND_MONTHS = 120
+
+
+def resolve_month_range(from_month: str, to_month: str) -> tuple[dt.date, dt.date]:
+    range_start, _, _ = resolve_month_window(from_month)
+    range_end, _, _ = resolve_month_window(to_month)
+    if range_start > range_end:
+        raise ValueError("Начало периода должно быть не позже конца")
+
+    months = (range_end.year - range_start.year) * 12 + range_end.month - range_start.month + 1
+    if months > MAX_TREND_MONTHS:
+        raise ValueError(f"Период не может быть длиннее {MAX_TREND_MONTHS} месяцев")
+    return range_start, range_end
@@ -0,0 +1,24 @@
+import base64
+import binascii
+import datetime as dt
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(tx_date: dt.date, transaction_id: int) -> str:
+    raw = f"{tx_date.isoformat()}:{transaction_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[dt.date, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii")
+        date_part, id_part = raw.split(":", 1)
+        return dt.date.fromisoformat(date_part), int(id_part)
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise ValueError("Некорректный курсор пагинации") from exc
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import resource
+import shutil
+import signal
+import tempfile
+import zlib
+from multiprocessing.connection import Connection
+from typing import Any, BinaryIO
+
+import pdfplumber
+from pdfminer.pdftypes import LITERALS_FLATE_DECODE
+from pypdf import PdfReader
+
+from app.services.import_limits import ImportLimitExceeded, ImportLimits
+
+COPY_CHUNK_SIZE = 1024 * 1024
+MB = 1024 * 1024
+
+# spawn rather than fork: the API process runs an event loop and driver
+# threads that a forked child must not inherit.
+_context = multiprocessing.get_context("spawn")
+
+
+def _decoded_size(stream: Any, limit: int) -> int:
+    filters = stream.get_filters()
+    if len(filters) == 1 and filters[0][0] in LITERALS_FLATE_DECODE:
+        # Inflate at most limit + 1 bytes; the rest of a bomb is never expanded.
+        return len(zlib.decompressobj().decompress(stream.rawdata, limit + 1))
+    return len(stream.rawdata or b"")
+
+
+def _check_decompressed_size(pdf: pdfplumber.PDF, limits: ImportLimits) -> None:
+    total = 0
+    for page in pdf.pages:
+        for stream in page.page_obj.contents:
+            total += _decoded_size(stream, limits.max_decompressed_bytes - total)
+            if total > limits.max_decompressed_bytes:
+                raise ImportLimitExceeded(
+                    "Содержимое выписки после распаковки больше "
+                    f"{limits.max_decompressed_bytes // MB} МБ"
+                )
+
+
+def read_page_texts(path: str, limits: ImportLimits) -> list[str]:
+    with pdfplumber.open(path) as pdf:
+        if len(pdf.pages) > limits.max_pages:
+            raise ImportLimitExceeded(
+                f"В выписке {len(pdf.pages)} страниц, допускается не больше {limits.max_pages}"
+            )
+        _check_decompressed_size(pdf, limits)
+        page_texts = [page.extract_text() or "" for page in pdf.pages]
+
+    # pypdf is only a fallback for pages pdfplumber returns empty, so it is not
+    # run over the whole document when every page already has text.
+    empty_pages = [index for index, page_text in enumerate(page_texts) if not page_text.strip()]
+    if empty_pages:
+        reader = PdfReader(path)
+        for index in empty_pages:
+            if index < len(reader.pages):
+                page_texts[index] = reader.pages[index].extract_text() or ""
+
+    return page_texts
+
+
+def _limit_resources(limits: ImportLimits) -> None:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_limit = int(usage.ru_utime + usage.ru_stime) + limits.cpu_seconds
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+    # Streams outside the page contents (fonts, cmaps) are decoded by the
+    # parser itself; capping the address space turns a bomb hidden there into
+    # a MemoryError instead of an OOM-killed server.
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[0]) * resource.getpagesize()
+    except OSError:
+        return
+    address_limit = current + 2 * limits.max_decompressed_bytes + 256 * MB
+    resource.setrlimit(resource.RLIMIT_AS, (address_limit, address_limit))
+
+
+def _run_worker(path: str, limits: ImportLimits, connection: Connection) -> None:
+    try:
+        _limit_resources(limits)
+        connection.send(("ok", read_page_texts(path, limits)))
+    except ImportLimitExceeded as exc:
+        connection.send(("limit", str(exc)))
+    except MemoryError:
+        connection.send(
+            (
+                "limit",
+                "Содержимое выписки после распаковки больше "
+                f"{limits.max_decompressed_bytes // MB} МБ",
+            )
+        )
+    except Exception as exc:  # noqa: BLE001
+        connection.send(("error", repr(exc)))
+    finally:
+        connection.close()
+
+
+async def extract_page_texts(file: BinaryIO, limits: ImportLimits) -> list[str]:
+    # Extraction runs in a throwaway process: a malformed PDF can keep
+    # pdfplumber busy for minutes, and only a separate process can be given a
+    # CPU limit and killed on timeout without touching the API workers.
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as copy:
+        file.seek(0)
+        await asyncio.to_thread(shutil.copyfileobj, file, copy, COPY_CHUNK_SIZE)
+        copy.flush()
+
+        receiver, sender = _context.Pipe(duplex=False)
+        process = _context.Process(
+            target=_run_worker, args=(copy.name, limits, sender), daemon=True
+        )
+        process.start()
+        sender.close()
+        try:
+            if not await asyncio.to_thread(receiver.poll, limits.wall_seconds):
+                raise ImportLimitExceeded(
+                    f"Выписка обрабатывается дольше {limits.wall_seconds:g} с"
+                )
+            try:
+                status, payload = receiver.recv()
+            except EOFError:
+                await asyncio.to_thread(process.join)
+                if process.exitcode in (-signal.SIGXCPU, -signal.SIGKILL):
+                    raise ImportLimitExceeded(
+                        f"Выписка требует больше {limits.cpu_seconds} с процессорного времени"
+                    ) from None
+                raise RuntimeError(f"PDF worker exited with code {process.exitcode}") from None
+        finally:
+            receiver.close()
+            if process.is_alive():
+                process.kill()
+            await asyncio.to_thread(process.join)
+
+    if status == "limit":
+        raise ImportLimitExceeded(payload)
+    if status == "error":
+        raise RuntimeError(payload)
+    return payload
@@ -2,23 +2,38 @@ from __future__ import annotations
 
 import datetime as dt
 import hashlib
-import io
 import re
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO
 
-import pdfplumber
-from pypdf import PdfReader
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.settings import get_settings
 from app.models.account import Account
 from app.models.enums import TransactionKind, TransactionSource, TransactionStatus, TransactionType
+from app.models.statement_import import StatementImport
 from app.models.transaction import Transaction
-from app.services.categorization_service import apply_category
+from app.services.account_locks import lock_accounts
+from app.services.categorization_service import pick_category
+from app.services.events import notify_event
+from app.services.import_limits import ImportLimitExceeded, ImportLimits
+from app.services.import_rollback import ensure_not_rolled_back
+from app.services.pdf_extraction import extract_page_texts
+from app.services.reference_cache import ReferenceData, get_reference_data
+from app.services.transaction_raw import save_raw_payloads
 
 TABLE_HEADER = "Дата Сумма Валюта Операция Детали"
 TABLE_HEADER_KASPI = "Дата Описание Сумма"
+# Keys the row hash so it can't be confused with hashes of anything else;
+# changing it invalidates every stored external_hash.
+EXTERNAL_HASH_KEY = b"budget-external-hash"
+# Bump when a parser fix changes what is extracted from a statement; imports
+# made with an older version are picked up by `python -m app.cli reparse`.
+PARSER_VERSION = 1
 
 ROW_START_PATTERN = re.compile(
     r"^(\d{2}\.\d{2}\.\d{4})\s+([+-]?\d[\d\s]*,\d{2}|\+?\d[\d\s]*\.\d{2}|\-?\d[\d\s]*\.\d{2})\s*(₸|\$)?\s+(KZT|USD)\s+(.+)$"
@@ -112,10 +127,22 @@ class ParsedStatementRow:
     details: str
     description: str
     status: TransactionStatus
-    external_hash: str
     signed_amount_text: str
     page_no: int
     row_text: str
+    category_id: int | None = None
+    # Filled in by hash_rows once the statement's account is known.
+    external_hash: bytes = b""
+
+
+@dataclass(slots=True)
+class ParsedStatement:
+    account_id: int
+    account_currency: str
+    metadata: StatementMetadata
+    rows: list[ParsedStatementRow]
+    errors: list[str]
+    rows_total: int
 
 
 @dataclass(slots=True)
@@ -133,11 +160,11 @@ class PDFImportResult:
     pending_balance: Decimal | None = None
 
 
-def _normalize_spaces(text: str) -> str:
+def normalize_spaces(text: str) -> str:
     return " ".join(text.replace("\xa0", " ").split())
 
 
-def _parse_signed_amount(raw_amount: str) -> Decimal:
+def parse_signed_amount(raw_amount: str) -> Decimal:
     normalized = raw_amount.replace("\xa0", "").replace(" ", "")
 
     if "," in normalized and "." in normalized:
@@ -154,7 +181,7 @@ def _parse_signed_amount(raw_amount: str) -> Decimal:
         raise ValueError(f"Некорректная сумма: {raw_amount}") from exc
 
 
-def _parse_statement_date(raw_date: str) -> dt.date:
+def parse_statement_date(raw_date: str) -> dt.date:
     raw_date = raw_date.strip()
     for fmt in ("%d.%m.%Y", "%d.%m.%y"):
         try:
@@ -164,7 +191,7 @@ def _parse_statement_date(raw_date: str) -> dt.date:
     raise ValueError(f"Некорректная дата: {raw_date}")
 
 
-def _currency_from_marker(marker: str | None) -> str:
+def currency_from_marker(marker: str | None) -> str:
     if marker is None:
         return "KZT"
     upper_marker = marker.upper()
@@ -175,7 +202,7 @@ def _currency_from_marker(marker: str | None) -> str:
     return upper_marker
 
 
-def _truncate_errors(errors: list[str], limit: int = MAX_IMPORT_ERRORS) -> list[str]:
+def truncate_errors(errors: list[str], limit: int = MAX_IMPORT_ERRORS) -> list[str]:
     if errors and re.match(r"^и ещё \d+ строк\(и\) с ошибками$", errors[-1]):
         return errors
     if len(errors) <= limit:
@@ -184,7 +211,7 @@ def _truncate_errors(errors: list[str], limit: int = MAX_IMPORT_ERRORS) -> list[
     return [*errors[:limit], f"и ещё {remain} строк(и) с ошибками"]
 
 
-def _split_operation_and_details(payload: str) -> tuple[str, str]:
+def split_operation_and_details(payload: str) -> tuple[str, str]:
     normalized = payload.strip()
     for operation in KNOWN_OPERATIONS:
         match = re.search(rf"(?<!\\S){re.escape(operation)}(?!\\S)", normalized)
@@ -201,14 +228,27 @@ def make_external_hash(
     currency: str,
     operation: str,
     details: str,
-    account_id: int | None = None,
-) -> str:
-    payload = f"{account_id or 0}|{tx_date.isoformat()}|{signed_amount}|{currency}|{operation}|{details}"
-    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    account_id: int,
+) -> bytes:
+    # The amount is formatted at the column's scale, so the hash can be
+    # recomputed from a stored transaction as well as from a parsed row.
+    payload = (
+        f"{account_id}|{tx_date.isoformat()}|{signed_amount:.2f}|{currency}|{operation}|{details}"
+    )
+    return hashlib.blake2b(
+        payload.encode("utf-8"), digest_size=16, key=EXTERNAL_HASH_KEY
+    ).digest()
+
+
+def hash_rows(rows: list[ParsedStatementRow], account_id: int) -> None:
+    for row in rows:
+        row.external_hash = make_external_hash(
+            row.tx_date, row.signed_amount, row.currency, row.operation, row.details, account_id
+        )
 
 
 def parse_statement_line(row_text: str, page_no: int) -> ParsedStatementRow:
-    normalized_line = _normalize_spaces(row_text)
+    normalized_line = normalize_spaces(row_text)
     match = ROW_START_PATTERN.match(normalized_line)
     if match is None:
         match = ROW_START_PATTERN_FALLBACK.match(normalized_line)
@@ -218,8 +258,8 @@ def parse_statement_line(row_text: str, page_no: int) -> ParsedStatementRow:
 
     date_raw, signed_amount_text, _, currency_raw, payload = match.groups()
 
-    tx_date = _parse_statement_date(date_raw)
-    signed_amount = _parse_signed_amount(signed_amount_text)
+    tx_date = parse_statement_date(date_raw)
+    signed_amount = parse_signed_amount(signed_amount_text)
     if signed_amount == 0:
         raise ValueError(f"Нулевая сумма не поддерживается (стр. {page_no}): {row_text}")
 
@@ -230,7 +270,7 @@ def parse_statement_line(row_text: str, page_no: int) -> ParsedStatementRow:
     if currency not in {"KZT", "USD"}:
         raise ValueError(f"Неподдерживаемая валюта '{currency}' на стр. {page_no}")
 
-    operation, details = _split_operation_and_details(payload)
+    operation, details = split_operation_and_details(payload)
     description = f"{operation} {details}".strip() if details else operation
     status = (
         TransactionStatus.PENDING
@@ -238,8 +278,6 @@ def parse_statement_line(row_text: str, page_no: int) -> ParsedStatementRow:
         else TransactionStatus.POSTED
     )
 
-    external_hash = make_external_hash(tx_date, signed_amount, currency, operation, details)
-
     return ParsedStatementRow(
         tx_date=tx_date,
         signed_amount=signed_amount,
@@ -250,7 +288,6 @@ def parse_statement_line(row_text: str, page_no: int) -> ParsedStatementRow:
         details=details,
         description=description,
         status=status,
-        external_hash=external_hash,
         signed_amount_text=signed_amount_text,
         page_no=page_no,
         row_text=normalized_line,
@@ -258,7 +295,7 @@ def parse_statement_line(row_text: str, page_no: int) -> ParsedStatementRow:
 
 
 def parse_kaspi_statement_line(row_text: str, page_no: int) -> ParsedStatementRow:
-    normalized_line = _normalize_spaces(row_text)
+    normalized_line = normalize_spaces(row_text)
     match = KASPI_ROW_PATTERN.match(normalized_line)
     if match is None:
         raise ValueError(f"Не удалось разобрать строку Kaspi на стр. {page_no}: {row_text}")
@@ -269,16 +306,16 @@ def parse_kaspi_statement_line(row_text: str, page_no: int) -> ParsedStatementRo
     marker = match.group("cur")
     rest = match.group("rest").strip()
 
-    tx_date = _parse_statement_date(date_raw)
+    tx_date = parse_statement_date(date_raw)
 
-    parsed_amount = _parse_signed_amount(amount_raw)
+    parsed_amount = parse_signed_amount(amount_raw)
     amount = abs(parsed_amount)
     if amount == 0:
         raise ValueError(f"Нулевая сумма не поддерживается (стр. {page_no}): {row_text}")
     signed_amount = amount if sign == "+" else -amount
 
     tx_type = TransactionType.EXPENSE if signed_amount < 0 else TransactionType.INCOME
-    currency = _currency_from_marker(marker)
+    currency = currency_from_marker(marker)
     if marker is None:
         if "₸" in rest:
             currency = "KZT"
@@ -296,7 +333,6 @@ def parse_kaspi_statement_line(row_text: str, page_no: int) -> ParsedStatementRo
         if "в обработке" in description.lower()
         else TransactionStatus.POSTED
     )
-    external_hash = make_external_hash(tx_date, signed_amount, currency, operation, details)
 
     return ParsedStatementRow(
         tx_date=tx_date,
@@ -308,7 +344,6 @@ def parse_kaspi_statement_line(row_text: str, page_no: int) -> ParsedStatementRo
         details=details,
         description=description,
         status=status,
-        external_hash=external_hash,
         signed_amount_text=f"{sign}{amount_raw}",
         page_no=page_no,
         row_text=normalized_line,
@@ -316,7 +351,7 @@ def parse_kaspi_statement_line(row_text: str, page_no: int) -> ParsedStatementRo
 
 
 def detect_bank_type(page_texts: list[str]) -> str:
-    full_text = _normalize_spaces("\n".join(page_texts)).lower()
+    full_text = normalize_spaces("\n".join(page_texts)).lower()
     if "kaspi" in full_text:
         return "kaspi"
     if "freedom" in full_text or "super card" in full_text:
@@ -328,19 +363,19 @@ def detect_bank_type(page_texts: list[str]) -> str:
 
 def _extract_kaspi_metadata(page_texts: list[str]) -> StatementMetadata:
     full_text = "\n".join(page_texts)
-    lines = [_normalize_spaces(line) for line in full_text.splitlines() if _normalize_spaces(line)]
+    lines = [normalize_spaces(line) for line in full_text.splitlines() if normalize_spaces(line)]
     available_entries: list[tuple[dt.date, Decimal]] = []
     for index, line in enumerate(lines):
         match = KASPI_AVAILABLE_LINE_PATTERN.search(line)
         if match:
             date_raw, amount_raw = match.groups()
-            available_entries.append((_parse_statement_date(date_raw), _parse_signed_amount(amount_raw)))
+            available_entries.append((parse_statement_date(date_raw), parse_signed_amount(amount_raw)))
             continue
 
         alt_match = KASPI_AVAILABLE_LINE_PATTERN_ALT.search(line)
         if alt_match:
             amount_raw, date_raw = alt_match.groups()
-            available_entries.append((_parse_statement_date(date_raw), _parse_signed_amount(amount_raw)))
+            available_entries.append((parse_statement_date(date_raw), parse_signed_amount(amount_raw)))
             continue
 
         date_only_match = KASPI_AVAILABLE_DATE_ONLY_PATTERN.search(line)
@@ -353,7 +388,7 @@ def _extract_kaspi_metadata(page_texts: list[str]) -> StatementMetadata:
                     if amount_match is not None:
                         break
             if amount_match:
-                available_entries.append((_parse_statement_date(date_raw), _parse_signed_amount(amount_match.group(1))))
+                available_entries.append((parse_statement_date(date_raw), parse_signed_amount(amount_match.group(1))))
 
     available_entries = sorted(available_entries, key=lambda item: item[0])
     opening_balance = available_entries[0][1] if available_entries else None
@@ -375,7 +410,7 @@ def _extract_freedom_metadata(page_texts: list[str]) -> StatementMetadata:
     full_text = "\n".join(page_texts)
     table_index = full_text.find(TABLE_HEADER)
     header_text = full_text if table_index < 0 else full_text[:table_index]
-    lines = [_normalize_spaces(line) for line in header_text.splitlines() if _normalize_spaces(line)]
+    lines = [normalize_spaces(line) for line in header_text.splitlines() if normalize_spaces(line)]
 
     balances_by_currency: dict[str, Decimal] = {}
     pending_balance: Decimal | None = None
@@ -384,23 +419,23 @@ def _extract_freedom_metadata(page_texts: list[str]) -> StatementMetadata:
     for line in lines:
         pending_match = FREEDOM_PENDING_HEADER_PATTERN.search(line)
         if pending_match and pending_balance is None:
-            pending_balance = abs(_parse_signed_amount(pending_match.group(1)))
+            pending_balance = abs(parse_signed_amount(pending_match.group(1)))
 
         if period_to is None:
             statement_date_match = FREEDOM_STATEMENT_DATE_PATTERN.search(line)
             if statement_date_match:
-                period_to = _parse_statement_date(statement_date_match.group(1))
+                period_to = parse_statement_date(statement_date_match.group(1))
 
         for amount_raw, marker in FREEDOM_CLOSING_CURRENCY_LINE_PATTERN.findall(line):
-            currency = _currency_from_marker(marker)
-            balances_by_currency[currency] = _parse_signed_amount(amount_raw)
+            currency = currency_from_marker(marker)
+            balances_by_currency[currency] = parse_signed_amount(amount_raw)
 
     # Fallback if balances are not prefixed with "остаток|баланс".
     if not balances_by_currency:
         header_sample = "\n".join(lines[:30])
         for amount_raw, marker in AMOUNT_WITH_CURRENCY_PATTERN.findall(header_sample):
-            currency = _currency_from_marker(marker)
-            balances_by_currency.setdefault(currency, _parse_signed_amount(amount_raw))
+            currency = currency_from_marker(marker)
+            balances_by_currency.setdefault(currency, parse_signed_amount(amount_raw))
 
     return StatementMetadata(
         bank_type="freedom",
@@ -419,32 +454,13 @@ def extract_statement_metadata(page_texts: list[str]) -> StatementMetadata:
     return _extract_freedom_metadata(page_texts)
 
 
-def _extract_page_texts(file_bytes: bytes) -> list[str]:
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        plumber_texts = [page.extract_text() or "" for page in pdf.pages]
-
-    reader = PdfReader(io.BytesIO(file_bytes))
-    pypdf_texts = [page.extract_text() or "" for page in reader.pages]
-
-    page_texts: list[str] = []
-    for index, plumber_text in enumerate(plumber_texts):
-        if plumber_text.strip():
-            page_texts.append(plumber_text)
-            continue
-
-        fallback_text = pypdf_texts[index] if index < len(pypdf_texts) else ""
-        page_texts.append(fallback_text)
-
-    return page_texts
-
-
 def _collect_candidate_rows(page_texts: list[str], bank_type: str) -> list[tuple[int, str]]:
     collected: list[tuple[int, str]] = []
     current_row: str | None = None
     current_page_no = 0
 
     for page_no, page_text in enumerate(page_texts, start=1):
-        lines = [_normalize_spaces(line) for line in page_text.splitlines()]
+        lines = [normalize_spaces(line) for line in page_text.splitlines()]
         lines = [line for line in lines if line]
 
         headers = [TABLE_HEADER]
@@ -491,16 +507,16 @@ def parse_statement_rows_from_page_texts(
         except ValueError as exc:
             errors.append(str(exc))
 
-    return rows, _truncate_errors(errors), len(candidates)
+    return rows, truncate_errors(errors), len(candidates)
 
 
 def deduplicate_rows(
     rows: list[ParsedStatementRow],
-    existing_hashes: set[str],
+    existing_hashes: set[bytes],
 ) -> tuple[list[ParsedStatementRow], int]:
     unique_rows: list[ParsedStatementRow] = []
     skipped = 0
-    in_file_hashes: set[str] = set()
+    in_file_hashes: set[bytes] = set()
 
     for row in rows:
         if row.external_hash in existing_hashes or row.external_hash in in_file_hashes:
@@ -512,17 +528,19 @@ def deduplicate_rows(
     return unique_rows, skipped
 
 
-async def import_pdf_statement(
+async def parse_pdf_statement(
     session: AsyncSession,
-    file_bytes: bytes,
+    file: BinaryIO,
     account_id: int,
-    import_id: int,
-) -> PDFImportResult:
-    if not file_bytes:
+) -> ParsedStatement:
+    file.seek(0)
+    if not file.read(1):
         raise ValueError("Файл пуст")
 
     try:
-        page_texts = _extract_page_texts(file_bytes)
+        page_texts = await extract_page_texts(file, ImportLimits.from_settings())
+    except ImportLimitExceeded:
+        raise
     except Exception as exc:  # noqa: BLE001
         raise ValueError("Не удалось прочитать PDF-выписку") from exc
     account_currency = await session.scalar(
@@ -535,68 +553,51 @@ async def import_pdf_statement(
         page_texts,
         bank_type=metadata.bank_type,
     )
-    for row in parsed_rows:
-        row.external_hash = make_external_hash(
-            tx_date=row.tx_date,
-            signed_amount=row.signed_amount,
-            currency=row.currency,
-            operation=row.operation,
-            details=row.details,
-            account_id=account_id,
-        )
+    hash_rows(parsed_rows, account_id)
+
+    return ParsedStatement(
+        account_id=account_id,
+        account_currency=account_currency,
+        metadata=metadata,
+        rows=parsed_rows,
+        errors=errors,
+        rows_total=rows_total,
+    )
 
-    if not parsed_rows:
-        return PDFImportResult(
-            rows_total=rows_total,
-            inserted=0,
-            skipped=0,
-            errors=_truncate_errors(errors),
-            account_id=account_id,
-        )
 
-    hashes = [row.external_hash for row in parsed_rows]
+async def find_new_rows(
+    session: AsyncSession,
+    rows: list[ParsedStatementRow],
+) -> tuple[list[ParsedStatementRow], int]:
+    if not rows:
+        return [], 0
+    hashes = [row.external_hash for row in rows]
     existing_result = await session.scalars(
         select(Transaction.external_hash).where(Transaction.external_hash.in_(hashes))
     )
     existing_hashes = {value for value in existing_result.all() if value is not None}
+    return deduplicate_rows(rows, existing_hashes)
 
-    unique_rows, skipped = deduplicate_rows(parsed_rows, existing_hashes)
 
-    inserted = 0
-    for row in unique_rows:
-        try:
-            transaction = Transaction(
-                description=row.description,
-                amount=row.amount,
-                signed_amount=row.signed_amount,
-                currency=row.currency,
-                type=row.tx_type,
-                kind=TransactionKind(row.tx_type.value),
-                status=row.status,
-                account_id=account_id,
-                import_id=import_id,
-                category_id=0,
-                tx_date=row.tx_date,
-                source=TransactionSource.IMPORT_PDF,
-                external_hash=row.external_hash,
-                category_locked=False,
-                raw={
-                    "operation": row.operation,
-                    "details": row.details,
-                    "signed_amount_text": row.signed_amount_text,
-                    "page_no": row.page_no,
-                    "row_text": row.row_text,
-                },
-            )
-            await apply_category(session, transaction)
-            session.add(transaction)
-            inserted += 1
-        except Exception as exc:  # noqa: BLE001
-            errors.append(f"Не удалось сохранить строку (стр. {row.page_no}): {exc}")
-
-    currencies = {row.currency for row in parsed_rows}
-    dates = [row.tx_date for row in parsed_rows]
-    selected_currency = currencies.pop() if len(currencies) == 1 else account_currency
+def summarize_statement(
+    parsed: ParsedStatement,
+    inserted: int,
+    skipped: int,
+    errors: list[str],
+) -> PDFImportResult:
+    if not parsed.rows:
+        return PDFImportResult(
+            rows_total=parsed.rows_total,
+            inserted=inserted,
+            skipped=skipped,
+            errors=truncate_errors(errors),
+            account_id=parsed.account_id,
+        )
+
+    metadata = parsed.metadata
+    currencies = {row.currency for row in parsed.rows}
+    dates = [row.tx_date for row in parsed.rows]
+    selected_currency = currencies.pop() if len(currencies) == 1 else parsed.account_currency
     closing_balance = None
     if selected_currency is not None:
         closing_balance = metadata.closing_balance_by_currency.get(selected_currency)
@@ -607,11 +608,11 @@ async def import_pdf_statement(
     period_to = metadata.period_to or (max(dates) if dates else None)
 
     return PDFImportResult(
-        rows_total=rows_total,
+        rows_total=parsed.rows_total,
         inserted=inserted,
         skipped=skipped,
-        errors=_truncate_errors(errors),
-        account_id=account_id,
+        errors=truncate_errors(errors),
+        account_id=parsed.account_id,
         period_from=period_from,
         period_to=period_to,
         currency=selected_currency,
@@ -619,3 +620,137 @@ async def import_pdf_statement(
         closing_balance=closing_balance,
         pending_balance=metadata.pending_balance,
     )
+
+
+def categorize_rows(refs: ReferenceData, rows: list[ParsedStatementRow]) -> None:
+    # A category picked earlier (e.g. shown in a preview) is kept unless it has
+    # been deleted since.
+    for row in rows:
+        if row.category_id is None or row.category_id not in refs.categories:
+            row.category_id = pick_category(refs, row.description, row.tx_type)
+
+
+def _transaction_values(row: ParsedStatementRow, account_id: int, import_id: int) -> dict[str, Any]:
+    return {
+        "description": row.description,
+        "amount": row.amount,
+        "signed_amount": row.signed_amount,
+        "currency": row.currency,
+        "type": row.tx_type,
+        "kind": TransactionKind(row.tx_type.value),
+        "status": row.status,
+        "account_id": account_id,
+        "import_id": import_id,
+        "category_id": row.category_id,
+        "tx_date": row.tx_date,
+        "source": TransactionSource.IMPORT_PDF,
+        "external_hash": row.external_hash,
+        "category_locked": False,
+    }
+
+
+def raw_payload(row: ParsedStatementRow) -> dict[str, Any]:
+    return {
+        "operation": row.operation,
+        "details": row.details,
+        "signed_amount_text": row.signed_amount_text,
+        "page_no": row.page_no,
+        "row_text": row.row_text,
+    }
+
+
+async def insert_transaction_rows(
+    session: AsyncSession, values: list[dict[str, Any]]
+) -> dict[bytes, int]:
+    # Rows that another import saved after the hash check are skipped, not failed.
+    result = await session.execute(
+        pg_insert(Transaction)
+        .values(values)
+        .on_conflict_do_nothing(index_elements=[Transaction.external_hash])
+        .returning(Transaction.external_hash, Transaction.id)
+    )
+    return dict(result.tuples().all())
+
+
+async def save_statement_rows(
+    session: AsyncSession,
+    parsed: ParsedStatement,
+    rows: list[ParsedStatementRow],
+    skipped: int,
+    statement_import: StatementImport,
+) -> PDFImportResult:
+    errors = list(parsed.errors)
+    categorize_rows(await get_reference_data(session), rows)
+    chunk_size = get_settings().import_chunk_size
+
+    statement_import.rows_total = parsed.rows_total
+    inserted = 0
+    # Each chunk is its own SAVEPOINT and is committed with the progress
+    # counters, so locks are held for one chunk at a time. A chunk that fails
+    # is retried row by row and only the offending rows end up in errors.
+    # The account lock is taken again in every chunk transaction, so a
+    # concurrent import into the same account interleaves by chunk, and a
+    # rollback that started meanwhile stops the import (ImportRolledBack).
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        values = [_transaction_values(row, parsed.account_id, statement_import.id) for row in chunk]
+        failed = 0
+        await lock_accounts(session, [parsed.account_id])
+        await ensure_not_rolled_back(session, statement_import)
+        try:
+            async with session.begin_nested():
+                inserted_ids = await insert_transaction_rows(session, values)
+        except DBAPIError:
+            inserted_ids = {}
+            for row, row_values in zip(chunk, values, strict=True):
+                try:
+                    async with session.begin_nested():
+                        inserted_ids.update(await insert_transaction_rows(session, [row_values]))
+                except DBAPIError as exc:
+                    failed += 1
+                    # asyncpg errors come wrapped as "<class '...'>: message".
+                    reason = str(exc.orig).split(">: ", 1)[-1]
+                    errors.append(f"Не удалось сохранить строку (стр. {row.page_no}): {reason}")
+
+        await save_raw_payloads(
+            session,
+            statement_import.id,
+            {
+                inserted_ids[row.external_hash]: raw_payload(row)
+                for row in chunk
+                if row.external_hash in inserted_ids
+            },
+        )
+        chunk_inserted = len(inserted_ids)
+        inserted += chunk_inserted
+        skipped += len(chunk) - chunk_inserted - failed
+        statement_import.inserted = inserted
+        statement_import.skipped = skipped
+        await notify_event(
+            session,
+            "import",
+            {
+                "import_id": statement_import.id,
+                "account_id": statement_import.account_id,
+                "stage": "progress",
+                "rows_total": parsed.rows_total,
+                "inserted": inserted,
+                "skipped": skipped,
+            },
+        )
+        await session.commit()
+
+    return summarize_statement(parsed, inserted, skipped, errors)
+
+
+async def import_pdf_statement(
+    session: AsyncSession,
+    file: BinaryIO,
+    statement_import: StatementImport,
+) -> PDFImportResult:
+    parsed = await parse_pdf_statement(session, file, statement_import.account_id)
+    if not parsed.rows:
+        return summarize_statement(parsed, inserted=0, skipped=0, errors=parsed.errors)
+
+    unique_rows, skipped = await find_new_rows(session, parsed.rows)
+    return await save_statement_rows(session, parsed, unique_rows, skipped, statement_import)
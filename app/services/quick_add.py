@@ -43,3 +43,8 @@ def parse_quick_add_text(text: str) -> ParsedQuickAdd:
     tx_type = TransactionType.INCOME if "+" in cleaned else TransactionType.EXPENSE
 
     return ParsedQuickAdd(description=description, amount=amount, tx_type=tx_type)
+
+
+def split_quick_add_lines(text: str) -> list[tuple[int, str]]:
+    # Keeps the original line numbers so results can be matched to the input.
+    return [(index, line.strip()) for index, line in enumerate(text.splitlines()) if line.strip()]
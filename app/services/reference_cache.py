@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.settings import get_settings
+from app.models.account import Account
+from app.models.category import Category
+from app.models.category_rule import CategoryRule
+from app.models.enums import RuleMatchType, TransactionType
+from app.services.data_versions import (
+    ACCOUNTS_SCOPE,
+    CATEGORIES_SCOPE,
+    RULES_SCOPE,
+    VersionVector,
+    get_version_vector,
+)
+
+DEFAULT_ACCOUNT_NAME = "Основной счет"
+LEGACY_DEFAULT_ACCOUNT_NAME = "Main Account"
+DEFAULT_CATEGORY_NAME = "Other"
+
+REFERENCE_SCOPES = [ACCOUNTS_SCOPE, CATEGORIES_SCOPE, RULES_SCOPE]
+
+
+@dataclass(frozen=True, slots=True)
+class AccountRef:
+    id: int
+    name: str
+    bank: str
+    currency: str
+    is_active: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryRef:
+    id: int
+    name: str
+    type: TransactionType
+
+
+@dataclass(slots=True)
+class RuleCandidate:
+    pattern: str
+    match_type: RuleMatchType
+    category_id: int
+    priority: int
+    created_at: datetime
+    is_active: bool
+
+
+@dataclass(slots=True)
+class ReferenceData:
+    versions: VersionVector
+    accounts: dict[int, AccountRef] = field(default_factory=dict)
+    categories: dict[int, CategoryRef] = field(default_factory=dict)
+    rules_by_type: dict[TransactionType, list[RuleCandidate]] = field(default_factory=dict)
+    default_account_id: int | None = None
+    default_category_ids: dict[TransactionType, int] = field(default_factory=dict)
+    checked_at: float = 0.0
+
+    def covers(self, account_ids: Iterable[int], category_ids: Iterable[int]) -> bool:
+        return all(item in self.accounts for item in account_ids) and all(
+            item in self.categories for item in category_ids
+        )
+
+
+def pick_default_account_id(accounts: Iterable[AccountRef]) -> int | None:
+    by_name = {}
+    lowest_id = None
+    for account in accounts:
+        by_name.setdefault(account.name, account.id)
+        if lowest_id is None or account.id < lowest_id:
+            lowest_id = account.id
+    return (
+        by_name.get(DEFAULT_ACCOUNT_NAME) or by_name.get(LEGACY_DEFAULT_ACCOUNT_NAME) or lowest_id
+    )
+
+
+async def _load_reference_data(session: AsyncSession, versions: VersionVector) -> ReferenceData:
+    data = ReferenceData(versions=versions)
+
+    for account in await session.scalars(select(Account).order_by(Account.id.asc())):
+        data.accounts[account.id] = AccountRef(
+            id=account.id,
+            name=account.name,
+            bank=account.bank,
+            currency=account.currency,
+            is_active=account.is_active,
+        )
+    for category in await session.scalars(select(Category).order_by(Category.id.asc())):
+        data.categories[category.id] = CategoryRef(
+            id=category.id, name=category.name, type=category.type
+        )
+        if category.name == DEFAULT_CATEGORY_NAME:
+            data.default_category_ids.setdefault(category.type, category.id)
+
+    rules = await session.scalars(
+        select(CategoryRule)
+        .where(CategoryRule.is_active.is_(True))
+        .order_by(CategoryRule.priority.desc(), CategoryRule.created_at.desc())
+    )
+    for rule in rules:
+        category = data.categories.get(rule.category_id)
+        if category is None:
+            continue
+        data.rules_by_type.setdefault(category.type, []).append(
+            RuleCandidate(
+                pattern=rule.pattern,
+                match_type=rule.match_type,
+                category_id=rule.category_id,
+                priority=rule.priority,
+                created_at=rule.created_at,
+                is_active=rule.is_active,
+            )
+        )
+
+    data.default_account_id = pick_default_account_id(data.accounts.values())
+    return data
+
+
+_cached: ReferenceData | None = None
+
+
+def invalidate_reference_data() -> None:
+    global _cached
+    _cached = None
+
+
+async def get_reference_data(
+    session: AsyncSession,
+    account_ids: Iterable[int] = (),
+    category_ids: Iterable[int] = (),
+    revalidate: bool = False,
+) -> ReferenceData:
+    # Accounts, categories and rules are served from memory. Writes in this
+    # process invalidate the cache directly; writes from other workers are picked
+    # up through data_versions, checked at most once per TTL. Unknown ids force a
+    # check right away, and so does revalidate for results that end up in the
+    # version-keyed response cache. Only changed versions reload: an id that is
+    # still unknown after the check doesn't exist, and the caller answers 404.
+    global _cached
+    account_ids = set(account_ids)
+    category_ids = set(category_ids)
+    now = time.monotonic()
+    ttl = get_settings().reference_cache_ttl_seconds
+
+    cached = _cached
+    covered = cached is not None and cached.covers(account_ids, category_ids)
+    if covered and not revalidate and now - cached.checked_at < ttl:
+        return cached
+
+    versions = await get_version_vector(session, REFERENCE_SCOPES)
+    if cached is not None and cached.versions == versions:
+        cached.checked_at = now
+        return cached
+
+    loaded = await _load_reference_data(session, versions)
+    loaded.checked_at = now
+    _cached = loaded
+    return loaded
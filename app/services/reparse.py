@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import multiprocessing
+import tempfile
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import BigInteger, LargeBinary, any_, bindparam, delete, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Account
+from app.models.enums import TransactionKind, TransactionSource, TransactionStatus, TransactionType
+from app.models.statement_import import StatementImport
+from app.models.transaction import Transaction
+from app.models.transaction_raw import TransactionRaw
+from app.services.account_locks import lock_accounts
+from app.services.categorization_service import pick_category
+from app.services.import_limits import ImportLimits
+from app.services.pdf_extraction import read_page_texts
+from app.services.pdf_import_service import (
+    PARSER_VERSION,
+    extract_statement_metadata,
+    hash_rows,
+    insert_transaction_rows,
+    parse_statement_rows_from_page_texts,
+    raw_payload,
+)
+from app.services.reference_cache import get_reference_data
+from app.services.statement_store import StatementStore, statement_store
+from app.services.tabular_import_service import (
+    DESCRIPTION_MAX_LENGTH,
+    TABLE_PARSER_VERSION,
+    read_table_statement,
+    table_raw_payload,
+)
+from app.services.transaction_raw import drop_raw_payloads, save_raw_payloads
+
+PARSER_VERSIONS = {"pdf": PARSER_VERSION, "csv": TABLE_PARSER_VERSION, "xlsx": TABLE_PARSER_VERSION}
+SOURCES = {
+    "pdf": TransactionSource.IMPORT_PDF,
+    "csv": TransactionSource.IMPORT_CSV,
+    "xlsx": TransactionSource.IMPORT_XLSX,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ReparseJob:
+    import_id: int
+    source: str
+    blob_key: str
+    account_id: int
+    account_currency: str
+
+
+@dataclass(slots=True)
+class ReparsedRow:
+    tx_date: dt.date
+    signed_amount: Decimal
+    amount: Decimal
+    tx_type: TransactionType
+    currency: str
+    description: str
+    status: TransactionStatus
+    external_hash: bytes
+    raw: dict[str, Any]
+
+
+@dataclass(slots=True)
+class StoredTransaction:
+    id: int
+    external_hash: bytes | None
+    tx_date: dt.date
+    signed_amount: Decimal
+    currency: str
+    description: str
+    status: TransactionStatus
+    transfer_pair_id: UUID | None
+    # What the previous parser produced for the row (transaction_raw).
+    raw: dict[str, Any] | None = None
+
+
+@dataclass(slots=True)
+class StatementDiff:
+    updates: list[tuple[StoredTransaction, ReparsedRow]] = field(default_factory=list)
+    inserts: list[ReparsedRow] = field(default_factory=list)
+    deletes: list[int] = field(default_factory=list)
+    # Stale transactions left alone because they are paired as transfers.
+    kept: list[int] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.updates or self.inserts or self.deletes)
+
+
+@dataclass(slots=True)
+class ReparseReport:
+    job: ReparseJob
+    rows: int = 0
+    diff: StatementDiff | None = None
+    error: str | None = None
+
+
+def parse_stored_statement(job: ReparseJob, store_root: str) -> list[ReparsedRow]:
+    # Runs in a pool worker: the blob is unpacked to a temp file and parsed
+    # exactly as an upload would be, without touching the database.
+    suffix = f".{job.source}"
+    with tempfile.NamedTemporaryFile(suffix=suffix) as copy:
+        StatementStore(store_root).copy_to(job.blob_key, copy)
+        copy.flush()
+        copy.seek(0)
+        if job.source == "pdf":
+            return _parse_pdf(copy.name, job)
+        return [
+            ReparsedRow(
+                tx_date=row.tx_date,
+                signed_amount=row.signed_amount,
+                amount=row.amount,
+                tx_type=row.tx_type,
+                currency=row.currency,
+                description=row.description,
+                status=row.status,
+                external_hash=row.external_hash,
+                raw=table_raw_payload(row),
+            )
+            for row in read_table_statement(
+                copy, SOURCES[job.source], job.account_id, job.account_currency
+            )
+            if not isinstance(row, str)
+        ]
+
+
+def _parse_pdf(path: str, job: ReparseJob) -> list[ReparsedRow]:
+    page_texts = read_page_texts(path, ImportLimits.from_settings())
+    metadata = extract_statement_metadata(page_texts)
+    rows, _, _ = parse_statement_rows_from_page_texts(page_texts, bank_type=metadata.bank_type)
+    hash_rows(rows, job.account_id)
+    return [
+        ReparsedRow(
+            tx_date=row.tx_date,
+            signed_amount=row.signed_amount,
+            amount=row.amount,
+            tx_type=row.tx_type,
+            currency=row.currency,
+            description=row.description,
+            status=row.status,
+            external_hash=row.external_hash,
+            raw=raw_payload(row),
+        )
+        for row in rows
+    ]
+
+
+def _parsed_description(raw: dict[str, Any]) -> str:
+    operation, details = raw.get("operation") or "", raw.get("details") or ""
+    return f"{operation} {details}".strip() if details else operation
+
+
+def corrected_values(item: StoredTransaction, row: ReparsedRow) -> dict[str, Any]:
+    # Only what the parser produced differently is written. Date, amount and
+    # currency are equal by construction (they are part of both the hash and
+    # the fallback match), and description and status are only replaced when
+    # the operation or details changed and nobody edited the description since
+    # the previous parse; status follows the description it is derived from.
+    values: dict[str, Any] = {}
+    if item.external_hash != row.external_hash:
+        values["external_hash"] = row.external_hash
+    old = item.raw
+    if (
+        old is not None
+        and (old.get("operation"), old.get("details"))
+        != (row.raw.get("operation"), row.raw.get("details"))
+        and item.description == _parsed_description(old)[:DESCRIPTION_MAX_LENGTH]
+    ):
+        if item.description != row.description:
+            values["description"] = row.description
+        if item.status != row.status:
+            values["status"] = row.status
+    return {"id": item.id, **values} if values else {}
+
+
+def diff_statement(stored: list[StoredTransaction], rows: list[ReparsedRow]) -> StatementDiff:
+    diff = StatementDiff()
+    by_hash = {item.external_hash: item for item in stored if item.external_hash is not None}
+    matched: set[int] = set()
+    unmatched: list[ReparsedRow] = []
+    seen_hashes: set[bytes] = set()
+
+    for row in rows:
+        # Repeated rows collapse into one, as they do on import.
+        if row.external_hash in seen_hashes:
+            continue
+        seen_hashes.add(row.external_hash)
+        existing = by_hash.get(row.external_hash)
+        if existing is None:
+            unmatched.append(row)
+            continue
+        matched.add(existing.id)
+        if existing.raw != row.raw:
+            diff.updates.append((existing, row))
+
+    # A fix that changes operation or details changes the hash too; such rows
+    # are matched to the old transaction with the same date, amount and
+    # currency and corrected in place, so categories and edits survive.
+    # Matched rows whose parser output (transaction_raw) is unchanged are left
+    # alone; the others get a fresh raw payload and corrected_values.
+    leftovers: dict[tuple[dt.date, Decimal, str], deque[StoredTransaction]] = defaultdict(deque)
+    for item in stored:
+        if item.id not in matched:
+            leftovers[(item.tx_date, item.signed_amount, item.currency)].append(item)
+    for row in unmatched:
+        candidates = leftovers.get((row.tx_date, row.signed_amount, row.currency))
+        if candidates:
+            diff.updates.append((candidates.popleft(), row))
+        else:
+            diff.inserts.append(row)
+
+    for candidates in leftovers.values():
+        for item in candidates:
+            if item.transfer_pair_id is not None:
+                diff.kept.append(item.id)
+            else:
+                diff.deletes.append(item.id)
+    return diff
+
+
+async def load_reparse_jobs(session: AsyncSession, force: bool = False) -> list[ReparseJob]:
+    rows = await session.execute(
+        select(
+            StatementImport.id,
+            StatementImport.source,
+            StatementImport.blob_key,
+            StatementImport.account_id,
+            StatementImport.parser_version,
+            Account.currency,
+        )
+        .join(Account, Account.id == StatementImport.account_id)
+        .where(
+            StatementImport.blob_key.is_not(None),
+            StatementImport.status == "completed",
+            StatementImport.source.in_(list(PARSER_VERSIONS)),
+        )
+        .order_by(StatementImport.id)
+    )
+    return [
+        ReparseJob(import_id, source, blob_key, account_id, currency)
+        for import_id, source, blob_key, account_id, parser_version, currency in rows.all()
+        if force or parser_version is None or parser_version < PARSER_VERSIONS[source]
+    ]
+
+
+async def load_stored_transactions(
+    session: AsyncSession, import_id: int
+) -> list[StoredTransaction]:
+    rows = await session.execute(
+        select(
+            Transaction.id,
+            Transaction.external_hash,
+            Transaction.tx_date,
+            Transaction.signed_amount,
+            Transaction.currency,
+            Transaction.description,
+            Transaction.status,
+            Transaction.transfer_pair_id,
+        )
+        .where(Transaction.import_id == import_id)
+        .order_by(Transaction.id)
+    )
+    payloads: dict[str, dict[str, Any]] = {}
+    for batch in await session.scalars(
+        select(TransactionRaw.payloads).where(TransactionRaw.import_id == import_id)
+    ):
+        payloads.update(batch)
+    return [StoredTransaction(*row, raw=payloads.get(str(row.id))) for row in rows.all()]
+
+
+async def drop_foreign_rows(
+    session: AsyncSession, import_id: int, rows: list[ReparsedRow]
+) -> list[ReparsedRow]:
+    # Rows another import already holds were skipped when this statement was
+    # imported and stay with that import.
+    foreign = set(
+        await session.scalars(
+            select(Transaction.external_hash).where(
+                Transaction.external_hash
+                == any_(
+                    bindparam(
+                        "hashes",
+                        [row.external_hash for row in rows],
+                        type_=ARRAY(LargeBinary),
+                    )
+                ),
+                Transaction.import_id.is_distinct_from(import_id),
+            )
+        )
+    )
+    return [row for row in rows if row.external_hash not in foreign]
+
+
+async def apply_statement_diff(
+    session: AsyncSession,
+    job: ReparseJob,
+    diff: StatementDiff,
+) -> None:
+    refs = await get_reference_data(session)
+    await lock_accounts(session, [job.account_id])
+
+    # Deletes go first so a corrected row can take over a hash that only a
+    # stale row of the same import had.
+    if diff.deletes:
+        await session.execute(
+            delete(Transaction).where(
+                Transaction.id == any_(bindparam("ids", diff.deletes, type_=ARRAY(BigInteger)))
+            )
+        )
+    corrections = [
+        values for item, row in diff.updates if (values := corrected_values(item, row))
+    ]
+    if corrections:
+        # Bulk UPDATE by primary key; rows are grouped by the columns they set.
+        await session.execute(update(Transaction), corrections)
+
+    inserted: dict[bytes, int] = {}
+    if diff.inserts:
+        inserted = await insert_transaction_rows(
+            session,
+            [
+                {
+                    "description": row.description,
+                    "amount": row.amount,
+                    "signed_amount": row.signed_amount,
+                    "currency": row.currency,
+                    "type": row.tx_type,
+                    "kind": TransactionKind(row.tx_type.value),
+                    "status": row.status,
+                    "account_id": job.account_id,
+                    "import_id": job.import_id,
+                    "category_id": pick_category(refs, row.description, row.tx_type),
+                    "tx_date": row.tx_date,
+                    "source": SOURCES[job.source],
+                    "external_hash": row.external_hash,
+                    "category_locked": False,
+                }
+                for row in diff.inserts
+            ],
+        )
+
+    await drop_raw_payloads(
+        session, job.import_id, diff.deletes + [item.id for item, _ in diff.updates]
+    )
+    payloads = {item.id: row.raw for item, row in diff.updates}
+    payloads.update(
+        {
+            inserted[row.external_hash]: row.raw
+            for row in diff.inserts
+            if row.external_hash in inserted
+        }
+    )
+    await save_raw_payloads(session, job.import_id, payloads)
+
+
+async def reparse_statements(
+    session: AsyncSession,
+    apply: bool = False,
+    workers: int | None = None,
+    force: bool = False,
+    store_root: Path | None = None,
+) -> AsyncIterator[ReparseReport]:
+    # Statements are parsed in a process pool, as many at a time as there
+    # are workers; each result is diffed and, with apply, written in its own
+    # transaction as soon as it arrives.
+    jobs = await load_reparse_jobs(session, force=force)
+    if not jobs:
+        return
+    root = str(store_root or statement_store.root)
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+
+        async def parse(job: ReparseJob) -> tuple[ReparseJob, list[ReparsedRow] | str]:
+            try:
+                return job, await loop.run_in_executor(
+                    executor, parse_stored_statement, job, root
+                )
+            except Exception as exc:  # noqa: BLE001
+                return job, str(exc) or repr(exc)
+
+        for pending in asyncio.as_completed([parse(job) for job in jobs]):
+            job, rows = await pending
+            if isinstance(rows, str):
+                yield ReparseReport(job=job, error=rows)
+                continue
+            stored = await load_stored_transactions(session, job.import_id)
+            own_rows = await drop_foreign_rows(session, job.import_id, rows)
+            report = ReparseReport(job=job, rows=len(rows), diff=diff_statement(stored, own_rows))
+            if apply:
+                try:
+                    await apply_statement_diff(session, job, report.diff)
+                    await session.execute(
+                        update(StatementImport)
+                        .where(StatementImport.id == job.import_id)
+                        .values(parser_version=PARSER_VERSIONS[job.source])
+                    )
+                    await session.commit()
+                except DBAPIError as exc:
+                    await session.rollback()
+                    report.error = str(exc.orig).split(">: ", 1)[-1]
+            yield report
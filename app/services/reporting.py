@@ -1,9 +1,28 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import datetime as dt
+from dataclasses import dataclass, field
 from decimal import Decimal
 
-from app.models.enums import TransactionKind
+from sqlalchemy import (
+    Date,
+    and_,
+    cast,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+    true,
+    tuple_,
+    union,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.category import Category
+from app.models.enums import TransactionKind, TransactionStatus
+from app.models.monthly_rollup import MonthlyRollup
+from app.schemas.report import CategoryBreakdownItem, MonthlyReportResponse
 
 
 @dataclass(slots=True)
@@ -12,6 +31,15 @@ class KindAmount:
     signed_amount: Decimal
 
 
+@dataclass(slots=True)
+class MonthlyReport:
+    total_income: Decimal
+    total_expense: Decimal
+    total_transfers: Decimal
+    total_pending: Decimal
+    breakdown: list[tuple[str, Decimal]] = field(default_factory=list)
+
+
 def summarize_kind_amounts(rows: list[KindAmount]) -> tuple[Decimal, Decimal, Decimal]:
     total_income = Decimal("0")
     total_expense = Decimal("0")
@@ -26,3 +54,218 @@ def summarize_kind_amounts(rows: list[KindAmount]) -> tuple[Decimal, Decimal, De
             total_transfers += abs(row.signed_amount)
 
     return total_income, total_expense, total_transfers
+
+
+async def get_monthly_report(
+    session: AsyncSession,
+    month_start: dt.date,
+    account_id: int | None = None,
+) -> MonthlyReport:
+    filters = [MonthlyRollup.month == month_start]
+    if account_id is not None:
+        filters.append(MonthlyRollup.account_id == account_id)
+
+    posted = MonthlyRollup.status == TransactionStatus.POSTED
+    kind = MonthlyRollup.kind
+
+    # Reads the trigger-maintained rollups, so the cost is O(categories) rather
+    # than O(transactions). The () grouping set yields the totals row and the
+    # (category) set yields the expense breakdown.
+    rows = await session.execute(
+        select(
+            func.grouping(Category.name).label("is_total"),
+            Category.name,
+            func.sum(MonthlyRollup.total_amount).filter(posted, kind == TransactionKind.INCOME),
+            func.sum(MonthlyRollup.total_amount).filter(posted, kind == TransactionKind.EXPENSE),
+            func.sum(MonthlyRollup.outflow_amount).filter(posted, kind == TransactionKind.TRANSFER),
+            func.sum(MonthlyRollup.total_amount).filter(
+                MonthlyRollup.status == TransactionStatus.PENDING
+            ),
+        )
+        .select_from(MonthlyRollup)
+        .join(Category, Category.id == MonthlyRollup.category_id)
+        .where(*filters)
+        .group_by(func.grouping_sets(tuple_(), tuple_(Category.name)))
+    )
+
+    report = MonthlyReport(
+        total_income=Decimal("0"),
+        total_expense=Decimal("0"),
+        total_transfers=Decimal("0"),
+        total_pending=Decimal("0"),
+    )
+    for is_total, category_name, income, expense, transfers, pending in rows.all():
+        if is_total:
+            report.total_income = income or Decimal("0")
+            report.total_expense = expense or Decimal("0")
+            report.total_transfers = transfers or Decimal("0")
+            report.total_pending = pending or Decimal("0")
+        elif expense and category_name is not None:
+            report.breakdown.append((category_name, expense))
+
+    report.breakdown.sort(key=lambda item: item[1], reverse=True)
+    return report
+
+
+@dataclass(slots=True)
+class TrendMonth:
+    month: dt.date
+    total_income: Decimal
+    total_expense: Decimal
+    total_transfers: Decimal
+    income_delta: Decimal | None
+    expense_delta: Decimal | None
+    transfers_delta: Decimal | None
+
+
+@dataclass(slots=True)
+class CategoryTrendMonth:
+    month: dt.date
+    total: Decimal
+    delta: Decimal | None
+
+
+@dataclass(slots=True)
+class TrendReport:
+    months: list[TrendMonth] = field(default_factory=list)
+    categories: dict[str, list[CategoryTrendMonth]] = field(default_factory=dict)
+
+
+async def monthly_report_read(
+    session: AsyncSession,
+    month_start: dt.date,
+    account_id: int | None = None,
+) -> MonthlyReportResponse:
+    report = await get_monthly_report(session, month_start, account_id=account_id)
+    return MonthlyReportResponse(
+        total_income=report.total_income,
+        total_expense=report.total_expense,
+        total_transfers=report.total_transfers,
+        total_pending=report.total_pending,
+        balance=report.total_income - report.total_expense,
+        breakdown_by_category=[
+            CategoryBreakdownItem(category=name, total=total) for name, total in report.breakdown
+        ],
+    )
+
+
+async def get_trend_report(
+    session: AsyncSession,
+    from_month: dt.date,
+    to_month: dt.date,
+    account_id: int | None = None,
+) -> TrendReport:
+    filters = [MonthlyRollup.month >= from_month, MonthlyRollup.month <= to_month]
+    if account_id is not None:
+        filters.append(MonthlyRollup.account_id == account_id)
+
+    posted = MonthlyRollup.status == TransactionStatus.POSTED
+    kind = MonthlyRollup.kind
+
+    months = (
+        select(
+            cast(
+                func.generate_series(from_month, to_month, literal_column("interval '1 month'")),
+                Date,
+            ).label("month")
+        )
+    ).cte("months")
+
+    # (month) rows carry the overall totals, (month, category) rows the expense
+    # breakdown; both come from the same scan of the rollups.
+    aggregated = (
+        select(
+            MonthlyRollup.month,
+            func.grouping(Category.name).label("is_total"),
+            Category.name.label("category"),
+            func.sum(MonthlyRollup.total_amount)
+            .filter(posted, kind == TransactionKind.INCOME)
+            .label("income"),
+            func.sum(MonthlyRollup.total_amount)
+            .filter(posted, kind == TransactionKind.EXPENSE)
+            .label("expense"),
+            func.sum(MonthlyRollup.outflow_amount)
+            .filter(posted, kind == TransactionKind.TRANSFER)
+            .label("transfers"),
+        )
+        .join(Category, Category.id == MonthlyRollup.category_id)
+        .where(*filters)
+        .group_by(
+            func.grouping_sets(
+                tuple_(MonthlyRollup.month),
+                tuple_(MonthlyRollup.month, Category.name),
+            )
+        )
+    ).cte("aggregated")
+
+    series = union(
+        select(literal(1).label("is_total"), null().label("category")),
+        select(aggregated.c.is_total, aggregated.c.category).where(
+            aggregated.c.is_total == 0,
+            aggregated.c.expense.is_not(None),
+        ),
+    ).cte("series")
+
+    # Every series gets a point for every month so LAG compares adjacent months
+    # even when a category had no spending in between.
+    income = func.coalesce(aggregated.c.income, 0)
+    expense = func.coalesce(aggregated.c.expense, 0)
+    transfers = func.coalesce(aggregated.c.transfers, 0)
+    window = {
+        "partition_by": [series.c.is_total, series.c.category],
+        "order_by": months.c.month,
+    }
+    rows = await session.execute(
+        select(
+            months.c.month,
+            series.c.is_total,
+            series.c.category,
+            income,
+            expense,
+            transfers,
+            income - func.lag(income).over(**window),
+            expense - func.lag(expense).over(**window),
+            transfers - func.lag(transfers).over(**window),
+        )
+        .select_from(months)
+        .join(series, true())
+        .outerjoin(
+            aggregated,
+            and_(
+                aggregated.c.month == months.c.month,
+                aggregated.c.is_total == series.c.is_total,
+                aggregated.c.category.is_not_distinct_from(series.c.category),
+            ),
+        )
+        .order_by(series.c.is_total.desc(), series.c.category, months.c.month)
+    )
+
+    report = TrendReport()
+    for (
+        month,
+        is_total,
+        category,
+        month_income,
+        month_expense,
+        month_transfers,
+        income_delta,
+        expense_delta,
+        transfers_delta,
+    ) in rows.all():
+        if is_total:
+            report.months.append(
+                TrendMonth(
+                    month=month,
+                    total_income=month_income,
+                    total_expense=month_expense,
+                    total_transfers=month_transfers,
+                    income_delta=income_delta,
+                    expense_delta=expense_delta,
+                    transfers_delta=transfers_delta,
+                )
+            )
+        else:
+            report.categories.setdefault(category, []).append(
+                CategoryTrendMonth(month=month, total=month_expense, delta=expense_delta)
+            )
+    return report
@@ -0,0 +1,100 @@
+import hashlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.settings import get_settings
+from app.services.data_versions import VersionVector, get_version_vector
+
+
+@dataclass(slots=True)
+class CachedPayload:
+    content: Any
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+response_cache = ResponseCache(get_settings().response_cache_max_entries)
+
+
+@lru_cache
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def make_etag(path: str, query: list[tuple[str, str]], versions: VersionVector) -> str:
+    payload = repr((path, sorted(query), versions)).encode("utf-8")
+    return '"' + hashlib.blake2b(payload, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {item.strip().removeprefix("W/") for item in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def cached_json_response(
+    request: Request,
+    session: AsyncSession,
+    scopes: list[str],
+    response_type: Any,
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    # The ETag is derived from the data versions of the scopes the response
+    # depends on, so an unchanged resource is answered without recomputing it.
+    versions = await get_version_vector(session, scopes)
+    etag = make_etag(request.url.path, request.query_params.multi_items(), versions)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    entry = response_cache.get(etag)
+    if entry is None:
+        payload = await build()
+        if not isinstance(payload, CachedPayload):
+            payload = CachedPayload(content=payload)
+        # Builders may hand over an already encoded body.
+        body = payload.content
+        if not isinstance(body, bytes):
+            body = _adapter(response_type).dump_json(body)
+        entry = CachedResponse(body=body, headers=payload.headers)
+        response_cache.put(etag, entry)
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers={**entry.headers, **headers},
+    )
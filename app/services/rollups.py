@@ -0,0 +1,52 @@
+from sqlalchemy import Date, cast, delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.monthly_rollup import MonthlyRollup
+from app.models.transaction import Transaction
+
+
+async def rebuild_monthly_rollups(session: AsyncSession) -> int:
+    # SHARE mode blocks concurrent writers so triggers can't race the rebuild.
+    await session.execute(text("LOCK TABLE transactions IN SHARE MODE"))
+    await session.execute(delete(MonthlyRollup))
+
+    month = cast(func.date_trunc("month", Transaction.tx_date), Date)
+    aggregated = (
+        select(
+            Transaction.account_id,
+            month,
+            Transaction.category_id,
+            Transaction.kind,
+            Transaction.status,
+            Transaction.currency,
+            func.sum(Transaction.amount),
+            func.coalesce(func.sum(Transaction.amount).filter(Transaction.signed_amount < 0), 0),
+            func.count(),
+        )
+        .group_by(
+            Transaction.account_id,
+            month,
+            Transaction.category_id,
+            Transaction.kind,
+            Transaction.status,
+            Transaction.currency,
+        )
+    )
+    result = await session.execute(
+        MonthlyRollup.__table__.insert().from_select(
+            [
+                "account_id",
+                "month",
+                "category_id",
+                "kind",
+                "status",
+                "currency",
+                "total_amount",
+                "outflow_amount",
+                "tx_count",
+            ],
+            aggregated,
+        )
+    )
+    await session.commit()
+    return result.rowcount or 0
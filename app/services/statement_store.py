@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO
+
+from app.db.settings import get_settings
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class StatementStore:
+    # Original statement uploads, gzip-compressed and addressed by the SHA-256
+    # of the uncompressed file (statement_imports.file_sha256), so the same
+    # file uploaded twice is stored once. Blobs are never rewritten.
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.gz"
+
+    def contains(self, key: str) -> bool:
+        return self.path(key).is_file()
+
+    def put(self, file: BinaryIO, key: str) -> str:
+        path = self.path(key)
+        if path.is_file():
+            return key
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Written next to the target and renamed into place, so a crash or a
+        # concurrent upload of the same file never leaves a partial blob.
+        descriptor, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as target:
+                with gzip.GzipFile(fileobj=target, mode="wb", mtime=0) as compressed:
+                    file.seek(0)
+                    shutil.copyfileobj(file, compressed, COPY_CHUNK_SIZE)
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        finally:
+            file.seek(0)
+        return key
+
+    def open(self, key: str) -> BinaryIO:
+        return gzip.open(self.path(key), "rb")
+
+    def copy_to(self, key: str, target: BinaryIO) -> None:
+        with self.open(key) as source:
+            shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+
+
+statement_store = StatementStore(get_settings().statement_store_dir)
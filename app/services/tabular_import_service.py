@@ -0,0 +1,490 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import datetime as dt
+import io
+import json
+import re
+import zipfile
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, BinaryIO
+
+from openpyxl import load_workbook
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Account
+from app.models.enums import TransactionSource, TransactionStatus, TransactionType
+from app.services.account_locks import lock_accounts
+from app.services.categorization_service import pick_category
+from app.services.import_limits import ImportLimitExceeded, ImportLimits
+from app.services.pdf_import_service import (
+    PDFImportResult,
+    currency_from_marker,
+    make_external_hash,
+    normalize_spaces,
+    parse_signed_amount,
+    parse_statement_date,
+    split_operation_and_details,
+    truncate_errors,
+)
+from app.services.reference_cache import get_reference_data
+from app.services.transaction_raw import RAW_BATCH_SIZE
+
+CSV_SAMPLE_SIZE = 64 * 1024
+CSV_DELIMITERS = (";", "\t", ",")
+HEADER_SCAN_ROWS = 30
+# Bump when a fix changes what is read from CSV/XLSX statements; see
+# PARSER_VERSION in pdf_import_service.
+TABLE_PARSER_VERSION = 1
+STAGING_BATCH_SIZE = 5000
+STAGING_TABLE = "transaction_import_staging"
+DESCRIPTION_MAX_LENGTH = 255
+
+COLUMN_ALIASES: dict[str, tuple[str, ...]] = {
+    "date": ("дата", "дата операции", "дата транзакции", "date", "transaction date"),
+    "amount": ("сумма", "сумма операции", "amount"),
+    "currency": ("валюта", "валюта операции", "currency"),
+    "operation": ("операция", "тип операции", "operation", "type"),
+    "details": ("детали", "описание", "назначение платежа", "details", "description"),
+    "status": ("статус", "status"),
+}
+
+DOTTED_DATE_PATTERN = re.compile(r"^(\d{2})\.(\d{2})\.(\d{4})$")
+AMOUNT_CURRENCY_PATTERN = re.compile(r"(₸|KZT|\$|USD)", flags=re.IGNORECASE)
+PENDING_STATUS_MARKERS = ("pending", "обработ")
+
+STAGING_COLUMNS = (
+    "row_no",
+    "tx_date",
+    "description",
+    "amount",
+    "signed_amount",
+    "currency",
+    "type",
+    "status",
+    "category_id",
+    "external_hash",
+    "raw",
+)
+
+CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+    row_no INTEGER NOT NULL,
+    tx_date DATE NOT NULL,
+    description TEXT NOT NULL,
+    amount NUMERIC(12, 2) NOT NULL,
+    signed_amount NUMERIC(12, 2) NOT NULL,
+    currency TEXT NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    category_id INTEGER NOT NULL,
+    external_hash BYTEA NOT NULL,
+    raw TEXT NOT NULL
+) ON COMMIT DROP
+"""
+
+# Rows already in the ledger (or repeated within the file) lose on the unique
+# external_hash. The raw payloads of the rows that went in are grouped into
+# transaction_raw batches in the same statement; the result is the number of
+# inserted transactions.
+MERGE_STAGING_SQL = f"""
+WITH inserted AS (
+    INSERT INTO transactions (
+        description, amount, signed_amount, currency, type, kind, status, source,
+        external_hash, category_locked, tx_date, account_id, import_id, category_id
+    )
+    SELECT
+        description, amount, signed_amount, currency,
+        CAST(type AS transaction_type), CAST(type AS transaction_kind),
+        CAST(status AS transaction_status), CAST(:source AS transaction_source),
+        external_hash, false, tx_date, :account_id, :import_id, category_id
+    FROM {STAGING_TABLE}
+    ORDER BY row_no
+    ON CONFLICT (external_hash) DO NOTHING
+    RETURNING id, external_hash
+),
+payloads AS (
+    SELECT DISTINCT ON (inserted.id)
+        inserted.id,
+        CAST(staging.raw AS JSONB) AS raw,
+        (dense_rank() OVER (ORDER BY inserted.id) - 1) / :raw_batch_size AS batch_no
+    FROM inserted
+    JOIN {STAGING_TABLE} AS staging USING (external_hash)
+    ORDER BY inserted.id, staging.row_no
+),
+saved AS (
+    INSERT INTO transaction_raw (import_id, first_transaction_id, last_transaction_id, payloads)
+    SELECT :import_id, min(id), max(id), jsonb_object_agg(id::text, raw)
+    FROM payloads
+    GROUP BY batch_no
+)
+SELECT count(*) FROM inserted
+"""
+
+
+@dataclass(slots=True)
+class TableColumns:
+    date: int
+    amount: int
+    currency: int | None = None
+    operation: int | None = None
+    details: int | None = None
+    status: int | None = None
+
+
+@dataclass(slots=True)
+class ParsedTableRow:
+    row_no: int
+    tx_date: dt.date
+    signed_amount: Decimal
+    amount: Decimal
+    tx_type: TransactionType
+    currency: str
+    operation: str
+    details: str
+    description: str
+    status: TransactionStatus
+    external_hash: bytes
+    signed_amount_text: str
+
+
+def _normalize_header(value: object) -> str:
+    if value is None:
+        return ""
+    return normalize_spaces(str(value)).lower().replace("ё", "е").rstrip(":")
+
+
+def match_columns(cells: Sequence[object]) -> TableColumns | None:
+    positions: dict[str, int] = {}
+    for index, cell in enumerate(cells):
+        header = _normalize_header(cell)
+        for name, aliases in COLUMN_ALIASES.items():
+            if header in aliases and name not in positions:
+                positions[name] = index
+                break
+
+    if "date" not in positions or "amount" not in positions:
+        return None
+    if "operation" not in positions and "details" not in positions:
+        return None
+    return TableColumns(**positions)
+
+
+def locate_columns(rows: Iterator[Sequence[object]]) -> tuple[TableColumns, int]:
+    # Bank exports often put the account and period above the table, so the
+    # header is the first row that names the date, amount and description.
+    for row_no, cells in enumerate(rows, start=1):
+        columns = match_columns(cells)
+        if columns is not None:
+            return columns, row_no
+        if row_no >= HEADER_SCAN_ROWS:
+            break
+    raise ValueError("Не найдена строка заголовка с колонками даты, суммы и описания")
+
+
+def _cell(cells: Sequence[object], index: int | None) -> object:
+    if index is None or index >= len(cells):
+        return None
+    return cells[index]
+
+
+def _cell_text(cells: Sequence[object], index: int | None) -> str:
+    value = _cell(cells, index)
+    return "" if value is None else normalize_spaces(str(value))
+
+
+def _is_blank(cells: Sequence[object]) -> bool:
+    return all(cell is None or str(cell).strip() == "" for cell in cells)
+
+
+def _parse_date(value: object) -> dt.date:
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, dt.date):
+        return value
+    raw_date = normalize_spaces(str(value or ""))
+    if not raw_date:
+        raise ValueError("Не указана дата")
+    # Exports may append the time of the operation.
+    raw_date = raw_date.split(" ", 1)[0]
+    # strptime is by far the slowest step per row, so the usual DD.MM.YYYY
+    # layout is split by hand and only the rest goes through the generic parsers.
+    match = DOTTED_DATE_PATTERN.match(raw_date)
+    if match is not None:
+        day, month, year = match.groups()
+        try:
+            return dt.date(int(year), int(month), int(day))
+        except ValueError as exc:
+            raise ValueError(f"Некорректная дата: {raw_date}") from exc
+    try:
+        return dt.date.fromisoformat(raw_date)
+    except ValueError:
+        return parse_statement_date(raw_date)
+
+
+def _parse_amount(value: object) -> tuple[Decimal, str | None, str]:
+    if isinstance(value, bool) or value is None:
+        raise ValueError("Не указана сумма")
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value)).quantize(Decimal("0.01")), None, str(value)
+
+    amount_text = normalize_spaces(str(value)).replace("−", "-")
+    marker_match = AMOUNT_CURRENCY_PATTERN.search(amount_text)
+    marker = marker_match.group(1) if marker_match else None
+    numeric_text = AMOUNT_CURRENCY_PATTERN.sub("", amount_text).strip()
+    if not numeric_text:
+        raise ValueError("Не указана сумма")
+    return parse_signed_amount(numeric_text).quantize(Decimal("0.01")), marker, amount_text
+
+
+def parse_table_row(
+    cells: Sequence[object],
+    columns: TableColumns,
+    row_no: int,
+    account_id: int,
+    default_currency: str,
+) -> ParsedTableRow:
+    tx_date = _parse_date(_cell(cells, columns.date))
+    signed_amount, amount_marker, signed_amount_text = _parse_amount(_cell(cells, columns.amount))
+    if signed_amount == 0:
+        raise ValueError("Нулевая сумма не поддерживается")
+
+    currency_text = _cell_text(cells, columns.currency) or amount_marker
+    currency = currency_from_marker(currency_text) if currency_text else default_currency
+    if len(currency) != 3 or not currency.isalpha():
+        raise ValueError(f"Неподдерживаемая валюта '{currency}'")
+
+    details = _cell_text(cells, columns.details)
+    operation = _cell_text(cells, columns.operation)
+    if not operation and not details:
+        raise ValueError("Не указано описание операции")
+    if not operation:
+        # Same split as the PDF parser, so a row has the same external_hash
+        # whichever export it was imported from.
+        operation, details = split_operation_and_details(details)
+
+    description = f"{operation} {details}".strip() if details else operation
+    status_text = _cell_text(cells, columns.status).lower()
+    is_pending = any(marker in status_text for marker in PENDING_STATUS_MARKERS)
+    status = (
+        TransactionStatus.PENDING
+        if is_pending or "сумма в обработке" in description.lower()
+        else TransactionStatus.POSTED
+    )
+
+    return ParsedTableRow(
+        row_no=row_no,
+        tx_date=tx_date,
+        signed_amount=signed_amount,
+        amount=abs(signed_amount),
+        tx_type=TransactionType.EXPENSE if signed_amount < 0 else TransactionType.INCOME,
+        currency=currency,
+        operation=operation,
+        details=details,
+        description=description[:DESCRIPTION_MAX_LENGTH],
+        status=status,
+        external_hash=make_external_hash(
+            tx_date, signed_amount, currency, operation, details, account_id
+        ),
+        signed_amount_text=signed_amount_text,
+    )
+
+
+def _detect_encoding(sample: bytes) -> str:
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return "cp1251"
+    return "utf-8-sig"
+
+
+def _detect_delimiter(sample_text: str) -> str:
+    for delimiter in CSV_DELIMITERS:
+        reader = csv.reader(io.StringIO(sample_text), delimiter=delimiter)
+        for row_no, cells in enumerate(reader, start=1):
+            if match_columns(cells) is not None:
+                return delimiter
+            if row_no >= HEADER_SCAN_ROWS:
+                break
+    return CSV_DELIMITERS[0]
+
+
+def iter_csv_rows(file: BinaryIO) -> Iterator[Sequence[object]]:
+    sample = file.read(CSV_SAMPLE_SIZE)
+    file.seek(0)
+    encoding = _detect_encoding(sample)
+    delimiter = _detect_delimiter(sample.decode(encoding, errors="ignore"))
+
+    stream = io.TextIOWrapper(file, encoding=encoding, newline="")
+    try:
+        yield from csv.reader(stream, delimiter=delimiter)
+    except UnicodeDecodeError as exc:
+        raise ValueError("Не удалось определить кодировку CSV-файла") from exc
+    except csv.Error as exc:
+        raise ValueError(f"Некорректный CSV-файл: {exc}") from exc
+    finally:
+        # The upload owns the underlying file; don't close it with the wrapper.
+        stream.detach()
+
+
+def _check_unpacked_size(file: BinaryIO, limit: int) -> None:
+    # Entries can't inflate past their declared size, so the central directory
+    # bounds what openpyxl will unpack.
+    with zipfile.ZipFile(file) as archive:
+        unpacked = sum(info.file_size for info in archive.infolist())
+    file.seek(0)
+    if unpacked > limit:
+        raise ImportLimitExceeded(f"XLSX-файл после распаковки больше {limit // (1024 * 1024)} МБ")
+
+
+def iter_xlsx_rows(file: BinaryIO) -> Iterator[Sequence[object]]:
+    try:
+        _check_unpacked_size(file, ImportLimits.from_settings().max_decompressed_bytes)
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except ImportLimitExceeded:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        raise ValueError("Не удалось прочитать XLSX-файл") from exc
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+TABLE_READERS: dict[TransactionSource, Callable[[BinaryIO], Iterator[Sequence[object]]]] = {
+    TransactionSource.IMPORT_CSV: iter_csv_rows,
+    TransactionSource.IMPORT_XLSX: iter_xlsx_rows,
+}
+
+
+def read_table_statement(
+    file: BinaryIO,
+    source: TransactionSource,
+    account_id: int,
+    default_currency: str,
+) -> Iterator[ParsedTableRow | str]:
+    # Yields every non-blank row after the header, parsed or as an error text.
+    rows = TABLE_READERS[source](file)
+    columns, header_row_no = locate_columns(rows)
+    for row_no, cells in enumerate(rows, start=header_row_no + 1):
+        if _is_blank(cells):
+            continue
+        try:
+            yield parse_table_row(cells, columns, row_no, account_id, default_currency)
+        except ValueError as exc:
+            yield f"Строка {row_no}: {exc}"
+
+
+def table_raw_payload(row: ParsedTableRow) -> dict[str, Any]:
+    return {
+        "operation": row.operation,
+        "details": row.details,
+        "signed_amount_text": row.signed_amount_text,
+        "row_no": row.row_no,
+    }
+
+
+def _staging_record(row: ParsedTableRow, category_id: int) -> tuple[Any, ...]:
+    return (
+        row.row_no,
+        row.tx_date,
+        row.description,
+        row.amount,
+        row.signed_amount,
+        row.currency,
+        row.tx_type.value,
+        row.status.value,
+        category_id,
+        row.external_hash,
+        json.dumps(table_raw_payload(row), ensure_ascii=False),
+    )
+
+
+async def import_table_statement(
+    session: AsyncSession,
+    file: BinaryIO,
+    source: TransactionSource,
+    account_id: int,
+    import_id: int,
+) -> PDFImportResult:
+    account_currency = await session.scalar(
+        select(Account.currency).where(Account.id == account_id).limit(1)
+    )
+    if account_currency is None:
+        raise ValueError("Счет не найден")
+
+    refs = await get_reference_data(session)
+
+    # Rows are parsed as the upload is read and COPY'd into a temp table in
+    # batches, so memory stays flat for large files; one INSERT ... SELECT then
+    # merges them and lets the unique hash skip duplicates.
+    await session.execute(text(CREATE_STAGING_SQL))
+    connection = await session.connection()
+    driver_connection = (await connection.get_raw_connection()).driver_connection
+
+    errors: list[str] = []
+    rows_total = 0
+    staged = 0
+    currencies: set[str] = set()
+    period_from: dt.date | None = None
+    period_to: dt.date | None = None
+    categories: dict[tuple[str, TransactionType], int] = {}
+    batch: list[tuple[Any, ...]] = []
+
+    for row in read_table_statement(file, source, account_id, account_currency):
+        rows_total += 1
+        if isinstance(row, str):
+            errors.append(row)
+            continue
+
+        # Statements repeat the same merchants, so rules run once per description.
+        category_key = (row.description, row.tx_type)
+        category_id = categories.get(category_key)
+        if category_id is None:
+            category_id = pick_category(refs, row.description, row.tx_type)
+            categories[category_key] = category_id
+        batch.append(_staging_record(row, category_id))
+        currencies.add(row.currency)
+        period_from = row.tx_date if period_from is None else min(period_from, row.tx_date)
+        period_to = row.tx_date if period_to is None else max(period_to, row.tx_date)
+        if len(batch) >= STAGING_BATCH_SIZE:
+            await driver_connection.copy_records_to_table(
+                STAGING_TABLE, records=batch, columns=STAGING_COLUMNS
+            )
+            staged += len(batch)
+            batch = []
+
+    if batch:
+        await driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=batch, columns=STAGING_COLUMNS
+        )
+        staged += len(batch)
+
+    inserted = 0
+    if staged:
+        # Held until the import commits; parsing above runs without it.
+        await lock_accounts(session, [account_id])
+        inserted = await session.scalar(
+            text(MERGE_STAGING_SQL),
+            {
+                "source": source.value,
+                "account_id": account_id,
+                "import_id": import_id,
+                "raw_batch_size": RAW_BATCH_SIZE,
+            },
+        )
+
+    return PDFImportResult(
+        rows_total=rows_total,
+        inserted=inserted,
+        skipped=staged - inserted,
+        errors=truncate_errors(errors),
+        account_id=account_id,
+        period_from=period_from,
+        period_to=period_to,
+        currency=currencies.pop() if len(currencies) == 1 else account_currency,
+    )
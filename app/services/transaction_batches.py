@@ -0,0 +1,119 @@
+import datetime as dt
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import Row, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.enums import TransactionKind, TransactionSource, TransactionStatus, TransactionType
+from app.models.transaction import Transaction
+from app.services.accounts import get_default_account
+from app.services.categorization_service import pick_category
+from app.services.reference_cache import ReferenceData, get_reference_data
+from app.services.transactions import TRANSACTION_LIST_COLUMNS
+
+MAX_BATCH_SIZE = 500
+MAX_DESCRIPTION_LENGTH = 255
+# transactions.amount is NUMERIC(12, 2)
+MAX_AMOUNT = Decimal("9999999999.99")
+
+
+@dataclass(slots=True)
+class BatchEntry:
+    index: int
+    description: str
+    amount: Decimal
+    tx_type: TransactionType
+    currency: str = "KZT"
+    account_id: int | None = None
+    category_id: int | None = None
+    tx_date: dt.date | None = None
+
+
+@dataclass(slots=True)
+class BatchResult:
+    refs: ReferenceData
+    rows: dict[int, Row[Any]] = field(default_factory=dict)
+    errors: dict[int, str] = field(default_factory=dict)
+
+
+def _entry_error(entry: BatchEntry, refs: ReferenceData, default_account_id: int) -> str | None:
+    if len(entry.description) > MAX_DESCRIPTION_LENGTH:
+        return f"Описание длиннее {MAX_DESCRIPTION_LENGTH} символов"
+    if entry.amount > MAX_AMOUNT:
+        return "Слишком большая сумма"
+    if (entry.account_id or default_account_id) not in refs.accounts:
+        return "Счет не найден"
+    if entry.category_id is not None:
+        category = refs.categories.get(entry.category_id)
+        if category is None:
+            return "Категория не найдена"
+        if category.type != entry.tx_type:
+            return "Тип категории не совпадает с типом операции"
+    return None
+
+
+async def create_transactions_batch(
+    session: AsyncSession,
+    entries: list[BatchEntry],
+) -> BatchResult:
+    # Entries are validated and categorized in memory against the reference
+    # cache, then all valid ones are written with one multi-row INSERT in one
+    # transaction. Invalid entries are reported and do not block the others.
+    refs = await get_reference_data(
+        session,
+        account_ids={item.account_id for item in entries if item.account_id is not None},
+        category_ids={item.category_id for item in entries if item.category_id is not None},
+    )
+    default_account_id = refs.default_account_id
+    if default_account_id is None and any(item.account_id is None for item in entries):
+        default_account_id = (await get_default_account(session)).id
+        refs = await get_reference_data(session, account_ids=[default_account_id])
+
+    result = BatchResult(refs=refs)
+    today = dt.date.today()
+    accepted: list[BatchEntry] = []
+    values: list[dict[str, Any]] = []
+    for entry in entries:
+        error = _entry_error(entry, refs, default_account_id)
+        category_id = entry.category_id
+        if error is None and category_id is None:
+            try:
+                category_id = pick_category(refs, entry.description, entry.tx_type)
+            except RuntimeError:
+                error = "Ошибка автокатегоризации"
+        if error is not None:
+            result.errors[entry.index] = error
+            continue
+
+        accepted.append(entry)
+        values.append(
+            {
+                "description": entry.description,
+                "amount": entry.amount,
+                "signed_amount": (
+                    entry.amount if entry.tx_type == TransactionType.INCOME else -entry.amount
+                ),
+                "currency": entry.currency,
+                "type": entry.tx_type,
+                "kind": TransactionKind(entry.tx_type.value),
+                "status": TransactionStatus.POSTED,
+                "account_id": entry.account_id or default_account_id,
+                "category_id": category_id,
+                "category_locked": entry.category_id is not None,
+                "source": TransactionSource.MANUAL,
+                "tx_date": entry.tx_date or today,
+            }
+        )
+
+    if values:
+        inserted = await session.execute(
+            insert(Transaction).returning(*TRANSACTION_LIST_COLUMNS, sort_by_parameter_order=True),
+            values,
+        )
+        for entry, row in zip(accepted, inserted.all(), strict=True):
+            result.rows[entry.index] = row
+        await session.commit()
+
+    return result
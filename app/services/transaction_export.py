@@ -0,0 +1,97 @@
+import csv
+import datetime as dt
+import io
+from collections.abc import AsyncIterator, Sequence
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import ColumnElement, select
+
+from app.db.session import AsyncSessionLocal
+from app.models.transaction import Transaction
+from app.services.reference_cache import ReferenceData
+from app.services.transactions import (
+    TRANSACTION_LIST_COLUMNS,
+    encode_transaction_row,
+    get_references_for,
+    transaction_item,
+)
+
+EXPORT_BATCH_SIZE = 1000
+
+CSV_COLUMNS = (
+    "id",
+    "tx_date",
+    "description",
+    "amount",
+    "signed_amount",
+    "currency",
+    "type",
+    "kind",
+    "status",
+    "account_id",
+    "account_name",
+    "account_bank",
+    "import_id",
+    "category_id",
+    "category_name",
+    "category_locked",
+    "transfer_pair_id",
+    "matched_account_id",
+    "matched_account_name",
+    "match_confidence",
+    "source",
+    "posted_at",
+    "created_at",
+)
+CSV_HEADER = (",".join(CSV_COLUMNS) + "\n").encode("utf-8")
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dt.datetime):
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, dt.date):
+        return value.isoformat()
+    return value
+
+
+def encode_csv_rows(rows: Sequence[Any], refs: ReferenceData) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        item = transaction_item(row, refs)
+        writer.writerow([_csv_value(item[column]) for column in CSV_COLUMNS])
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_transactions_export(
+    filters: list[ColumnElement[bool]], export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    # The endpoint's session is closed before a streaming body is sent, so the
+    # export opens its own. Rows come from a server-side cursor in batches and
+    # each batch is encoded and handed to the response right away; memory use
+    # does not depend on how many rows match.
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            select(*TRANSACTION_LIST_COLUMNS)
+            .where(*filters)
+            .order_by(Transaction.tx_date.asc(), Transaction.id.asc())
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        if export_format == ExportFormat.CSV:
+            yield CSV_HEADER
+        async for rows in result.partitions():
+            refs = await get_references_for(session, rows)
+            if export_format == ExportFormat.CSV:
+                yield encode_csv_rows(rows, refs)
+            else:
+                yield b"".join(encode_transaction_row(row, refs) + b"\n" for row in rows)
@@ -0,0 +1,73 @@
+from typing import Any
+
+from sqlalchemy import ColumnElement, Text, cast, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.transaction import Transaction
+from app.models.transaction_raw import TransactionRaw
+
+# Transactions per transaction_raw row; large enough to compress well, small
+# enough that the debug endpoint only decompresses a few hundred kilobytes.
+RAW_BATCH_SIZE = 500
+
+
+async def save_raw_payloads(
+    session: AsyncSession,
+    import_id: int,
+    payloads: dict[int, dict[str, Any]],
+) -> None:
+    if not payloads:
+        return
+    ids = sorted(payloads)
+    batches = [ids[start : start + RAW_BATCH_SIZE] for start in range(0, len(ids), RAW_BATCH_SIZE)]
+    await session.execute(
+        insert(TransactionRaw).values(
+            [
+                {
+                    "import_id": import_id,
+                    "first_transaction_id": batch[0],
+                    "last_transaction_id": batch[-1],
+                    "payloads": {str(item): payloads[item] for item in batch},
+                }
+                for batch in batches
+            ]
+        )
+    )
+
+
+async def drop_raw_payloads(
+    session: AsyncSession,
+    import_id: int | None,
+    transaction_ids: list[int],
+) -> None:
+    if not transaction_ids:
+        return
+    keys = [str(transaction_id) for transaction_id in transaction_ids]
+    await session.execute(
+        update(TransactionRaw)
+        .where(_import_filter(import_id), TransactionRaw.payloads.has_any(array(keys)))
+        .values(payloads=TransactionRaw.payloads.op("-")(cast(array(keys), ARRAY(Text))))
+    )
+
+
+def _import_filter(import_id: int | None) -> ColumnElement[bool]:
+    if import_id is None:
+        return TransactionRaw.import_id.is_(None)
+    return TransactionRaw.import_id == import_id
+
+
+async def load_raw_payload(
+    session: AsyncSession, transaction: Transaction
+) -> dict[str, Any] | None:
+    key = str(transaction.id)
+    return await session.scalar(
+        select(TransactionRaw.payloads[key])
+        .where(
+            _import_filter(transaction.import_id),
+            TransactionRaw.first_transaction_id <= transaction.id,
+            TransactionRaw.last_transaction_id >= transaction.id,
+            TransactionRaw.payloads.has_key(key),
+        )
+        .limit(1)
+    )
@@ -1,12 +1,100 @@
+from collections.abc import Iterable, Sequence
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from sqlalchemy import ColumnElement, Row, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.enums import TransactionKind, TransactionSource, TransactionStatus
 from app.models.transaction import Transaction
 from app.schemas.transaction import TransactionRead
+from app.services.pagination import escape_like
+from app.services.reference_cache import ReferenceData, get_reference_data
+
+# Columns needed to render a TransactionRead; list endpoints select these as
+# plain rows instead of loading ORM objects.
+TRANSACTION_LIST_COLUMNS = (
+    Transaction.id,
+    Transaction.description,
+    Transaction.amount,
+    Transaction.signed_amount,
+    Transaction.currency,
+    Transaction.type,
+    Transaction.kind,
+    Transaction.status,
+    Transaction.account_id,
+    Transaction.import_id,
+    Transaction.category_id,
+    Transaction.category_locked,
+    Transaction.transfer_pair_id,
+    Transaction.matched_account_id,
+    Transaction.match_confidence,
+    Transaction.source,
+    Transaction.tx_date,
+    Transaction.posted_at,
+    Transaction.created_at,
+)
 
 
-def serialize_transaction(transaction: Transaction) -> TransactionRead:
-    category_name = transaction.category.name if transaction.category else "Неизвестно"
-    account_name = transaction.account.name if transaction.account else "Неизвестно"
-    account_bank = transaction.account.bank if transaction.account else None
-    matched_account_name = transaction.matched_account.name if transaction.matched_account else None
+def transaction_filters(
+    account_id: int | None = None,
+    category_id: int | None = None,
+    kind: TransactionKind | None = None,
+    status: TransactionStatus | None = None,
+    source: TransactionSource | None = None,
+    import_id: int | None = None,
+    min_amount: Decimal | None = None,
+    max_amount: Decimal | None = None,
+    q: str | None = None,
+) -> list[ColumnElement[bool]]:
+    filters: list[ColumnElement[bool]] = []
+    if account_id is not None:
+        filters.append(Transaction.account_id == account_id)
+    if category_id is not None:
+        filters.append(Transaction.category_id == category_id)
+    if kind is not None:
+        filters.append(Transaction.kind == kind)
+    if status is not None:
+        filters.append(Transaction.status == status)
+    if source is not None:
+        filters.append(Transaction.source == source)
+    if import_id is not None:
+        filters.append(Transaction.import_id == import_id)
+    if min_amount is not None:
+        filters.append(Transaction.amount >= min_amount)
+    if max_amount is not None:
+        filters.append(Transaction.amount <= max_amount)
+    if q is not None:
+        filters.append(Transaction.description.ilike(f"%{escape_like(q)}%", escape="\\"))
+    return filters
+
+
+async def get_references_for(
+    session: AsyncSession,
+    transactions: Sequence[Any],
+    revalidate: bool = False,
+) -> ReferenceData:
+    account_ids = {item.account_id for item in transactions}
+    account_ids.update(
+        item.matched_account_id for item in transactions if item.matched_account_id is not None
+    )
+    category_ids = {item.category_id for item in transactions}
+    return await get_reference_data(session, account_ids, category_ids, revalidate=revalidate)
+
+
+def serialize_transaction(transaction: Transaction, refs: ReferenceData) -> TransactionRead:
+    category = refs.categories.get(transaction.category_id)
+    account = refs.accounts.get(transaction.account_id)
+    matched_account = (
+        refs.accounts.get(transaction.matched_account_id)
+        if transaction.matched_account_id is not None
+        else None
+    )
+    category_name = category.name if category else "Неизвестно"
+    account_name = account.name if account else "Неизвестно"
+    account_bank = account.bank if account else None
+    matched_account_name = matched_account.name if matched_account else None
     return TransactionRead(
         id=transaction.id,
         description=transaction.description,
@@ -32,3 +120,66 @@ def serialize_transaction(transaction: Transaction) -> TransactionRead:
         posted_at=transaction.posted_at,
         created_at=transaction.created_at,
     )
+
+
+def _encode_default(value: Any) -> Any:
+    # Same representation pydantic uses for Decimal in JSON mode.
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def transaction_item(row: Any, refs: ReferenceData) -> dict[str, Any]:
+    category = refs.categories.get(row.category_id)
+    account = refs.accounts.get(row.account_id)
+    matched_account = (
+        refs.accounts.get(row.matched_account_id) if row.matched_account_id is not None else None
+    )
+    return {
+        "id": row.id,
+        "description": row.description,
+        "amount": row.amount,
+        "signed_amount": row.signed_amount,
+        "currency": row.currency,
+        "type": row.type,
+        "kind": row.kind,
+        "status": row.status,
+        "account_id": row.account_id,
+        "account_name": account.name if account else "Неизвестно",
+        "account_bank": account.bank if account else None,
+        "import_id": row.import_id,
+        "category_id": row.category_id,
+        "category_name": category.name if category else "Неизвестно",
+        "category_locked": row.category_locked,
+        "transfer_pair_id": row.transfer_pair_id,
+        "matched_account_id": row.matched_account_id,
+        "matched_account_name": matched_account.name if matched_account else None,
+        "match_confidence": row.match_confidence,
+        "source": row.source,
+        "tx_date": row.tx_date,
+        "posted_at": row.posted_at,
+        "created_at": row.created_at,
+    }
+
+
+def encode_transaction_rows(rows: Iterable[Any], refs: ReferenceData) -> bytes:
+    # Produces the same JSON as a list of TransactionRead without building and
+    # validating a pydantic model per row.
+    items = [transaction_item(row, refs) for row in rows]
+    return orjson.dumps(items, default=_encode_default, option=orjson.OPT_UTC_Z)
+
+
+def encode_transaction_row(row: Any, refs: ReferenceData) -> bytes:
+    item = transaction_item(row, refs)
+    return orjson.dumps(item, default=_encode_default, option=orjson.OPT_UTC_Z)
+
+
+async def insert_transaction(session: AsyncSession, values: dict[str, Any]) -> Row[Any]:
+    # One INSERT ... RETURNING gives everything the response needs, including
+    # server defaults, so the row is not selected again after the commit.
+    result = await session.execute(
+        insert(Transaction).values(**values).returning(*TRANSACTION_LIST_COLUMNS)
+    )
+    row = result.one()
+    await session.commit()
+    return row
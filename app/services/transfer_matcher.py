@@ -11,6 +11,7 @@ from sqlalchemy.orm import selectinload
 
 from app.models.enums import TransactionKind, TransactionStatus
 from app.models.transaction import Transaction
+from app.services.account_locks import lock_accounts
 
 TRANSFER_KEYWORDS = (
     "перевод",
@@ -147,6 +148,14 @@ async def auto_pair_transfers(
     if account_ids:
         filters.append(Transaction.account_id.in_(account_ids))
 
+    # Candidates are read under the account locks so an import or rollback
+    # running on the same accounts can't change them before the pairs are
+    # written.
+    locked_ids = await session.scalars(
+        select(Transaction.account_id).where(and_(*filters)).distinct()
+    )
+    await lock_accounts(session, locked_ids.all())
+
     rows = await session.scalars(
         select(Transaction)
         .where(and_(*filters))
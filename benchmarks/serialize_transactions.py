@@ -0,0 +1,125 @@
+"""Per-row cost of rendering the transaction list.
+
+Compares the previous path (TransactionRead per row, validated again through
+response_model, then dumped by pydantic) with the tuple + orjson path used by
+GET /api/transactions. Runs in memory, no database needed:
+
+    python -m benchmarks.serialize_transactions --rows 10000
+"""
+
+import argparse
+import datetime as dt
+import gzip
+import time
+import uuid
+from collections.abc import Callable
+from decimal import Decimal
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from app.models.enums import TransactionKind, TransactionSource, TransactionStatus, TransactionType
+from app.schemas.transaction import TransactionRead
+from app.services.reference_cache import AccountRef, CategoryRef, ReferenceData
+from app.services.transactions import encode_transaction_rows, serialize_transaction
+
+
+def build_refs() -> ReferenceData:
+    return ReferenceData(
+        versions=(),
+        accounts={
+            account_id: AccountRef(
+                id=account_id,
+                name=f"Счет {account_id}",
+                bank="Kaspi",
+                currency="KZT",
+                is_active=True,
+            )
+            for account_id in range(1, 4)
+        },
+        categories={
+            category_id: CategoryRef(
+                id=category_id, name=f"Категория {category_id}", type=TransactionType.EXPENSE
+            )
+            for category_id in range(1, 16)
+        },
+    )
+
+
+def build_rows(count: int) -> list[SimpleNamespace]:
+    created_at = dt.datetime(2026, 2, 1, 10, 0, tzinfo=dt.timezone.utc)
+    rows = []
+    for index in range(count):
+        amount = Decimal(100 + index % 9000) / 100
+        is_transfer = index % 20 == 0
+        rows.append(
+            SimpleNamespace(
+                id=index + 1,
+                description=f"Покупка магазин #{index % 500}",
+                amount=amount,
+                signed_amount=-amount,
+                currency="KZT",
+                type=TransactionType.EXPENSE,
+                kind=TransactionKind.TRANSFER if is_transfer else TransactionKind.EXPENSE,
+                status=TransactionStatus.POSTED,
+                account_id=1 + index % 3,
+                import_id=1,
+                category_id=1 + index % 15,
+                category_locked=False,
+                transfer_pair_id=uuid.uuid4() if is_transfer else None,
+                matched_account_id=2 if is_transfer else None,
+                match_confidence=90 if is_transfer else None,
+                source=TransactionSource.IMPORT_PDF,
+                tx_date=dt.date(2026, 2, 1 + index % 28),
+                posted_at=None,
+                created_at=created_at,
+            )
+        )
+    return rows
+
+
+def measure(label: str, rows: int, repeat: int, render: Callable[[], bytes]) -> bytes:
+    body = render()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        best = min(best, time.perf_counter() - started)
+    per_row_us = best / rows * 1_000_000
+    print(f"{label:<28} {best * 1000:8.1f} ms  {per_row_us:6.2f} us/row  {len(body):>9} bytes")
+    return body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    refs = build_refs()
+    rows = build_rows(args.rows)
+    adapter = TypeAdapter(list[TransactionRead])
+
+    def pydantic_path() -> bytes:
+        items = [serialize_transaction(row, refs) for row in rows]
+        # response_model validated the returned models once more before dumping.
+        return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+    def orjson_path() -> bytes:
+        return encode_transaction_rows(rows, refs)
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    before = measure("pydantic + response_model", args.rows, args.repeat, pydantic_path)
+    after = measure("tuples + orjson", args.rows, args.repeat, orjson_path)
+    assert before == after, "encoders disagree"
+
+    for level in (6, 9):
+        started = time.perf_counter()
+        compressed = gzip.compress(after, compresslevel=level)
+        elapsed = (time.perf_counter() - started) * 1000
+        label = f"gzip level {level}"
+        print(f"{label:<28} {elapsed:8.1f} ms  {'':>13}  {len(compressed):>9} bytes")
+
+
+if __name__ == "__main__":
+    main()
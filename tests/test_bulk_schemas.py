@@ -0,0 +1,29 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.transaction import TransactionBulkDelete, TransactionBulkUpdate
+
+
+def test_bulk_delete_accepts_ids_or_scoped_filter() -> None:
+    assert TransactionBulkDelete(ids=[1, 2]).ids == [1, 2]
+    assert TransactionBulkDelete(month="2026-02", account_id=1).month == "2026-02"
+    assert TransactionBulkDelete(import_id=7).import_id == 7
+
+
+def test_bulk_delete_rejects_ids_with_filter() -> None:
+    with pytest.raises(ValidationError, match="либо ids, либо фильтр"):
+        TransactionBulkDelete(ids=[1], month="2026-02")
+
+
+def test_bulk_delete_requires_month_or_import() -> None:
+    with pytest.raises(ValidationError, match="нужен month или import_id"):
+        TransactionBulkDelete(account_id=1)
+    with pytest.raises(ValidationError, match="нужен month или import_id"):
+        TransactionBulkDelete()
+
+
+def test_bulk_update_limits_ids() -> None:
+    with pytest.raises(ValidationError):
+        TransactionBulkUpdate(ids=[], category_locked=True)
+    with pytest.raises(ValidationError):
+        TransactionBulkUpdate(ids=list(range(1, 1002)), category_locked=True)
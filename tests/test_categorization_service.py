@@ -2,9 +2,18 @@ import asyncio
 from datetime import datetime, timezone
 from types import SimpleNamespace
 
+import pytest
+
 from app.models.enums import RuleMatchType, TransactionType
 from app.services import categorization_service
-from app.services.categorization_service import RuleCandidate, choose_best_category, normalize_text, rule_matches
+from app.services.categorization_service import (
+    RuleCandidate,
+    choose_best_category,
+    normalize_text,
+    pick_category,
+    rule_matches,
+)
+from app.services.reference_cache import ReferenceData
 
 
 def test_normalize_text_unifies_case_and_punctuation() -> None:
@@ -85,3 +94,24 @@ def test_locked_category_not_overwritten(monkeypatch) -> None:
     assert resolved == 99
     assert transaction.category_id == 99
     assert called is False
+
+
+def test_pick_category_falls_back_to_other() -> None:
+    rule = RuleCandidate(
+        pattern="такси",
+        match_type=RuleMatchType.CONTAINS,
+        category_id=5,
+        priority=60,
+        created_at=datetime(2026, 2, 1, tzinfo=timezone.utc),
+        is_active=True,
+    )
+    refs = ReferenceData(
+        versions=(),
+        rules_by_type={TransactionType.EXPENSE: [rule]},
+        default_category_ids={TransactionType.EXPENSE: 9},
+    )
+
+    assert pick_category(refs, "Такси домой", TransactionType.EXPENSE) == 5
+    assert pick_category(refs, "кофе", TransactionType.EXPENSE) == 9
+    with pytest.raises(RuntimeError):
+        pick_category(refs, "зарплата", TransactionType.INCOME)
@@ -0,0 +1,131 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.change_journal import (
+    ChangeCursor,
+    changed_row_ids,
+    get_change_cursor,
+    read_changes,
+)
+
+INSERT_SQL = """
+    INSERT INTO transactions (
+        description, amount, signed_amount, currency, type, kind, status, tx_date,
+        account_id, category_id, source
+    )
+    SELECT 'journal-test', 1, -1, 'KZT', 'expense', 'expense', 'posted', DATE '2026-04-01',
+           :account_id, id, 'manual'
+    FROM categories WHERE name = 'Other' AND type = 'expense'
+    RETURNING id
+"""
+
+
+def entry(seq: int, table_name: str, row_id: int, op: str) -> SimpleNamespace:
+    return SimpleNamespace(seq=seq, table_name=table_name, row_id=row_id, op=op)
+
+
+def test_changed_row_ids_keeps_last_op_per_row() -> None:
+    entries = [
+        entry(1, "transactions", 10, "insert"),
+        entry(2, "transactions", 11, "insert"),
+        entry(3, "category_rules", 10, "delete"),
+        entry(4, "transactions", 10, "delete"),
+        entry(5, "transactions", 11, "update"),
+        entry(6, "transactions", 12, "delete"),
+    ]
+
+    present, deleted = changed_row_ids(entries, "transactions")
+
+    assert present == [11]
+    assert deleted == [10, 12]
+
+
+def test_changed_row_ids_ignores_other_tables() -> None:
+    entries = [entry(1, "accounts", 1, "update")]
+
+    assert changed_row_ids(entries, "transactions") == ([], [])
+
+
+def test_cursor_round_trips_and_orders_by_xid_first() -> None:
+    cursor = ChangeCursor(xid=812, seq=40)
+
+    assert ChangeCursor.decode(cursor.encode()) == cursor
+    assert ChangeCursor(811, 90) < cursor < ChangeCursor(813, 1)
+
+
+async def _read_around_open_writer(api_database) -> dict[str, object]:
+    async with api_database("journal-test", 2) as db:
+        first_account, second_account = db.account_ids
+        async with AsyncSession(db.engine) as session:
+            start = await get_change_cursor(session)
+
+        # The first writer draws its seq and stays open while the second one
+        # draws a later seq and commits.
+        async with db.engine.connect() as slow:
+            await slow.begin()
+            slow_id = await slow.scalar(text(INSERT_SQL), {"account_id": first_account})
+            async with db.engine.begin() as quick:
+                quick_id = await quick.scalar(text(INSERT_SQL), {"account_id": second_account})
+            async with AsyncSession(db.engine) as session:
+                while_open = await read_changes(session, start, 100)
+                cursor_while_open = await get_change_cursor(session)
+            await slow.commit()
+
+        async with AsyncSession(db.engine) as session:
+            after = await read_changes(session, while_open.cursor, 100)
+            from_cursor = await read_changes(session, cursor_while_open, 100)
+        return {
+            "while_open": [entry.row_id for entry in while_open.entries],
+            "after": [entry.row_id for entry in after.entries],
+            "from_cursor": [entry.row_id for entry in from_cursor.entries],
+            "ids": [slow_id, quick_id],
+        }
+
+
+def test_entries_after_an_open_writer_are_held_back(api_database) -> None:
+    result = asyncio.run(_read_around_open_writer(api_database))
+
+    assert result["while_open"] == []
+    assert result["after"] == result["ids"]
+    assert result["from_cursor"] == result["ids"]
+
+
+async def _read_around_late_older_writer(api_database) -> dict[str, object]:
+    async with api_database("journal-test", 2) as db:
+        first_account, second_account = db.account_ids
+        async with AsyncSession(db.engine) as session:
+            start = await get_change_cursor(session)
+
+        # Like an import that flushes its StatementImport before a long parse:
+        # the older transaction takes its xid first, the younger one writes and
+        # stays open, and the older one writes a later seq and commits.
+        async with db.engine.connect() as older, db.engine.connect() as younger:
+            await older.begin()
+            await older.execute(text("SELECT pg_current_xact_id()"))
+            await younger.begin()
+            younger_id = await younger.scalar(text(INSERT_SQL), {"account_id": first_account})
+            older_id = await older.scalar(text(INSERT_SQL), {"account_id": second_account})
+            await older.commit()
+
+            async with AsyncSession(db.engine) as session:
+                while_open = await read_changes(session, start, 100)
+            await younger.commit()
+
+        async with AsyncSession(db.engine) as session:
+            after = await read_changes(session, while_open.cursor, 100)
+        return {
+            "while_open": [entry.row_id for entry in while_open.entries],
+            "after": [entry.row_id for entry in after.entries],
+            "ids": [older_id, younger_id],
+        }
+
+
+def test_committed_older_writer_does_not_skip_open_younger_one(api_database) -> None:
+    result = asyncio.run(_read_around_late_older_writer(api_database))
+
+    older_id, younger_id = result["ids"]
+    assert result["while_open"] == [older_id]
+    assert result["after"] == [younger_id]
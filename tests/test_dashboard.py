@@ -0,0 +1,71 @@
+import asyncio
+import datetime as dt
+import json
+from types import SimpleNamespace
+
+from app.services import dashboard
+from app.services.change_journal import ChangeCursor
+
+
+class _Result:
+    def all(self) -> list:
+        return []
+
+
+class _RequestSession:
+    async def execute(self, statement) -> _Result:
+        return _Result()
+
+
+def test_dashboard_parts_share_a_capped_number_of_connections(monkeypatch) -> None:
+    open_sessions = 0
+    peak = 0
+
+    class CountingSession:
+        async def __aenter__(self) -> "CountingSession":
+            nonlocal open_sessions, peak
+            open_sessions += 1
+            peak = max(peak, open_sessions)
+            return self
+
+        async def __aexit__(self, *exc_info) -> None:
+            nonlocal open_sessions
+            open_sessions -= 1
+
+    async def slow(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    async def get_references_for(session, rows):
+        return SimpleNamespace()
+
+    monkeypatch.setattr(dashboard, "AsyncSessionLocal", CountingSession)
+    monkeypatch.setattr(dashboard, "dashboard_connections", asyncio.Semaphore(2))
+    monkeypatch.setattr(
+        dashboard, "get_change_cursor", lambda session: slow(ChangeCursor(7, 0))
+    )
+    monkeypatch.setattr(dashboard, "get_references_for", get_references_for)
+    monkeypatch.setattr(dashboard, "encode_transaction_rows", lambda rows, refs: b"[]")
+    monkeypatch.setattr(dashboard, "monthly_report_read", lambda *args: slow(None))
+    monkeypatch.setattr(dashboard, "list_account_reads", lambda session: slow([]))
+    monkeypatch.setattr(dashboard, "list_category_reads", lambda session: slow([]))
+
+    async def load_three() -> list[bytes]:
+        return await asyncio.gather(
+            *(
+                dashboard.load_dashboard(
+                    _RequestSession(),
+                    dt.date(2026, 3, 1),
+                    dt.date(2026, 4, 1),
+                    account_id=None,
+                    balance_account=None,
+                    include_pending=False,
+                )
+                for _ in range(3)
+            )
+        )
+
+    bodies = asyncio.run(load_three())
+
+    assert peak == 2
+    assert json.loads(bodies[0])["change_cursor"] == "7:0"
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.main import CompressionMiddleware
+from app.services.events import Event, EventBus, Subscription, events_from_notification
+
+
+def test_event_encode_matches_sse_format() -> None:
+    event = Event(name="transactions", data={"op": "insert", "ids": [1]}, id=7)
+
+    assert event.encode() == 'id: 7\nevent: transactions\ndata: {"op":"insert","ids":[1]}\n\n'
+
+
+def test_slow_subscriber_is_dropped() -> None:
+    subscription = Subscription(max_queue=2)
+
+    assert subscription.push(Event(name="a"))
+    assert subscription.push(Event(name="b"))
+    assert not subscription.push(Event(name="c"))
+    assert subscription.dropped
+    assert asyncio.run(subscription.get()) is None
+
+
+def test_bus_forgets_dropped_subscribers(monkeypatch) -> None:
+    monkeypatch.setattr(
+        "app.services.events.get_settings", lambda: type("S", (), {"events_queue_size": 1})
+    )
+    bus = EventBus()
+    subscription = bus.subscribe()
+
+    bus.publish(Event(name="a"))
+    bus.publish(Event(name="b"))
+
+    assert subscription.dropped
+    assert len(bus) == 0
+
+
+def test_transaction_notification_also_invalidates_reports() -> None:
+    payload = json.dumps(
+        {
+            "table": "transactions",
+            "op": "delete",
+            "seq": 42,
+            "count": 2,
+            "ids": [5, 6],
+            "months": ["2026-02"],
+            "account_ids": [1],
+        }
+    )
+
+    events = events_from_notification(payload)
+
+    assert [event.name for event in events] == ["transactions", "report"]
+    assert events[0].id == 42
+    assert events[0].data["ids"] == [5, 6]
+    assert events[1].data == {"months": ["2026-02"], "account_ids": [1]}
+
+
+def test_application_notification_passes_through() -> None:
+    payload = json.dumps({"event": "import", "data": {"import_id": 3, "stage": "finished"}})
+
+    assert events_from_notification(payload) == [
+        Event(name="import", data={"import_id": 3, "stage": "finished"})
+    ]
+    assert events_from_notification("not json") == []
+
+
+def test_event_streams_skip_compression() -> None:
+    body = "data: x\n\n" * 500
+    inner = Starlette(routes=[Route("/", lambda request: PlainTextResponse(body))])
+    client = TestClient(CompressionMiddleware(inner, minimum_size=100))
+
+    compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+    streamed = client.get(
+        "/", headers={"Accept-Encoding": "gzip", "Accept": "text/event-stream"}
+    )
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in streamed.headers
+    assert streamed.text == body
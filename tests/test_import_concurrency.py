@@ -0,0 +1,77 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import text
+
+from app.api import imports
+
+ACCOUNTS = 3
+UPLOADS_PER_ACCOUNT = 3
+ROWS_PER_STATEMENT = 300
+
+
+def _statement(account_no: int) -> bytes:
+    lines = ["Дата;Сумма;Валюта;Описание"]
+    for index in range(ROWS_PER_STATEMENT):
+        day = 1 + index % 28
+        lines.append(f"{day:02d}.02.2026;-{index + 1},00;KZT;Shop {account_no}-{index}")
+    return "\n".join(lines).encode()
+
+
+async def _run_uploads(api_database) -> tuple[list[int], list[int], dict[int, tuple[int, int]]]:
+    async with api_database("concurrency-test", ACCOUNTS) as db:
+        account_ids = db.account_ids
+
+        async def upload(account_no: int, account_id: int) -> httpx.Response:
+            return await db.client.post(
+                "/api/import/csv-statement",
+                data={"account_id": str(account_id)},
+                files={"file": ("statement.csv", _statement(account_no), "text/csv")},
+            )
+
+        responses = await asyncio.gather(
+            *(
+                upload(account_no, account_id)
+                for account_no, account_id in enumerate(account_ids)
+                for _ in range(UPLOADS_PER_ACCOUNT)
+            ),
+            db.client.post(
+                "/api/transfers/auto-pair",
+                json={"from": "2026-02-01", "to": "2026-02-28", "account_ids": account_ids},
+            ),
+        )
+
+        async with db.engine.connect() as connection:
+            counts = {
+                account_id: (total, distinct)
+                for account_id, total, distinct in await connection.execute(
+                    text(
+                        """
+                        SELECT account_id, count(*), count(DISTINCT external_hash)
+                        FROM transactions WHERE account_id = ANY(:account_ids)
+                        GROUP BY account_id
+                        """
+                    ),
+                    {"account_ids": account_ids},
+                )
+            }
+        statuses = [response.status_code for response in responses]
+        inserted = [response.json()["inserted"] for response in responses[:-1]]
+        return statuses, inserted, counts
+
+
+def test_parallel_uploads_insert_each_row_once(
+    api_database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Fewer slots than uploads, so some imports wait for a slot as well.
+    monkeypatch.setattr(imports, "import_slots", asyncio.Semaphore(2))
+
+    statuses, inserted, counts = asyncio.run(_run_uploads(api_database))
+
+    assert statuses == [200] * (ACCOUNTS * UPLOADS_PER_ACCOUNT + 1)
+    assert sum(inserted) == ACCOUNTS * ROWS_PER_STATEMENT
+    assert len(counts) == ACCOUNTS
+    assert all(
+        total == distinct == ROWS_PER_STATEMENT for total, distinct in counts.values()
+    )
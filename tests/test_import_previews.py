@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import io
+
+import pytest
+from sqlalchemy import text
+
+from app.api import imports
+from app.services import import_previews
+from app.services.import_previews import ImportPreview, PreviewCache, estimate_preview_size
+from app.services.pdf_import_service import (
+    ParsedStatement,
+    StatementMetadata,
+    hash_rows,
+    parse_statement_line,
+)
+from app.services.statement_store import statement_store
+
+PDF = b"%PDF-1.7 preview statement"
+
+
+def _parsed(rows: int = 1, account_id: int = 1) -> ParsedStatement:
+    parsed_rows = [
+        parse_statement_line(f"06.02.2026 -{index + 1}.00 $ USD Покупка Shop {index}", page_no=1)
+        for index in range(rows)
+    ]
+    hash_rows(parsed_rows, account_id)
+    return ParsedStatement(
+        account_id=account_id,
+        account_currency="KZT",
+        metadata=StatementMetadata("freedom", None, None, None, {}, None),
+        rows=parsed_rows,
+        errors=[],
+        rows_total=rows,
+    )
+
+
+def _preview(rows: int = 1, upload: bytes = PDF) -> ImportPreview:
+    parsed = _parsed(rows)
+    return ImportPreview(
+        parsed=parsed,
+        rows=parsed.rows,
+        skipped=0,
+        filename="a.pdf",
+        file_sha256="0" * 64,
+        upload=io.BytesIO(upload),
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(import_previews.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_pop_returns_preview_once(clock: list[float]) -> None:
+    cache = PreviewCache(ttl_seconds=60, max_bytes=1024 * 1024, max_upload_bytes=1024)
+    preview = _preview()
+
+    token = cache.put(preview)
+
+    assert cache.pop(token) is preview
+    assert cache.pop(token) is None
+    assert cache.total_bytes == 0
+
+
+def test_expired_previews_are_dropped(clock: list[float]) -> None:
+    cache = PreviewCache(ttl_seconds=60, max_bytes=1024 * 1024, max_upload_bytes=1024)
+    preview = _preview()
+    token = cache.put(preview)
+
+    clock[0] += 61
+
+    assert cache.pop(token) is None
+    assert len(cache) == 0
+    assert preview.upload.closed
+
+
+def test_oldest_previews_are_evicted_over_memory_cap(clock: list[float]) -> None:
+    size = estimate_preview_size(_preview())
+    cache = PreviewCache(ttl_seconds=60, max_bytes=2 * size, max_upload_bytes=1024)
+
+    evicted = _preview()
+    first = cache.put(evicted)
+    second = cache.put(_preview())
+    third = cache.put(_preview())
+
+    assert evicted.upload.closed
+    assert cache.pop(first) is None
+    assert cache.pop(second) is not None
+    assert cache.pop(third) is not None
+
+
+def test_preview_larger_than_cap_is_rejected(clock: list[float]) -> None:
+    cache = PreviewCache(
+        ttl_seconds=60, max_bytes=estimate_preview_size(_preview(3)) - 1, max_upload_bytes=1024
+    )
+
+    with pytest.raises(ValueError):
+        cache.put(_preview(3))
+    assert len(cache) == 0
+
+
+def test_upload_copies_count_against_their_own_cap(clock: list[float]) -> None:
+    cache = PreviewCache(ttl_seconds=60, max_bytes=1024 * 1024, max_upload_bytes=1000)
+    large = b"%PDF" + b"0" * 596
+
+    first = _preview(upload=large)
+    first_token = cache.put(first)
+    second_token = cache.put(_preview(upload=large))
+
+    assert first.upload.closed
+    assert cache.pop(first_token) is None
+    assert cache.upload_bytes == len(large)
+    assert cache.pop(second_token) is not None
+    assert cache.upload_bytes == 0
+    with pytest.raises(ValueError):
+        cache.put(_preview(upload=b"%PDF" + b"0" * 1000))
+
+
+def test_expired_previews_are_released_without_new_requests(clock: list[float]) -> None:
+    cache = PreviewCache(ttl_seconds=60, max_bytes=1024 * 1024, max_upload_bytes=1024)
+    preview = _preview()
+    cache.put(preview)
+
+    clock[0] += 61
+    cache.evict_expired()
+
+    assert preview.upload.closed
+    assert len(cache) == 0
+    assert cache.upload_bytes == 0
+
+
+async def _preview_and_confirm(api_database, monkeypatch) -> tuple[bool, dict, str | None]:
+    async with api_database("preview-test", 1) as db:
+        account_id = db.account_ids[0]
+
+        async def parse(session, file, account_id):
+            return _parsed(3, account_id)
+
+        monkeypatch.setattr(imports, "parse_pdf_statement", parse)
+        preview = await db.client.post(
+            "/api/import/pdf-statement/preview",
+            data={"account_id": str(account_id)},
+            files={"file": ("statement.pdf", PDF, "application/pdf")},
+        )
+        key = hashlib.sha256(PDF).hexdigest()
+        stored_by_preview = statement_store.contains(key)
+
+        confirmed = await db.client.post(
+            "/api/import/pdf-statement/confirm", params={"token": preview.json()["token"]}
+        )
+        result = confirmed.json()
+        async with db.engine.connect() as connection:
+            blob_key = await connection.scalar(
+                text("SELECT blob_key FROM statement_imports WHERE id = :id"),
+                {"id": result["import_id"]},
+            )
+        return stored_by_preview, result, blob_key
+
+
+def test_statement_is_stored_on_confirm_only(api_database, monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(statement_store, "root", tmp_path)
+
+    stored_by_preview, result, blob_key = asyncio.run(
+        _preview_and_confirm(api_database, monkeypatch)
+    )
+
+    assert not stored_by_preview
+    assert result["inserted"] == 3
+    assert blob_key == hashlib.sha256(PDF).hexdigest()
+    with statement_store.open(blob_key) as blob:
+        assert blob.read() == PDF
@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.settings import get_settings
+from app.models.statement_import import StatementImport
+from app.services.import_rollback import ImportRolledBack
+from app.services.pdf_import_service import (
+    ParsedStatement,
+    StatementMetadata,
+    hash_rows,
+    parse_statement_line,
+    save_statement_rows,
+)
+
+ROWS = 50
+
+# Pairs the first imported expense with a hand-entered income on the other
+# account, as auto-pairing would.
+PAIR_SQL = [
+    """
+    INSERT INTO transactions (
+        description, amount, signed_amount, currency, type, kind, status, tx_date,
+        account_id, category_id, source, transfer_pair_id, matched_account_id, match_confidence
+    )
+    SELECT 'Пополнение', t.amount, t.amount, 'KZT', 'income', 'transfer', 'posted', t.tx_date,
+           :cash_id, c.id, 'manual', :pair_id, t.account_id, 90
+    FROM transactions AS t, categories AS c
+    WHERE t.import_id = :import_id AND c.name = 'Other' AND c.type = 'income'
+    ORDER BY t.id
+    LIMIT 1
+    """,
+    """
+    UPDATE transactions SET kind = 'transfer', transfer_pair_id = :pair_id,
+        matched_account_id = :cash_id, match_confidence = 90
+    WHERE id = (SELECT min(id) FROM transactions WHERE import_id = :import_id)
+    """,
+]
+
+
+def _statement() -> bytes:
+    lines = ["Дата;Сумма;Валюта;Описание"]
+    for index in range(ROWS):
+        lines.append(f"{1 + index % 28:02d}.03.2026;-{index + 1},00;KZT;Rollback {index}")
+    return "\n".join(lines).encode()
+
+
+async def _import_and_roll_back(api_database) -> tuple[list[dict], dict[str, object]]:
+    async with api_database("rollback-test", 2) as db:
+        card_id, cash_id = db.account_ids
+        imported = await db.client.post(
+            "/api/import/csv-statement",
+            data={"account_id": str(card_id)},
+            files={"file": ("statement.csv", _statement(), "text/csv")},
+        )
+        import_id = imported.json()["import_id"]
+        async with db.engine.begin() as connection:
+            for statement in PAIR_SQL:
+                await connection.execute(
+                    text(statement),
+                    {
+                        "import_id": import_id,
+                        "cash_id": cash_id,
+                        "pair_id": "8f8e9d52-3f7e-4d4e-9d59-0f6f1b7b5a01",
+                    },
+                )
+
+        responses = [
+            await db.client.post(f"/api/imports/{import_id}/rollback") for _ in range(2)
+        ]
+
+        async with db.engine.connect() as connection:
+            state = {
+                "status": await connection.scalar(
+                    text("SELECT status FROM statement_imports WHERE id = :id"),
+                    {"id": import_id},
+                ),
+                "left": await connection.scalar(
+                    text("SELECT count(*) FROM transactions WHERE import_id = :id"),
+                    {"id": import_id},
+                ),
+                "raw": await connection.scalar(
+                    text("SELECT count(*) FROM transaction_raw WHERE import_id = :id"),
+                    {"id": import_id},
+                ),
+                "counterpart": (
+                    await connection.execute(
+                        text(
+                            """
+                            SELECT kind::text, transfer_pair_id, matched_account_id
+                            FROM transactions WHERE account_id = :id
+                            """
+                        ),
+                        {"id": cash_id},
+                    )
+                ).one(),
+                "rollups": await connection.scalar(
+                    text("SELECT count(*) FROM monthly_rollups WHERE account_id = :id"),
+                    {"id": card_id},
+                ),
+            }
+        return [
+            {"status": response.status_code, **response.json()} for response in responses
+        ], state
+
+
+def test_rollback_deletes_in_chunks_and_unpairs_counterparts(
+    api_database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # A chunk size that doesn't divide the import, so the last chunk is short.
+    monkeypatch.setattr(get_settings(), "import_rollback_chunk_size", 7)
+
+    responses, state = asyncio.run(_import_and_roll_back(api_database))
+
+    first, second = responses
+    assert first["status"] == 200
+    assert first["deleted"] == ROWS
+    assert first["unpaired"] == 1
+    assert second["status"] == 409
+    assert state["status"] == "rolled_back"
+    assert state["left"] == 0
+    assert state["raw"] == 0
+    assert tuple(state["counterpart"]) == ("income", None, None)
+    assert state["rollups"] == 0
+
+
+CHUNKED_ROWS = 10
+
+
+async def _roll_back_between_chunks(api_database) -> dict[str, object]:
+    async with api_database("rollback-chunks-test", 1) as db:
+        account_id = db.account_ids[0]
+        rows = [
+            parse_statement_line(
+                f"{1 + index:02d}.03.2026 -{index + 1}00,00 ₸ KZT Покупка Chunk {index}",
+                page_no=1,
+            )
+            for index in range(CHUNKED_ROWS)
+        ]
+        hash_rows(rows, account_id)
+        parsed = ParsedStatement(
+            account_id=account_id,
+            account_currency="KZT",
+            metadata=StatementMetadata("freedom", None, None, None, {}, None),
+            rows=rows,
+            errors=[],
+            rows_total=len(rows),
+        )
+        responses = []
+        async with AsyncSession(db.engine, expire_on_commit=False) as session:
+            statement_import = StatementImport(
+                source="pdf", account_id=account_id, status="processing"
+            )
+            session.add(statement_import)
+            await session.commit()
+            import_id = statement_import.id
+
+            # The rollback runs right after the first chunk is committed.
+            commit = session.commit
+
+            async def commit_then_roll_back() -> None:
+                await commit()
+                if not responses:
+                    responses.append(
+                        await db.client.post(f"/api/imports/{import_id}/rollback")
+                    )
+
+            session.commit = commit_then_roll_back
+            try:
+                await save_statement_rows(session, parsed, rows, 0, statement_import)
+            except ImportRolledBack:
+                stopped = True
+            else:
+                stopped = False
+            await session.rollback()
+
+        responses.append(await db.client.post(f"/api/imports/{import_id}/rollback"))
+        async with db.engine.connect() as connection:
+            left = await connection.scalar(
+                text("SELECT count(*) FROM transactions WHERE import_id = :id"),
+                {"id": import_id},
+            )
+            import_status = await connection.scalar(
+                text("SELECT status FROM statement_imports WHERE id = :id"),
+                {"id": import_id},
+            )
+        return {
+            "stopped": stopped,
+            "responses": [(response.status_code, response.json()) for response in responses],
+            "left": left,
+            "status": import_status,
+        }
+
+
+def test_rollback_between_chunks_stops_the_import(
+    api_database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(get_settings(), "import_chunk_size", 4)
+
+    result = asyncio.run(_roll_back_between_chunks(api_database))
+
+    (first_status, first), (second_status, _) = result["responses"]
+    assert result["stopped"]
+    assert first_status == 200
+    assert first["deleted"] == 4
+    assert second_status == 409
+    assert result["left"] == 0
+    assert result["status"] == "rolled_back"
@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+import io
+import zipfile
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.api.imports import PDF_MAGIC, XLSX_MAGIC, _inspect_upload
+from app.db.settings import get_settings
+from app.main import UPLOAD_FORM_OVERHEAD, UploadLimitMiddleware
+
+MAX_BYTES = 4 * 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def small_upload_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "import_max_upload_bytes", MAX_BYTES)
+
+
+def _upload(content: bytes, size: int | None = None) -> UploadFile:
+    # size=None is an upload whose size the multipart parser did not report.
+    return UploadFile(file=io.BytesIO(content), size=size, filename="statement")
+
+
+def _inspect(content: bytes, magic: bytes | None, label: str, size: int | None = None):
+    return asyncio.run(_inspect_upload(_upload(content, size), magic, label))
+
+
+def _xlsx() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("xl/workbook.xml", "<workbook/>")
+    return buffer.getvalue()
+
+
+def test_pdf_upload_is_hashed() -> None:
+    content = b"%PDF-1.7 statement"
+
+    assert _inspect(content, PDF_MAGIC, "PDF") == hashlib.sha256(content).hexdigest()
+
+
+def test_upload_without_pdf_magic_is_rejected() -> None:
+    with pytest.raises(HTTPException) as error:
+        _inspect(b"<html>not a statement</html>", PDF_MAGIC, "PDF")
+
+    assert error.value.status_code == 400
+    assert error.value.detail == "Файл не похож на PDF"
+
+
+def test_xlsx_that_is_not_a_zip_is_rejected() -> None:
+    with pytest.raises(HTTPException) as error:
+        _inspect(b"Date;Amount\n01.02.2026;-10\n", XLSX_MAGIC, "XLSX")
+
+    assert error.value.status_code == 400
+    assert error.value.detail == "Файл не похож на XLSX"
+    assert _inspect(_xlsx(), XLSX_MAGIC, "XLSX")
+
+
+@pytest.mark.parametrize("size", [None, MAX_BYTES + 1])
+def test_oversized_upload_is_rejected(size: int | None) -> None:
+    content = b"%PDF-1.7" + b"0" * MAX_BYTES
+
+    with pytest.raises(HTTPException) as error:
+        _inspect(content, PDF_MAGIC, "PDF", size=size)
+
+    assert error.value.status_code == 413
+    assert error.value.detail == "Файл больше 4 МБ"
+
+
+def test_upload_limit_rejects_by_content_length_before_reading() -> None:
+    received: list[int] = []
+
+    async def upload(request) -> PlainTextResponse:
+        received.append(len(await request.body()))
+        return PlainTextResponse("ok")
+
+    inner = Starlette(routes=[Route("/api/import/pdf-statement", upload, methods=["POST"])])
+    client = TestClient(UploadLimitMiddleware(inner))
+
+    small = client.post("/api/import/pdf-statement", content=b"0" * MAX_BYTES)
+    large = client.post(
+        "/api/import/pdf-statement", content=b"0" * (MAX_BYTES + UPLOAD_FORM_OVERHEAD + 1)
+    )
+
+    assert small.status_code == 200
+    assert large.status_code == 413
+    assert large.json() == {"detail": "Файл больше 4 МБ"}
+    assert received == [MAX_BYTES]
@@ -0,0 +1,30 @@
+import datetime as dt
+
+import pytest
+
+from app.services.month import MAX_TREND_MONTHS, resolve_month_range, resolve_month_window
+
+
+def test_resolve_month_window_december_rolls_over_year() -> None:
+    start, end, label = resolve_month_window("2025-12")
+
+    assert start == dt.date(2025, 12, 1)
+    assert end == dt.date(2026, 1, 1)
+    assert label == "2025-12"
+
+
+def test_resolve_month_range_returns_first_days() -> None:
+    start, end = resolve_month_range("2025-03", "2026-02")
+
+    assert start == dt.date(2025, 3, 1)
+    assert end == dt.date(2026, 2, 1)
+
+
+def test_resolve_month_range_rejects_reversed_period() -> None:
+    with pytest.raises(ValueError, match="не позже"):
+        resolve_month_range("2026-02", "2026-01")
+
+
+def test_resolve_month_range_rejects_too_long_period() -> None:
+    with pytest.raises(ValueError, match=str(MAX_TREND_MONTHS)):
+        resolve_month_range("2000-01", "2026-01")
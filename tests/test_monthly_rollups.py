@@ -0,0 +1,113 @@
+import asyncio
+
+from sqlalchemy import text
+
+# Rollups that differ from a GROUP BY over transactions, in either direction.
+MISMATCH_SQL = """
+    WITH expected AS (
+        SELECT account_id, date_trunc('month', tx_date)::date AS month, category_id, kind,
+               status, currency, SUM(amount) AS total_amount,
+               COALESCE(SUM(amount) FILTER (WHERE signed_amount < 0), 0) AS outflow_amount,
+               COUNT(*) AS tx_count
+        FROM transactions
+        WHERE account_id = ANY(:account_ids)
+        GROUP BY 1, 2, 3, 4, 5, 6
+    ),
+    actual AS (
+        SELECT account_id, month, category_id, kind, status, currency,
+               total_amount, outflow_amount, tx_count
+        FROM monthly_rollups
+        WHERE account_id = ANY(:account_ids)
+    )
+    SELECT count(*) FROM (
+        (SELECT * FROM expected EXCEPT SELECT * FROM actual)
+        UNION ALL
+        (SELECT * FROM actual EXCEPT SELECT * FROM expected)
+    ) AS mismatches
+"""
+
+INSERT_SQL = """
+    INSERT INTO transactions (
+        description, amount, signed_amount, currency, type, kind, status, tx_date,
+        account_id, category_id, source
+    )
+    SELECT 'rollup-test ' || n,
+           10 * n,
+           CASE WHEN n % 3 = 0 THEN 10 * n ELSE -10 * n END,
+           CASE WHEN n % 5 = 0 THEN 'USD' ELSE 'KZT' END,
+           CASE WHEN n % 3 = 0 THEN 'income' ELSE 'expense' END::transaction_type,
+           CASE WHEN n % 3 = 0 THEN 'income' ELSE 'expense' END::transaction_kind,
+           CASE WHEN n % 7 = 0 THEN 'pending' ELSE 'posted' END::transaction_status,
+           DATE '2026-01-15' + n * 4,
+           :account_id,
+           (SELECT id FROM categories WHERE name = 'Other'
+              AND type = CASE WHEN n % 3 = 0 THEN 'income' ELSE 'expense' END::transaction_type),
+           'manual'
+    FROM generate_series(1, 40) AS n
+"""
+
+WRITES = {
+    "insert": [INSERT_SQL],
+    "update date": [
+        "UPDATE transactions SET tx_date = tx_date + 20 "
+        "WHERE account_id = :account_id AND amount < 150"
+    ],
+    "update amount": [
+        "UPDATE transactions SET amount = amount + 5, "
+        "signed_amount = signed_amount + sign(signed_amount) * 5 "
+        "WHERE account_id = :account_id AND amount BETWEEN 150 AND 250"
+    ],
+    "update kind": [
+        "UPDATE transactions SET kind = 'transfer' "
+        "WHERE account_id = :account_id AND amount BETWEEN 250 AND 320"
+    ],
+    "update status": [
+        "UPDATE transactions SET status = 'posted' "
+        "WHERE account_id = :account_id AND status = 'pending'"
+    ],
+    "update account": [
+        "UPDATE transactions SET account_id = :other_account_id "
+        "WHERE account_id = :account_id AND amount > 320"
+    ],
+    "untouched update": [
+        "UPDATE transactions SET category_locked = true WHERE account_id = :account_id"
+    ],
+    "delete": [
+        "DELETE FROM transactions WHERE account_id = ANY(:account_ids) AND amount % 20 = 0"
+    ],
+    "delete rest": ["DELETE FROM transactions WHERE account_id = ANY(:account_ids)"],
+}
+
+
+async def _mismatches_after_each_write(api_database) -> dict[str, int]:
+    async with api_database("rollup-test", 2) as db:
+        account_id, other_account_id = db.account_ids
+        params = {
+            "account_id": account_id,
+            "other_account_id": other_account_id,
+            "account_ids": db.account_ids,
+        }
+        mismatches: dict[str, int] = {}
+        for name, statements in WRITES.items():
+            async with db.engine.begin() as connection:
+                for statement in statements:
+                    await connection.execute(
+                        text(statement),
+                        {key: value for key, value in params.items() if f":{key}" in statement},
+                    )
+            async with db.engine.connect() as connection:
+                mismatches[name] = await connection.scalar(
+                    text(MISMATCH_SQL), {"account_ids": db.account_ids}
+                )
+        async with db.engine.connect() as connection:
+            mismatches["left over"] = await connection.scalar(
+                text("SELECT count(*) FROM monthly_rollups WHERE account_id = ANY(:account_ids)"),
+                {"account_ids": db.account_ids},
+            )
+        return mismatches
+
+
+def test_rollup_triggers_match_transactions_after_every_write(api_database) -> None:
+    mismatches = asyncio.run(_mismatches_after_each_write(api_database))
+
+    assert mismatches == {name: 0 for name in [*WRITES, "left over"]}
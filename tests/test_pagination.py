@@ -0,0 +1,22 @@
+import datetime as dt
+
+import pytest
+
+from app.services.pagination import decode_cursor, encode_cursor, escape_like
+
+
+def test_cursor_round_trip() -> None:
+    cursor = encode_cursor(dt.date(2026, 2, 14), 12345)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (dt.date(2026, 2, 14), 12345)
+
+
+@pytest.mark.parametrize("cursor", ["", "zzz", "MjAyNi0wMi0xNA", "bm90LWEtZGF0ZTox"])
+def test_decode_cursor_rejects_garbage(cursor: str) -> None:
+    with pytest.raises(ValueError, match="Некорректный курсор"):
+        decode_cursor(cursor)
+
+
+def test_escape_like_escapes_wildcards() -> None:
+    assert escape_like("100%_off\\") == "100\\%\\_off\\\\"
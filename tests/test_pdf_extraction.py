@@ -0,0 +1,71 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, NameObject
+
+from app.services.import_limits import ImportLimitExceeded, ImportLimits
+from app.services.pdf_extraction import extract_page_texts
+from app.services.tabular_import_service import iter_xlsx_rows
+
+LIMITS = ImportLimits(
+    max_pages=5,
+    max_decompressed_bytes=1024 * 1024,
+    wall_seconds=30.0,
+    cpu_seconds=30,
+)
+
+
+def _pdf(pages: int, content: bytes | None = None) -> io.BytesIO:
+    writer = PdfWriter()
+    for _ in range(pages):
+        page = writer.add_blank_page(200, 200)
+        if content is not None:
+            stream = DecodedStreamObject()
+            stream.set_data(content)
+            page[NameObject("/Contents")] = writer._add_object(stream.flate_encode())
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer
+
+
+def _extract(file: io.BytesIO, limits: ImportLimits = LIMITS) -> list[str]:
+    return asyncio.run(extract_page_texts(file, limits))
+
+
+def test_extracts_pages_in_worker() -> None:
+    assert _extract(_pdf(2)) == ["", ""]
+
+
+def test_rejects_too_many_pages() -> None:
+    with pytest.raises(ImportLimitExceeded, match="6 страниц"):
+        _extract(_pdf(6))
+
+
+def test_rejects_decompression_bomb() -> None:
+    # 8 MB of whitespace compresses to a few kilobytes.
+    bomb = _pdf(1, b" " * (8 * 1024 * 1024))
+    assert len(bomb.getvalue()) < 64 * 1024
+
+    with pytest.raises(ImportLimitExceeded, match="после распаковки"):
+        _extract(bomb)
+
+
+def test_wall_time_budget_fails_import() -> None:
+    limits = ImportLimits(max_pages=5, max_decompressed_bytes=1024, wall_seconds=0.01, cpu_seconds=1)
+
+    with pytest.raises(ImportLimitExceeded, match="дольше"):
+        _extract(_pdf(1), limits)
+
+
+def test_rejects_xlsx_bomb(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ImportLimits, "from_settings", classmethod(lambda cls: LIMITS))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("xl/worksheets/sheet1.xml", b" " * (2 * 1024 * 1024))
+    buffer.seek(0)
+
+    with pytest.raises(ImportLimitExceeded):
+        list(iter_xlsx_rows(buffer))
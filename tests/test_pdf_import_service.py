@@ -1,18 +1,31 @@
+import asyncio
 import datetime as dt
 from decimal import Decimal
 
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.settings import get_settings
 from app.models.enums import TransactionStatus, TransactionType
+from app.models.statement_import import StatementImport
+from app.services import pdf_import_service
 from app.services.pdf_import_service import (
     MAX_IMPORT_ERRORS,
     TABLE_HEADER,
     TABLE_HEADER_KASPI,
-    extract_statement_metadata,
+    ParsedStatement,
+    StatementMetadata,
     deduplicate_rows,
+    extract_statement_metadata,
+    hash_rows,
     make_external_hash,
     parse_kaspi_statement_line,
     parse_statement_line,
     parse_statement_rows_from_page_texts,
+    save_statement_rows,
 )
+from app.services.statement_store import statement_store
 
 
 def test_parse_kzt_row_with_comma_amount() -> None:
@@ -69,11 +82,13 @@ def test_multiline_details_are_joined() -> None:
 def test_deduplicate_by_external_hash() -> None:
     row1 = parse_statement_line("06.02.2026 -14.48 $ USD Покупка Netflix.com Los Gatos NL", page_no=2)
     row2 = parse_statement_line("06.02.2026 -14.48 $ USD Покупка Netflix.com Los Gatos NL", page_no=4)
+    row3 = parse_statement_line("07.02.2026 -14.48 $ USD Покупка Netflix.com Los Gatos NL", page_no=4)
+    hash_rows([row1, row2, row3], account_id=1)
 
-    unique_rows, skipped = deduplicate_rows([row1, row2], existing_hashes=set())
+    unique_rows, skipped = deduplicate_rows([row1, row2, row3], existing_hashes={row3.external_hash})
 
-    assert len(unique_rows) == 1
-    assert skipped == 1
+    assert unique_rows == [row1]
+    assert skipped == 2
 
 
 def test_extract_kaspi_header_balances() -> None:
@@ -190,6 +205,32 @@ def test_external_hash_depends_on_account_id() -> None:
         account_id=2,
     )
     assert hash_a != hash_b
+    assert len(hash_a) == 16
+
+
+def test_external_hash_ignores_amount_formatting() -> None:
+    values = {
+        "tx_date": dt.date(2026, 2, 21),
+        "currency": "KZT",
+        "operation": "Покупка",
+        "details": "YANDEX.EDA",
+        "account_id": 1,
+    }
+
+    assert make_external_hash(signed_amount=Decimal("-5863"), **values) == make_external_hash(
+        signed_amount=Decimal("-5863.00"), **values
+    )
+
+
+def test_parsed_rows_are_hashed_once_with_account() -> None:
+    row = parse_statement_line("06.02.2026 -14.48 $ USD Покупка Netflix.com Los Gatos NL", page_no=1)
+    assert row.external_hash == b""
+
+    hash_rows([row], account_id=5)
+
+    assert row.external_hash == make_external_hash(
+        row.tx_date, row.signed_amount, row.currency, row.operation, row.details, account_id=5
+    )
 
 
 def test_errors_are_truncated_for_kaspi_parse() -> None:
@@ -201,3 +242,167 @@ def test_errors_are_truncated_for_kaspi_parse() -> None:
     assert total == MAX_IMPORT_ERRORS + 5
     assert len(errors) == MAX_IMPORT_ERRORS + 1
     assert errors[-1] == "и ещё 5 строк(и) с ошибками"
+
+
+SAVE_ROWS = 10
+BAD_ROW = 5
+
+
+def _rows_with_one_bad(account_id: int) -> list:
+    rows = [
+        parse_statement_line(
+            f"{1 + index:02d}.03.2026 -{index + 1}00,00 ₸ KZT Покупка chunk-test {index}",
+            page_no=1 + index,
+        )
+        for index in range(SAVE_ROWS)
+    ]
+    # Longer than transactions.description allows; fails only its own insert.
+    rows[BAD_ROW].description = "x" * 300
+    hash_rows(rows, account_id)
+    return rows
+
+
+async def _save_in_chunks(api_database) -> tuple[object, list[int], int, int]:
+    async with api_database("chunk-test", 1) as db:
+        account_id = db.account_ids[0]
+        rows = _rows_with_one_bad(account_id)
+        parsed = ParsedStatement(
+            account_id=account_id,
+            account_currency="KZT",
+            metadata=StatementMetadata(
+                bank_type="freedom",
+                period_from=None,
+                period_to=None,
+                opening_balance=None,
+                closing_balance_by_currency={},
+                pending_balance=None,
+            ),
+            rows=rows,
+            errors=[],
+            rows_total=len(rows),
+        )
+        progress: list[int] = []
+        async with AsyncSession(db.engine, expire_on_commit=False) as session:
+            statement_import = StatementImport(
+                source="pdf", account_id=account_id, status="processing"
+            )
+            session.add(statement_import)
+            await session.commit()
+
+            # Records what other connections see after every commit.
+            commit = session.commit
+
+            async def watched_commit() -> None:
+                await commit()
+                async with db.engine.connect() as connection:
+                    progress.append(
+                        await connection.scalar(
+                            text("SELECT inserted FROM statement_imports WHERE id = :id"),
+                            {"id": statement_import.id},
+                        )
+                    )
+
+            session.commit = watched_commit
+            result = await save_statement_rows(session, parsed, rows, 0, statement_import)
+
+        async with db.engine.connect() as connection:
+            saved = await connection.scalar(
+                text("SELECT count(*) FROM transactions WHERE import_id = :id"),
+                {"id": statement_import.id},
+            )
+            raw = await connection.scalar(
+                text(
+                    """
+                    SELECT count(*) FROM transaction_raw AS r, jsonb_object_keys(r.payloads)
+                    WHERE r.import_id = :id
+                    """
+                ),
+                {"id": statement_import.id},
+            )
+        return result, progress, saved, raw
+
+
+def test_save_statement_rows_keeps_good_rows_of_a_failed_chunk(
+    api_database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(get_settings(), "import_chunk_size", 4)
+
+    result, progress, saved, raw = asyncio.run(_save_in_chunks(api_database))
+
+    assert result.inserted == saved == raw == SAVE_ROWS - 1
+    assert result.skipped == 0
+    assert len(result.errors) == 1
+    assert result.errors[0].startswith(f"Не удалось сохранить строку (стр. {BAD_ROW + 1})")
+    # One commit per chunk, the second chunk without its bad row.
+    assert progress == [4, 7, 9]
+
+
+async def _import_failing_after_first_chunk(api_database, monkeypatch) -> dict[str, object]:
+    async with api_database("chunk-fail-test", 1) as db:
+        account_id = db.account_ids[0]
+        rows = _rows_with_one_bad(account_id)
+        rows[BAD_ROW].description = "fine"
+        hash_rows(rows, account_id)
+
+        async def parse(session, file, account_id):
+            return ParsedStatement(
+                account_id=account_id,
+                account_currency="KZT",
+                metadata=StatementMetadata("freedom", None, None, None, {}, None),
+                rows=rows,
+                errors=[],
+                rows_total=len(rows),
+            )
+
+        saves = []
+        save_raw_payloads = pdf_import_service.save_raw_payloads
+
+        async def failing_save(session, import_id, payloads):
+            saves.append(import_id)
+            if len(saves) == 2:
+                raise RuntimeError("connection lost")
+            await save_raw_payloads(session, import_id, payloads)
+
+        monkeypatch.setattr(pdf_import_service, "parse_pdf_statement", parse)
+        monkeypatch.setattr(pdf_import_service, "save_raw_payloads", failing_save)
+        with pytest.raises(RuntimeError):
+            await db.client.post(
+                "/api/import/pdf-statement",
+                data={"account_id": str(account_id)},
+                files={"file": ("statement.pdf", b"%PDF-1.7 chunks", "application/pdf")},
+            )
+
+        async with db.engine.connect() as connection:
+            status, error, left = (
+                await connection.execute(
+                    text(
+                        """
+                        SELECT i.status, i.error,
+                               (SELECT count(*) FROM transactions WHERE import_id = i.id)
+                        FROM statement_imports AS i WHERE i.id = :id
+                        """
+                    ),
+                    {"id": saves[0]},
+                )
+            ).one()
+        rollback = await db.client.post(f"/api/imports/{saves[0]}/rollback")
+        return {
+            "status": status,
+            "error": error,
+            "left": left,
+            "rollback": (rollback.status_code, rollback.json().get("deleted")),
+        }
+
+
+def test_import_failing_after_a_committed_chunk_is_marked_failed(
+    api_database, monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    monkeypatch.setattr(get_settings(), "import_chunk_size", 4)
+    monkeypatch.setattr(statement_store, "root", tmp_path)
+
+    result = asyncio.run(_import_failing_after_first_chunk(api_database, monkeypatch))
+
+    assert result["status"] == "failed"
+    assert result["error"] == "Импорт прерван: connection lost"
+    assert result["left"] == 4
+    assert result["rollback"] == (200, 4)
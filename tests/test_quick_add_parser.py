@@ -3,7 +3,7 @@ from decimal import Decimal
 import pytest
 
 from app.models.enums import TransactionType
-from app.services.quick_add import parse_quick_add_text
+from app.services.quick_add import parse_quick_add_text, split_quick_add_lines
 
 
 def test_parse_expense_quick_add() -> None:
@@ -26,3 +26,9 @@ def test_parse_income_quick_add() -> None:
 def test_parse_quick_add_without_amount_raises_error() -> None:
     with pytest.raises(ValueError, match="Не найдена сумма"):
         parse_quick_add_text("просто текст")
+
+
+def test_split_quick_add_lines_keeps_line_numbers() -> None:
+    lines = split_quick_add_lines("кофе 1200\n\n  такси 2500 \r\nзарплата +500000\n")
+
+    assert lines == [(0, "кофе 1200"), (2, "такси 2500"), (3, "зарплата +500000")]
@@ -0,0 +1,68 @@
+import asyncio
+
+from app.models.enums import TransactionType
+from app.services import reference_cache
+from app.services.reference_cache import (
+    AccountRef,
+    CategoryRef,
+    ReferenceData,
+    get_reference_data,
+    pick_default_account_id,
+)
+
+
+def _account(account_id: int, name: str) -> AccountRef:
+    return AccountRef(id=account_id, name=name, bank="Bank", currency="KZT", is_active=True)
+
+
+def test_pick_default_account_prefers_named_then_lowest_id() -> None:
+    assert pick_default_account_id([_account(3, "Kaspi"), _account(7, "Основной счет")]) == 7
+    assert pick_default_account_id([_account(3, "Kaspi"), _account(5, "Main Account")]) == 5
+    assert pick_default_account_id([_account(9, "Kaspi"), _account(4, "Halyk")]) == 4
+    assert pick_default_account_id([]) is None
+
+
+def test_reference_data_revalidates_by_ttl_and_unknown_ids(monkeypatch) -> None:
+    version_checks = 0
+    loads = 0
+    versions = (("categories", 1),)
+
+    async def fake_versions(session, scopes):
+        nonlocal version_checks
+        version_checks += 1
+        return versions
+
+    async def fake_load(session, loaded_versions):
+        nonlocal loads
+        loads += 1
+        return ReferenceData(
+            versions=loaded_versions,
+            accounts={1: _account(1, "Основной счет")},
+            categories={2: CategoryRef(id=2, name="Food", type=TransactionType.EXPENSE)},
+        )
+
+    monkeypatch.setattr(reference_cache, "get_version_vector", fake_versions)
+    monkeypatch.setattr(reference_cache, "_load_reference_data", fake_load)
+    monkeypatch.setattr(reference_cache, "_cached", None)
+
+    async def scenario() -> None:
+        nonlocal versions
+        first = await get_reference_data(None)
+        assert await get_reference_data(None, account_ids=[1], category_ids=[2]) is first
+        assert (version_checks, loads) == (1, 1)
+
+        # Unknown ids and explicit revalidation check versions despite the TTL,
+        # but only changed versions reload: a bogus id costs one version check.
+        assert await get_reference_data(None, account_ids=[5]) is first
+        assert await get_reference_data(None, account_ids=[5]) is first
+        assert (version_checks, loads) == (3, 1)
+        await get_reference_data(None, revalidate=True)
+        assert (version_checks, loads) == (4, 1)
+
+        versions = (("categories", 2),)
+        refreshed = await get_reference_data(None, account_ids=[5])
+        assert refreshed is not first
+        assert refreshed.versions == versions
+        assert loads == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,238 @@
+import asyncio
+import dataclasses
+import datetime as dt
+import io
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.enums import TransactionStatus, TransactionType
+from app.services.reparse import (
+    ReparseJob,
+    ReparsedRow,
+    StoredTransaction,
+    apply_statement_diff,
+    corrected_values,
+    diff_statement,
+    load_reparse_jobs,
+    load_stored_transactions,
+    parse_stored_statement,
+)
+from app.services.statement_store import statement_store
+from app.services.statement_store import StatementStore
+
+DAY = dt.date(2026, 3, 1)
+
+
+def _raw(operation: str, details: str, amount: str) -> dict[str, str]:
+    return {"operation": operation, "details": details, "signed_amount_text": amount}
+
+
+def _row(amount: str, details: str, digest: bytes, **overrides) -> ReparsedRow:
+    values = {
+        "tx_date": DAY,
+        "signed_amount": Decimal(amount),
+        "amount": abs(Decimal(amount)),
+        "tx_type": TransactionType.EXPENSE,
+        "currency": "KZT",
+        "description": f"Покупка {details}",
+        "status": TransactionStatus.POSTED,
+        "external_hash": digest,
+        "raw": _raw("Покупка", details, amount),
+    }
+    values.update(overrides)
+    return ReparsedRow(**values)
+
+
+def _stored(
+    transaction_id: int, amount: str, details: str, digest: bytes, **overrides
+) -> StoredTransaction:
+    values = {
+        "id": transaction_id,
+        "external_hash": digest,
+        "tx_date": DAY,
+        "signed_amount": Decimal(amount),
+        "currency": "KZT",
+        "description": f"Покупка {details}",
+        "status": TransactionStatus.POSTED,
+        "transfer_pair_id": None,
+        "raw": _raw("Покупка", details, amount),
+    }
+    values.update(overrides)
+    return StoredTransaction(**values)
+
+
+def test_diff_statement_leaves_identical_rows_alone() -> None:
+    stored = [_stored(1, "-100", "Shop", b"a"), _stored(2, "-200", "Cafe", b"b")]
+    rows = [_row("-100", "Shop", b"a"), _row("-200", "Cafe", b"b")]
+
+    diff = diff_statement(stored, rows)
+
+    assert not diff.changed
+    assert diff.kept == []
+
+
+def test_diff_statement_matches_by_hash_and_by_date_amount() -> None:
+    stored = [_stored(1, "-100", "Shop", b"a"), _stored(2, "-200", "Caf", b"old")]
+    rows = [
+        _row("-100", "Shop", b"a", raw=_raw("Покупка", "Shop", "-100,00")),
+        _row("-200", "Cafe", b"new"),
+    ]
+
+    diff = diff_statement(stored, rows)
+
+    assert [(item.id, row.external_hash) for item, row in diff.updates] == [(1, b"a"), (2, b"new")]
+    assert diff.inserts == [] and diff.deletes == []
+    # Only the raw payload of the first row changed.
+    assert [corrected_values(item, row) for item, row in diff.updates] == [
+        {},
+        {"id": 2, "external_hash": b"new", "description": "Покупка Cafe"},
+    ]
+
+
+def test_corrected_values_keep_edited_descriptions() -> None:
+    edited = _stored(1, "-100", "Caf", b"old", description="Кофе с коллегами")
+    unparsed = _stored(2, "-100", "Caf", b"old", raw=None)
+    row = _row("-100", "Cafe в обработке", b"new", status=TransactionStatus.PENDING)
+
+    assert corrected_values(edited, row) == {"id": 1, "external_hash": b"new"}
+    assert corrected_values(unparsed, row) == {"id": 2, "external_hash": b"new"}
+    assert corrected_values(_stored(3, "-100", "Caf", b"new"), row) == {
+        "id": 3,
+        "description": "Покупка Cafe в обработке",
+        "status": TransactionStatus.PENDING,
+    }
+
+
+def test_diff_statement_inserts_missing_and_deletes_stale_rows() -> None:
+    paired = _stored(3, "-500", "Transfer", b"t", transfer_pair_id=uuid4())
+    stored = [_stored(1, "-100", "Shop", b"a"), _stored(2, "-300", "Ghost", b"g"), paired]
+    rows = [_row("-100", "Shop", b"a"), _row("-400", "Taxi", b"x"), _row("-400", "Taxi", b"x")]
+
+    diff = diff_statement(stored, rows)
+
+    assert [row.description for row in diff.inserts] == ["Покупка Taxi"]
+    assert diff.deletes == [2]
+    assert diff.kept == [3]
+    assert diff.updates == []
+
+
+def test_parse_stored_statement_reads_csv_blob(tmp_path) -> None:
+    key = "ab" + "0" * 62
+    statement = "Дата;Сумма;Валюта;Описание\n01.03.2026;-1 500,00;KZT;Shop\nbad;x;KZT;y\n"
+    StatementStore(tmp_path).put(io.BytesIO(statement.encode()), key)
+    job = ReparseJob(import_id=1, source="csv", blob_key=key, account_id=7, account_currency="KZT")
+
+    rows = parse_stored_statement(job, str(tmp_path))
+
+    assert len(rows) == 1
+    assert rows[0].signed_amount == Decimal("-1500.00")
+    assert rows[0].description.endswith("Shop")
+    assert len(rows[0].external_hash) == 16
+
+
+APPLY_STATEMENT = "Дата;Сумма;Валюта;Описание\n" + "\n".join(
+    [
+        "01.03.2026;-100,00;KZT;Caf",
+        "02.03.2026;-200,00;KZT;Bakery",
+        "03.03.2026;-300,00;KZT;Taxi",
+    ]
+)
+
+
+def _fixed_row(row: ReparsedRow, details: str, digest: bytes) -> ReparsedRow:
+    # What a parser fix that reads more of the details column would produce.
+    operation = row.raw["operation"]
+    return dataclasses.replace(
+        row,
+        description=f"{operation} {details}",
+        external_hash=digest,
+        raw={**row.raw, "details": details},
+    )
+
+
+async def _apply_fixed_parse(api_database, store_root: str) -> tuple[dict, dict, list]:
+    async with api_database("reparse-test", 1) as db:
+        imported = await db.client.post(
+            "/api/import/csv-statement",
+            data={"account_id": str(db.account_ids[0])},
+            files={"file": ("statement.csv", APPLY_STATEMENT.encode(), "text/csv")},
+        )
+        import_id = imported.json()["import_id"]
+        async with db.engine.begin() as connection:
+            await connection.execute(
+                text(
+                    """
+                    UPDATE transactions SET description = 'Кофе с коллегами'
+                    WHERE import_id = :id AND description LIKE '%Caf'
+                    """
+                ),
+                {"id": import_id},
+            )
+            before = {
+                row.tx_date: row
+                for row in await connection.execute(
+                    text(
+                        """
+                        SELECT id, tx_date, description, category_id, external_hash
+                        FROM transactions WHERE import_id = :id
+                        """
+                    ),
+                    {"id": import_id},
+                )
+            }
+
+        async with AsyncSession(db.engine, expire_on_commit=False) as session:
+            job = next(
+                job for job in await load_reparse_jobs(session, force=True)
+                if job.import_id == import_id
+            )
+            rows = parse_stored_statement(job, store_root)
+            rows[0] = _fixed_row(rows[0], "Cafe", b"\x01" * 16)
+            rows[1] = _fixed_row(rows[1], "Bakery 24", b"\x02" * 16)
+            stored = await load_stored_transactions(session, import_id)
+            diff = diff_statement(stored, rows)
+            await apply_statement_diff(session, job, diff)
+            await session.commit()
+
+        async with db.engine.connect() as connection:
+            after = {
+                row.tx_date: row
+                for row in await connection.execute(
+                    text(
+                        """
+                        SELECT id, tx_date, description, category_id, external_hash
+                        FROM transactions WHERE import_id = :id
+                        """
+                    ),
+                    {"id": import_id},
+                )
+            }
+        raws = [
+            (await db.client.get(f"/api/transactions/{row.id}/debug")).json()["raw"]
+            for _, row in sorted(after.items())
+        ]
+        return before, after, raws
+
+
+def test_apply_statement_diff_corrects_only_parser_output(
+    api_database, monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    monkeypatch.setattr(statement_store, "root", tmp_path)
+
+    before, after, raws = asyncio.run(_apply_fixed_parse(api_database, str(tmp_path)))
+
+    edited, fixed, untouched = (dt.date(2026, 3, day) for day in (1, 2, 3))
+    assert {day: row.id for day, row in after.items()} == {
+        day: row.id for day, row in before.items()
+    }
+    assert after[edited].description == "Кофе с коллегами"
+    assert after[edited].external_hash == b"\x01" * 16
+    assert after[fixed].description.endswith("Bakery 24")
+    assert after[fixed].external_hash == b"\x02" * 16
+    assert all(after[day].category_id == before[day].category_id for day in after)
+    assert after[untouched] == before[untouched]
+    assert [raw["details"] for raw in raws] == ["Cafe", "Bakery 24", "Taxi"]
@@ -0,0 +1,42 @@
+from app.services.data_versions import transactions_scope
+from app.services.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    etag_matches,
+    make_etag,
+)
+
+
+def test_transactions_scope_uses_wildcards_for_missing_parts() -> None:
+    assert transactions_scope(3, "2026-02") == "tx:3:2026-02"
+    assert transactions_scope(None, "2026-02") == "tx:%:2026-02"
+    assert transactions_scope(3) == "tx:3:%"
+
+
+def test_etag_changes_with_versions_and_query() -> None:
+    base = make_etag("/api/reports/monthly", [("month", "2026-02")], (("tx:1:2026-02", 4),))
+
+    assert base == make_etag("/api/reports/monthly", [("month", "2026-02")], (("tx:1:2026-02", 4),))
+    assert base != make_etag("/api/reports/monthly", [("month", "2026-02")], (("tx:1:2026-02", 5),))
+    assert base != make_etag("/api/reports/monthly", [("month", "2026-03")], (("tx:1:2026-02", 4),))
+
+
+def test_etag_matches_handles_lists_and_weak_validators() -> None:
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+
+
+def test_response_cache_evicts_least_recently_used() -> None:
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", CachedResponse(body=b"1"))
+    cache.put("b", CachedResponse(body=b"2"))
+    assert cache.get("a") == CachedResponse(body=b"1")
+
+    cache.put("c", CachedResponse(body=b"3"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == CachedResponse(body=b"1")
+    assert cache.get("c") == CachedResponse(body=b"3")
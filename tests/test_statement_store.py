@@ -0,0 +1,34 @@
+import gzip
+import io
+
+from app.services.statement_store import StatementStore
+
+
+def test_put_round_trips_and_stores_once(tmp_path) -> None:
+    store = StatementStore(tmp_path)
+    key = "ab" + "0" * 62
+    upload = io.BytesIO(b"%PDF-1.7 statement")
+
+    assert store.put(upload, key) == key
+    assert upload.tell() == 0
+    assert store.contains(key)
+    assert store.path(key) == tmp_path / "ab" / f"{key}.gz"
+    with store.open(key) as blob:
+        assert blob.read() == b"%PDF-1.7 statement"
+
+    store.put(io.BytesIO(b"something else"), key)
+
+    assert gzip.decompress(store.path(key).read_bytes()) == b"%PDF-1.7 statement"
+    assert [item.name for item in (tmp_path / "ab").iterdir()] == [f"{key}.gz"]
+
+
+def test_copy_to_writes_uncompressed_file(tmp_path) -> None:
+    store = StatementStore(tmp_path / "store")
+    key = "cd" + "1" * 62
+    store.put(io.BytesIO(b"a;b\n1;2\n"), key)
+    target = io.BytesIO()
+
+    store.copy_to(key, target)
+
+    assert target.getvalue() == b"a;b\n1;2\n"
+    assert not store.contains("ef" + "2" * 62)
@@ -0,0 +1,212 @@
+import asyncio
+import datetime as dt
+import io
+from decimal import Decimal
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import text
+
+from app.models.enums import TransactionStatus, TransactionType
+from app.services.pdf_import_service import make_external_hash, parse_statement_line
+from app.services.statement_store import statement_store
+from app.services.tabular_import_service import (
+    TableColumns,
+    iter_csv_rows,
+    iter_xlsx_rows,
+    locate_columns,
+    match_columns,
+    parse_table_row,
+)
+from app.services.transaction_raw import RAW_BATCH_SIZE
+
+
+def test_match_columns_accepts_russian_and_english_headers() -> None:
+    assert match_columns(["Дата", "Сумма", "Валюта", "Описание"]) == TableColumns(
+        date=0, amount=1, currency=2, details=3
+    )
+    assert match_columns(["Status", "Date", "Amount", "Description"]) == TableColumns(
+        date=1, amount=2, details=3, status=0
+    )
+    assert match_columns(["Дата", "Сумма"]) is None
+
+
+def test_locate_columns_skips_preamble() -> None:
+    rows = iter([["Выписка по счету"], [], ["Дата операции", "Сумма", "Детали"], ["x"]])
+
+    columns, header_row_no = locate_columns(rows)
+
+    assert header_row_no == 3
+    assert columns == TableColumns(date=0, amount=1, details=2)
+    assert next(rows) == ["x"]
+
+
+def test_locate_columns_without_header_fails() -> None:
+    with pytest.raises(ValueError):
+        locate_columns(iter([["a", "b"], ["c", "d"]]))
+
+
+def test_parse_csv_row_matches_pdf_hash() -> None:
+    columns = TableColumns(date=0, amount=1, currency=2, details=3)
+    row = parse_table_row(
+        ["06.02.2026", "-14,48 $", "USD", "Покупка Netflix.com Los Gatos NL"],
+        columns,
+        row_no=7,
+        account_id=3,
+        default_currency="KZT",
+    )
+    pdf_row = parse_statement_line("06.02.2026 -14.48 $ USD Покупка Netflix.com Los Gatos NL", 1)
+
+    assert row.tx_date == dt.date(2026, 2, 6)
+    assert row.signed_amount == Decimal("-14.48")
+    assert row.amount == Decimal("14.48")
+    assert row.tx_type == TransactionType.EXPENSE
+    assert row.operation == "Покупка"
+    assert row.details == "Netflix.com Los Gatos NL"
+    assert row.external_hash == make_external_hash(
+        pdf_row.tx_date,
+        pdf_row.signed_amount,
+        pdf_row.currency,
+        pdf_row.operation,
+        pdf_row.details,
+        account_id=3,
+    )
+
+
+def test_parse_xlsx_values() -> None:
+    columns = TableColumns(date=0, amount=1, operation=2, details=3, status=4)
+    row = parse_table_row(
+        [dt.datetime(2026, 2, 22, 14, 30), -1520.5, "Покупка", "Magnum", "В обработке"],
+        columns,
+        row_no=2,
+        account_id=1,
+        default_currency="KZT",
+    )
+
+    assert row.tx_date == dt.date(2026, 2, 22)
+    assert row.signed_amount == Decimal("-1520.50")
+    assert row.currency == "KZT"
+    assert row.description == "Покупка Magnum"
+    assert row.status == TransactionStatus.PENDING
+
+
+@pytest.mark.parametrize(
+    ("cells", "message"),
+    [
+        (["32.01.2026", "10", "x"], "Некорректная дата"),
+        (["01.01.2026", "abc", "x"], "Некорректная сумма"),
+        (["01.01.2026", "0,00", "x"], "Нулевая сумма"),
+        (["01.01.2026", "10", ""], "Не указано описание"),
+    ],
+)
+def test_parse_table_row_errors(cells: list[object], message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        parse_table_row(cells, TableColumns(date=0, amount=1, details=2), 5, 1, "KZT")
+
+
+def test_iter_csv_rows_detects_delimiter_and_cp1251() -> None:
+    content = "Выписка\nДата;Сумма;Описание\n01.02.2026;-1 520,00;Покупка Magnum\n"
+    file = io.BytesIO(content.encode("cp1251"))
+
+    rows = list(iter_csv_rows(file))
+
+    assert rows[1] == ["Дата", "Сумма", "Описание"]
+    assert rows[2] == ["01.02.2026", "-1 520,00", "Покупка Magnum"]
+    assert not file.closed
+
+
+def test_iter_xlsx_rows_reads_active_sheet() -> None:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Date", "Amount", "Description"])
+    sheet.append([dt.date(2026, 2, 1), 100, "Salary"])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    rows = list(iter_xlsx_rows(buffer))
+
+    assert rows[0] == ("Date", "Amount", "Description")
+    assert rows[1][0] == dt.datetime(2026, 2, 1)
+    assert rows[1][1:] == (100, "Salary")
+
+
+def test_iter_xlsx_rows_rejects_other_files() -> None:
+    with pytest.raises(ValueError):
+        list(iter_xlsx_rows(io.BytesIO(b"not a workbook")))
+
+
+RAW_ROWS = 2 * RAW_BATCH_SIZE + 100
+
+
+def _large_statement() -> bytes:
+    lines = ["Дата;Сумма;Валюта;Описание"]
+    lines += [
+        f"{1 + index % 28:02d}.04.2026;-{index + 1},00;KZT;Raw {index}" for index in range(RAW_ROWS)
+    ]
+    # A repeated row loses on external_hash and must not take over the payload.
+    lines.append(lines[1])
+    return "\n".join(lines).encode()
+
+
+async def _import_large_csv(api_database) -> tuple[dict, list[tuple[int, int, int]], list[dict]]:
+    async with api_database("raw-batch-test", 1) as db:
+        response = await db.client.post(
+            "/api/import/csv-statement",
+            data={"account_id": str(db.account_ids[0])},
+            files={"file": ("statement.csv", _large_statement(), "text/csv")},
+        )
+        result = response.json()
+        async with db.engine.connect() as connection:
+            ids = list(
+                await connection.scalars(
+                    text("SELECT id FROM transactions WHERE import_id = :id ORDER BY id"),
+                    {"id": result["import_id"]},
+                )
+            )
+            batches = [
+                tuple(batch)
+                for batch in await connection.execute(
+                    text(
+                        """
+                        SELECT first_transaction_id, last_transaction_id,
+                               (SELECT count(*) FROM jsonb_object_keys(payloads))
+                        FROM transaction_raw WHERE import_id = :id
+                        ORDER BY first_transaction_id
+                        """
+                    ),
+                    {"id": result["import_id"]},
+                )
+            ]
+        # Both ends of every batch, read the way the debug endpoint reads them.
+        sampled = sorted({ids[0], ids[-1], *(edge for batch in batches for edge in batch[:2])})
+        raws = [
+            (await db.client.get(f"/api/transactions/{transaction_id}/debug")).json()["raw"]
+            for transaction_id in sampled
+        ]
+        positions = [ids.index(transaction_id) for transaction_id in sampled]
+        return result, batches, list(zip(positions, raws, strict=True))
+
+
+def test_csv_import_batches_raw_payloads(api_database, monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(statement_store, "root", tmp_path)
+
+    result, batches, raws = asyncio.run(_import_large_csv(api_database))
+
+    assert result["inserted"] == RAW_ROWS
+    assert result["skipped"] == 1
+    assert [size for _, _, size in batches] == [RAW_BATCH_SIZE, RAW_BATCH_SIZE, 100]
+    assert all(
+        previous[1] < current[0] for previous, current in zip(batches, batches[1:], strict=False)
+    )
+    assert [position for position, _ in raws] == [
+        0,
+        RAW_BATCH_SIZE - 1,
+        RAW_BATCH_SIZE,
+        2 * RAW_BATCH_SIZE - 1,
+        2 * RAW_BATCH_SIZE,
+        RAW_ROWS - 1,
+    ]
+    for position, raw in raws:
+        assert raw["details"] == f"Raw {position}"
+        assert raw["row_no"] == raws[0][1]["row_no"] + position
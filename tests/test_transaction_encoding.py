@@ -0,0 +1,94 @@
+import csv
+import datetime as dt
+import io
+import json
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from app.models.enums import TransactionKind, TransactionSource, TransactionStatus, TransactionType
+from app.schemas.transaction import TransactionRead
+from app.services.reference_cache import AccountRef, CategoryRef, ReferenceData
+from app.services.transaction_export import CSV_COLUMNS, CSV_HEADER, encode_csv_rows
+from app.services.transactions import (
+    encode_transaction_row,
+    encode_transaction_rows,
+    serialize_transaction,
+)
+
+
+def _row(**overrides) -> SimpleNamespace:
+    values = {
+        "id": 42,
+        "description": "Перевод \"Kaspi\"",
+        "amount": Decimal("1500.50"),
+        "signed_amount": Decimal("-1500.50"),
+        "currency": "KZT",
+        "type": TransactionType.EXPENSE,
+        "kind": TransactionKind.TRANSFER,
+        "status": TransactionStatus.POSTED,
+        "account_id": 1,
+        "import_id": 7,
+        "category_id": 3,
+        "category_locked": False,
+        "transfer_pair_id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "matched_account_id": 2,
+        "match_confidence": 95,
+        "source": TransactionSource.IMPORT_PDF,
+        "tx_date": dt.date(2026, 2, 14),
+        "posted_at": None,
+        "created_at": dt.datetime(2026, 2, 14, 9, 30, 0, 123456, tzinfo=dt.timezone.utc),
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_encoded_rows_match_pydantic_output() -> None:
+    refs = ReferenceData(
+        versions=(),
+        accounts={
+            1: AccountRef(id=1, name="Kaspi Gold", bank="Kaspi", currency="KZT", is_active=True),
+            2: AccountRef(id=2, name="Halyk", bank="Halyk", currency="KZT", is_active=True),
+        },
+        categories={3: CategoryRef(id=3, name="Transfers", type=TransactionType.EXPENSE)},
+    )
+    rows = [
+        _row(),
+        _row(id=43, category_id=99, matched_account_id=None, transfer_pair_id=None),
+        _row(id=44, posted_at=dt.datetime(2026, 2, 15, tzinfo=dt.timezone.utc)),
+    ]
+
+    expected = TypeAdapter(list[TransactionRead]).dump_json(
+        [serialize_transaction(row, refs) for row in rows]
+    )
+    encoded = encode_transaction_rows(rows, refs)
+
+    assert encoded == expected
+    assert json.loads(encoded)[1]["category_name"] == "Неизвестно"
+    single = serialize_transaction(rows[0], refs).model_dump_json()
+    assert encode_transaction_row(rows[0], refs) == single.encode()
+
+
+def test_csv_rows_follow_header_columns() -> None:
+    refs = ReferenceData(
+        versions=(),
+        accounts={
+            1: AccountRef(id=1, name="Kaspi Gold", bank="Kaspi", currency="KZT", is_active=True),
+        },
+        categories={3: CategoryRef(id=3, name="Transfers", type=TransactionType.EXPENSE)},
+    )
+    body = CSV_HEADER + encode_csv_rows([_row(matched_account_id=None)], refs)
+
+    rows = list(csv.DictReader(io.StringIO(body.decode("utf-8"))))
+
+    assert len(rows) == 1
+    assert list(rows[0]) == list(CSV_COLUMNS)
+    assert rows[0]["description"] == 'Перевод "Kaspi"'
+    assert rows[0]["signed_amount"] == "-1500.50"
+    assert rows[0]["kind"] == "transfer"
+    assert rows[0]["account_name"] == "Kaspi Gold"
+    assert rows[0]["matched_account_name"] == ""
+    assert rows[0]["posted_at"] == ""
+    assert rows[0]["created_at"] == "2026-02-14T09:30:00.123456Z"